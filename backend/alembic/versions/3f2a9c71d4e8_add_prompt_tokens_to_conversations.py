@@ -0,0 +1,31 @@
+"""add prompt_tokens to conversations
+
+Revision ID: 3f2a9c71d4e8
+Revises: efcf14fe07cf
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c71d4e8'
+down_revision: Union[str, Sequence[str], None] = 'efcf14fe07cf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "conversations",
+        sa.Column("prompt_tokens", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("conversations", "prompt_tokens")
@@ -0,0 +1,36 @@
+"""add teaching_insight_like_shards
+
+Revision ID: 4d7b9e1c3a86
+Revises: c3f9a1d6e472
+Create Date: 2026-10-18 18:52:07.341926
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d7b9e1c3a86'
+down_revision: Union[str, Sequence[str], None] = 'c3f9a1d6e472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'teaching_insight_like_shards',
+        sa.Column('teaching_insight_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('delta', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['teaching_insight_id'], ['teaching_insights.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('teaching_insight_id', 'shard'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('teaching_insight_like_shards')
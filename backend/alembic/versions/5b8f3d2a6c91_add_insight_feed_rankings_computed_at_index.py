@@ -0,0 +1,28 @@
+"""add ix_insight_feed_rankings_computed_at
+
+Revision ID: 5b8f3d2a6c91
+Revises: 7e2c5a9f0d14
+Create Date: 2026-10-18 20:04:12.857301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8f3d2a6c91'
+down_revision: Union[str, Sequence[str], None] = '7e2c5a9f0d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # max(computed_at) is polled by the in-process feed page cache
+    op.create_index(op.f('ix_insight_feed_rankings_computed_at'), 'insight_feed_rankings', ['computed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_insight_feed_rankings_computed_at'), table_name='insight_feed_rankings')
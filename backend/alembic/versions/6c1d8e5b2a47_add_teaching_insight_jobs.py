@@ -0,0 +1,47 @@
+"""add teaching_insight_jobs queue
+
+Revision ID: 6c1d8e5b2a47
+Revises: 3f2a9c71d4e8
+Create Date: 2026-10-18 11:40:05.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1d8e5b2a47'
+down_revision: Union[str, Sequence[str], None] = '3f2a9c71d4e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('teaching_insight_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('conversation_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'running', 'succeeded', 'failed', name='insight_job_status'), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), server_default='5', nullable=False),
+    sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('teaching_insight_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['teaching_insight_id'], ['teaching_insights.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('conversation_id')
+    )
+    op.create_index('ix_teaching_insight_jobs_status_run_after', 'teaching_insight_jobs', ['status', 'run_after'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_teaching_insight_jobs_status_run_after', table_name='teaching_insight_jobs')
+    op.drop_table('teaching_insight_jobs')
+    sa.Enum(name='insight_job_status').drop(op.get_bind(), checkfirst=True)
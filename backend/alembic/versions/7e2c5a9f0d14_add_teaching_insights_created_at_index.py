@@ -0,0 +1,28 @@
+"""add ix_teaching_insights_created_at
+
+Revision ID: 7e2c5a9f0d14
+Revises: 4d7b9e1c3a86
+Create Date: 2026-10-18 19:26:40.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2c5a9f0d14'
+down_revision: Union[str, Sequence[str], None] = '4d7b9e1c3a86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # incremental sync of the in-process insight retrieval index
+    op.create_index(op.f('ix_teaching_insights_created_at'), 'teaching_insights', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_teaching_insights_created_at'), table_name='teaching_insights')
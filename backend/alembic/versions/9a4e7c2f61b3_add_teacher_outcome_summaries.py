@@ -0,0 +1,55 @@
+"""add teacher_outcome_summaries rollup
+
+Revision ID: 9a4e7c2f61b3
+Revises: 6c1d8e5b2a47
+Create Date: 2026-10-18 13:05:27.551730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e7c2f61b3'
+down_revision: Union[str, Sequence[str], None] = '6c1d8e5b2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RECENT = 20
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('teacher_outcome_summaries',
+    sa.Column('teacher_id', sa.UUID(), nullable=False),
+    sa.Column('worked_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('failed_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('recent_worked', postgresql.ARRAY(sa.UUID()), server_default=sa.text("'{}'"), nullable=False),
+    sa.Column('recent_failed', postgresql.ARRAY(sa.UUID()), server_default=sa.text("'{}'"), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('teacher_id')
+    )
+    # Initial backfill; scripts/backfill_outcome_summaries.py does the same later.
+    op.execute(f"""
+        INSERT INTO teacher_outcome_summaries
+            (teacher_id, worked_count, failed_count, recent_worked, recent_failed)
+        SELECT
+            teacher_id,
+            count(*) FILTER (WHERE outcome = 'worked'),
+            count(*) FILTER (WHERE outcome = 'failed'),
+            coalesce((array_agg(solution_id ORDER BY created_at DESC)
+                      FILTER (WHERE outcome = 'worked'))[1:{RECENT}], '{{}}'),
+            coalesce((array_agg(solution_id ORDER BY created_at DESC)
+                      FILTER (WHERE outcome = 'failed'))[1:{RECENT}], '{{}}')
+        FROM teacher_solution_outcomes
+        GROUP BY teacher_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('teacher_outcome_summaries')
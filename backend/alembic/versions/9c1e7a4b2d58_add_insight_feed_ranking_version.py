@@ -0,0 +1,66 @@
+"""add insight_feed_ranking_version change counter
+
+Revision ID: 9c1e7a4b2d58
+Revises: 5b8f3d2a6c91
+Create Date: 2026-10-18 22:41:05.304117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e7a4b2d58'
+down_revision: Union[str, Sequence[str], None] = '5b8f3d2a6c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # replaces max(computed_at) as the feed page cache's change marker
+    op.create_table(
+        'insight_feed_ranking_version',
+        sa.Column('id', sa.SmallInteger(), server_default=sa.text('1'), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.CheckConstraint('id = 1', name='ck_insight_feed_ranking_version_single_row'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_insight_feed_ranking_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM 1 FROM old_rows LIMIT 1;
+            ELSE
+                PERFORM 1 FROM new_rows LIMIT 1;
+            END IF;
+            IF FOUND THEN
+                INSERT INTO insight_feed_ranking_version (id, version) VALUES (1, 1)
+                ON CONFLICT (id) DO UPDATE
+                SET version = insight_feed_ranking_version.version + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    for event, transition in (('INSERT', 'NEW TABLE AS new_rows'),
+                              ('UPDATE', 'NEW TABLE AS new_rows'),
+                              ('DELETE', 'OLD TABLE AS old_rows')):
+        op.execute(f"""
+            CREATE TRIGGER trg_insight_feed_rankings_version_{event.lower()}
+            AFTER {event} ON insight_feed_rankings REFERENCING {transition}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_insight_feed_ranking_version()
+        """)
+    op.drop_index(op.f('ix_insight_feed_rankings_computed_at'), table_name='insight_feed_rankings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_insight_feed_rankings_computed_at'), 'insight_feed_rankings', ['computed_at'], unique=False)
+    for event in ('insert', 'update', 'delete'):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_insight_feed_rankings_version_{event} ON insight_feed_rankings")
+    op.execute("DROP FUNCTION IF EXISTS bump_insight_feed_ranking_version()")
+    op.drop_table('insight_feed_ranking_version')
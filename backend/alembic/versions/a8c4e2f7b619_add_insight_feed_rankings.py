@@ -0,0 +1,46 @@
+"""add insight_feed_rankings
+
+Revision ID: a8c4e2f7b619
+Revises: f1b6d2e8a357
+Create Date: 2026-10-18 17:48:36.210554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e2f7b619'
+down_revision: Union[str, Sequence[str], None] = 'f1b6d2e8a357'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'insight_feed_rankings',
+        sa.Column('segment', sa.Text(), nullable=False),
+        sa.Column('teaching_insight_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['teaching_insight_id'], ['teaching_insights.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('segment', 'teaching_insight_id'),
+    )
+    op.create_index(
+        'ix_insight_feed_rankings_segment_score',
+        'insight_feed_rankings',
+        ['segment', sa.text('score DESC'), sa.text('teaching_insight_id DESC')],
+        unique=False,
+    )
+    # Rankings are filled by scripts/refresh_feed_rankings.py; until then
+    # the feed falls back to random sampling.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_insight_feed_rankings_segment_score', table_name='insight_feed_rankings')
+    op.drop_table('insight_feed_rankings')
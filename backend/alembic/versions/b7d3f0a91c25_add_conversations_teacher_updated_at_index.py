@@ -0,0 +1,33 @@
+"""add conversations (teacher_id, updated_at desc, id desc) index
+
+Revision ID: b7d3f0a91c25
+Revises: 9a4e7c2f61b3
+Create Date: 2026-10-18 14:21:48.117093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3f0a91c25'
+down_revision: Union[str, Sequence[str], None] = '9a4e7c2f61b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_conversations_teacher_updated_at',
+        'conversations',
+        ['teacher_id', sa.text('updated_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversations_teacher_updated_at', table_name='conversations')
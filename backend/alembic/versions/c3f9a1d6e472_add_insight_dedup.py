@@ -0,0 +1,47 @@
+"""add teaching_insights.support_count/minhash and insight_lsh_buckets
+
+Revision ID: c3f9a1d6e472
+Revises: a8c4e2f7b619
+Create Date: 2026-10-18 18:21:54.730118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a1d6e472'
+down_revision: Union[str, Sequence[str], None] = 'a8c4e2f7b619'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'teaching_insights',
+        sa.Column('support_count', sa.Integer(), server_default='1', nullable=False),
+    )
+    op.add_column(
+        'teaching_insights',
+        sa.Column('minhash', postgresql.ARRAY(sa.BigInteger()), nullable=True),
+    )
+    op.create_table(
+        'insight_lsh_buckets',
+        sa.Column('band', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.BigInteger(), nullable=False),
+        sa.Column('teaching_insight_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(['teaching_insight_id'], ['teaching_insights.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('band', 'bucket', 'teaching_insight_id'),
+    )
+    # Existing insights are indexed by scripts/rebuild_insight_dedup.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('insight_lsh_buckets')
+    op.drop_column('teaching_insights', 'minhash')
+    op.drop_column('teaching_insights', 'support_count')
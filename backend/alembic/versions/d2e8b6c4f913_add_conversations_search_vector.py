@@ -0,0 +1,52 @@
+"""add conversations.search_vector with GIN index
+
+Revision ID: d2e8b6c4f913
+Revises: b7d3f0a91c25
+Create Date: 2026-10-18 15:02:33.640218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2e8b6c4f913'
+down_revision: Union[str, Sequence[str], None] = 'b7d3f0a91c25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Generated column: Postgres fills it for existing rows and keeps it
+    # in sync on every insert/update.
+    op.add_column(
+        'conversations',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(raw_query, '')), 'B') || "
+                "setweight(to_tsvector('simple', coalesce(ai_response, '')), 'C')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_conversations_search_vector',
+        'conversations',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversations_search_vector', table_name='conversations', postgresql_using='gin')
+    op.drop_column('conversations', 'search_vector')
@@ -0,0 +1,55 @@
+"""add conversation_messages and rolling summary
+
+Revision ID: e5a1c9d7b284
+Revises: d2e8b6c4f913
+Create Date: 2026-10-18 16:10:52.384117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a1c9d7b284'
+down_revision: Union[str, Sequence[str], None] = 'd2e8b6c4f913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('conversation_messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('conversation_id', sa.UUID(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('role', sa.Enum('teacher', 'assistant', name='message_role'), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['conversations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('conversation_id', 'seq', name='uq_conversation_message_seq')
+    )
+    op.add_column('conversations', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('conversations', sa.Column('summarized_through', sa.Integer(), server_default='0', nullable=False))
+
+    # Existing single-turn conversations become the first two messages.
+    op.execute("""
+        INSERT INTO conversation_messages (id, conversation_id, seq, role, content, created_at)
+        SELECT gen_random_uuid(), id, 1, 'teacher', raw_query, created_at
+        FROM conversations WHERE raw_query <> ''
+    """)
+    op.execute("""
+        INSERT INTO conversation_messages (id, conversation_id, seq, role, content, created_at)
+        SELECT gen_random_uuid(), id, 2, 'assistant', ai_response, created_at
+        FROM conversations WHERE raw_query <> '' AND ai_response <> ''
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('conversations', 'summarized_through')
+    op.drop_column('conversations', 'summary')
+    op.drop_table('conversation_messages')
+    sa.Enum(name='message_role').drop(op.get_bind(), checkfirst=True)
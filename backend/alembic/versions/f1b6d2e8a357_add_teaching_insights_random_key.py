@@ -0,0 +1,34 @@
+"""add teaching_insights.random_key for feed sampling
+
+Revision ID: f1b6d2e8a357
+Revises: e5a1c9d7b284
+Create Date: 2026-10-18 17:03:11.905426
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6d2e8a357'
+down_revision: Union[str, Sequence[str], None] = 'e5a1c9d7b284'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # volatile default: existing rows each get their own random() value
+    op.add_column(
+        'teaching_insights',
+        sa.Column('random_key', sa.Float(), server_default=sa.text('random()'), nullable=False),
+    )
+    op.create_index(op.f('ix_teaching_insights_random_key'), 'teaching_insights', ['random_key'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_teaching_insights_random_key'), table_name='teaching_insights')
+    op.drop_column('teaching_insights', 'random_key')
@@ -1,11 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from app.models.conversations import Conversation
+from app.models.conversations import Conversation, ConversationMessage, MessageRole
+import json
 import uuid
+from app.core.config import (
+    COACH_FAST_PATH_ENABLED,
+    CONTEXT_CACHE_ENABLED,
+    CONTEXT_SINGLE_QUERY,
+    INSIGHT_RETRIEVAL_ENABLED,
+    SEMANTIC_CACHE_ENABLED,
+)
 from app.core.llm import get_llm, LLMError
+from app.core.semantic_cache import get_semantic_cache
+from app.core.catalog import get_catalog_cache
+from app.core.coach_fast_path import get_coach_fast_path
+from app.core.context_cache import get_context_cache
 from app.core.context_resolver import resolve_context
+from app.core.insight_index import retrieve_insights
 from app.core.prompt_builder import build_prompt
+from app.core.token_budget import estimate_tokens
 from app.db.session import get_db
 from app.api.deps import get_current_teacher_id
 
@@ -18,52 +34,189 @@ class CoachRequest(BaseModel):
     subject: str | None = None
     language: str | None = None
     time_left_minutes: int | None = None
+    # skip the insight fast path and the semantic cache; always ask the LLM
+    fresh: bool = False
+
+
+def _conversation_title(prompt: str) -> str:
+    # 🔹 Auto-generate title from raw query
+    title = prompt.strip()
+    if len(title) > 60:
+        title = title[:57] + "..."
+    return title
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# Blocking DB work is kept in these helpers and run on the threadpool,
+# so a coach request only holds a worker for the DB round trips and not
+# for the LLM call.
+
+def _prepare(db: Session, teacher_id: str, req: CoachRequest):
+    """
+    Returns (ctx, final_prompt, insight). `insight` is set when the fast
+    path matched, and then no prompt is built and final_prompt is None.
+    """
+    ctx = resolve_context(
+        db=db,
+        teacher_id=teacher_id,
+        raw_prompt=req.prompt,
+        grade=req.grade,
+        subject=req.subject,
+        language=req.language,
+        time_left_minutes=req.time_left_minutes,
+        single_query=CONTEXT_SINGLE_QUERY,
+        cache=get_context_cache() if CONTEXT_CACHE_ENABLED else None,
+        catalog=get_catalog_cache(),
+    )
+    fast_path = COACH_FAST_PATH_ENABLED and not req.fresh
+    candidates = (
+        retrieve_insights(db, ctx) if INSIGHT_RETRIEVAL_ENABLED or fast_path else []
+    )
+
+    matched = get_coach_fast_path().match(candidates) if fast_path else None
+    if matched is not None:
+        return ctx, None, {"id": str(matched.id), "solution": matched.reframed_solution}
+
+    insights = [(i.title, i.reframed_solution) for i, _ in candidates] if INSIGHT_RETRIEVAL_ENABLED else []
+    return ctx, build_prompt(ctx, insights=insights), None
+
+
+def _semantic_cache(req: CoachRequest):
+    return get_semantic_cache() if SEMANTIC_CACHE_ENABLED and not req.fresh else None
+
+
+def _save_conversation(
+    db: Session, teacher_id: str, req: CoachRequest, ctx, final_prompt: str | None, output: str
+) -> dict:
+    conversation = Conversation(
+        id=uuid.uuid4(),
+        teacher_id=teacher_id,
+        title=_conversation_title(req.prompt),
+        raw_query=req.prompt,
+        resolved_context=ctx.model_dump(),
+        ai_response=output,
+        # None when the fast path answered and no prompt was sent
+        prompt_tokens=estimate_tokens(final_prompt) if final_prompt is not None else None,
+    )
+    # Captured before commit so nothing is lazily reloaded on the event loop
+    saved = {
+        "conversation_id": str(conversation.id),
+        "title": conversation.title,
+    }
+    db.add(conversation)
+    # first turn of the thread log; follow-ups append from seq 3
+    db.add(ConversationMessage(
+        conversation_id=conversation.id, seq=1, role=MessageRole.teacher, content=req.prompt,
+    ))
+    db.add(ConversationMessage(
+        conversation_id=conversation.id, seq=2, role=MessageRole.assistant, content=output,
+    ))
+    db.commit()
+    return saved
 
 
 @router.post("/coach")
-def coach(
+async def coach(
     req: CoachRequest,
     db: Session = Depends(get_db),
     teacher_id: str = Depends(get_current_teacher_id),
 ):
     try:
-        ctx = resolve_context(
-            db=db,
-            teacher_id=teacher_id,
-            raw_prompt=req.prompt,
-            grade=req.grade,
-            subject=req.subject,
-            language=req.language,
-            time_left_minutes=req.time_left_minutes
-        )
+        ctx, final_prompt, insight = await run_in_threadpool(_prepare, db, teacher_id, req)
 
-        final_prompt = build_prompt(ctx)
+        if insight is not None:
+            output, source = insight["solution"], "teaching_insight"
+        else:
+            semantic_cache = _semantic_cache(req)
+            output = semantic_cache.lookup(ctx) if semantic_cache else None
+            source = "semantic_cache"
 
-        llm = get_llm()
-        output = llm.generate(final_prompt)
-        # 🔹 Auto-generate title from raw query
-        title = req.prompt.strip()
-        if len(title) > 60:
-            title = title[:57] + "..."
-
-        conversation = Conversation(
-            id=uuid.uuid4(),
-            teacher_id=teacher_id,
-            title=title,
-            raw_query=req.prompt,
-            resolved_context=ctx.model_dump(),
-            ai_response=output,
+            if output is None:
+                llm = get_llm()
+                output = await llm.agenerate(final_prompt)
+                source = "llm"
+                if semantic_cache:
+                    semantic_cache.store(ctx, output)
+
+        saved = await run_in_threadpool(
+            _save_conversation, db, teacher_id, req, ctx, final_prompt, output
         )
+        result = {**saved, "output": output, "source": source}
+        if insight is not None:
+            result["teaching_insight_id"] = insight["id"]
+        return result
+
+    except LLMError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
-        db.add(conversation)
-        db.commit()
-        return {
-            "conversation_id": str(conversation.id),
-            "title": conversation.title,
-            "output": output,
-        }
+@router.post("/coach/stream")
+async def coach_stream(
+    req: CoachRequest,
+    db: Session = Depends(get_db),
+    teacher_id: str = Depends(get_current_teacher_id),
+):
+    """
+    Server-Sent Events variant of /coach.
 
+    Emits one `token` event per chunk from the LLM, then a single
+    `done` event once the Conversation row has been written.
+    LLM failures mid-stream are reported as an `error` event since
+    the 200 status line has already been sent.
+    """
+    try:
+        ctx, final_prompt, insight = await run_in_threadpool(_prepare, db, teacher_id, req)
+        llm = get_llm()
     except LLMError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    semantic_cache = _semantic_cache(req) if insight is None else None
+    if insight is not None:
+        cached, source = insight["solution"], "teaching_insight"
+    else:
+        cached = semantic_cache.lookup(ctx) if semantic_cache else None
+        source = "semantic_cache" if cached is not None else "llm"
+
+    async def events():
+        chunks = []
+        try:
+            if cached is not None:
+                chunks.append(cached)
+                yield _sse("token", {"text": cached})
+            else:
+                async for chunk in llm.astream(final_prompt):
+                    chunks.append(chunk)
+                    yield _sse("token", {"text": chunk})
+
+            output = "".join(chunks).strip()
+            if cached is None and semantic_cache:
+                semantic_cache.store(ctx, output)
+
+            saved = await run_in_threadpool(
+                _save_conversation, db, teacher_id, req, ctx, final_prompt, output
+            )
+        except LLMError as e:
+            yield _sse("error", {"status": 503, "detail": str(e)})
+            return
+        except Exception as e:
+            await run_in_threadpool(db.rollback)
+            yield _sse("error", {"status": 500, "detail": str(e)})
+            return
+
+        done = {**saved, "source": source}
+        if insight is not None:
+            done["teaching_insight_id"] = insight["id"]
+        yield _sse("done", done)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,40 +1,156 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import REAL, case, cast, func, tuple_
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.api.deps import get_current_teacher_id
 from pydantic import BaseModel
-from uuid import uuid4
-from app.models.conversations import Conversation, TeachingInsight
+from uuid import UUID, uuid4
+from app.models.conversations import Conversation, ConversationMessage, TeachingInsightJob
 from app.schemas.conversations import ConversationFeedbackRequest
-from app.core.teaching_insight_generator import generate_teaching_insight
+from app.core.insight_jobs import enqueue_insight_job
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.core.catalog import get_catalog_cache
+from app.core.config import CONTEXT_SINGLE_QUERY
+from app.core.context_resolver import resolve_context
+from app.core.conversation_thread import (
+    append_turn, load_thread, refresh_summary_in_background
+)
+from app.core.llm import get_llm, LLMError
+from app.core.prompt_builder import build_followup_prompt
+from app.core.token_budget import estimate_tokens
 from typing import Optional, Dict, Any
 router = APIRouter(prefix="/api/conversations", tags=["conversations"])
 
+PREVIEW_CHARS = 120
+
+# Cut in SQL so the list never transfers full responses
+_preview = case(
+    (
+        func.char_length(Conversation.ai_response) > PREVIEW_CHARS,
+        func.left(Conversation.ai_response, PREVIEW_CHARS).concat("..."),
+    ),
+    else_=Conversation.ai_response,
+).label("last_message_preview")
+
+
 @router.get("")
 def list_conversations(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     teacher_id: str = Depends(get_current_teacher_id),
 ):
-    conversations = (
-        db.query(Conversation)
+    """
+    Newest first, keyset-paginated on (updated_at, id).
+    Without `limit` the whole history is returned, as before. When more
+    rows remain, the `X-Next-Cursor` header holds the `cursor` for the
+    next page.
+    """
+    query = (
+        db.query(
+            Conversation.id,
+            Conversation.title,
+            _preview,
+            Conversation.updated_at,
+            Conversation.worked,
+        )
         .filter(Conversation.teacher_id == teacher_id)
-        .order_by(Conversation.updated_at.desc())
-        .all()
+        .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+    )
+
+    if cursor:
+        try:
+            updated_at, last_id = decode_cursor(cursor)
+            updated_at, last_id = datetime.fromisoformat(updated_at), UUID(last_id)
+        except (InvalidCursor, ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(
+            tuple_(Conversation.updated_at, Conversation.id) < tuple_(updated_at, last_id)
+        )
+
+    if limit is not None:
+        rows = query.limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].updated_at, rows[-1].id)
+    else:
+        rows = query.all()
+
+    return [
+        {
+            "id": str(c.id),
+            "title": c.title,
+            "last_message_preview": c.last_message_preview,
+            "updated_at": c.updated_at.isoformat(),
+            "worked": c.worked,
+        }
+        for c in rows
+    ]
+
+# Declared before /{conversation_id} so "search" is not taken as an id
+@router.get("/search")
+def search_conversations(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    teacher_id: str = Depends(get_current_teacher_id),
+):
+    """
+    Ranked full-text search over title, question and answer (GIN index on
+    conversations.search_vector). Accepts web-search syntax: quoted
+    phrases, OR, -exclusion. Paginated like the list via X-Next-Cursor.
+    """
+    tsquery = func.websearch_to_tsquery("simple", q)
+    rank = func.ts_rank(Conversation.search_vector, tsquery).label("rank")
+
+    query = (
+        db.query(
+            Conversation.id,
+            Conversation.title,
+            _preview,
+            Conversation.updated_at,
+            Conversation.worked,
+            rank,
+        )
+        .filter(
+            Conversation.teacher_id == teacher_id,
+            Conversation.search_vector.op("@@")(tsquery),
+        )
+        .order_by(rank.desc(), Conversation.id.desc())
     )
 
+    if cursor:
+        try:
+            last_rank, last_id = decode_cursor(cursor)
+            last_rank, last_id = float(last_rank), UUID(last_id)
+        except (InvalidCursor, ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # ts_rank is float4; compare as float4 so ties are not re-fetched
+        query = query.filter(
+            tuple_(func.ts_rank(Conversation.search_vector, tsquery), Conversation.id)
+            < tuple_(cast(last_rank, REAL), last_id)
+        )
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].rank, rows[-1].id)
+
     return [
         {
             "id": str(c.id),
             "title": c.title,
-            "last_message_preview": (
-                c.ai_response[:120] + "..."
-                if len(c.ai_response) > 120
-                else c.ai_response
-            ),
+            "last_message_preview": c.last_message_preview,
             "updated_at": c.updated_at.isoformat(),
             "worked": c.worked,
+            "rank": round(c.rank, 4),
         }
-        for c in conversations
+        for c in rows
     ]
 
 @router.get("/{conversation_id}")
@@ -62,6 +178,7 @@ def get_conversation(
         "ai_response": conv.ai_response,
         "resolved_context": conv.resolved_context,
         "worked": conv.worked,
+        "prompt_tokens": conv.prompt_tokens,
         "created_at": conv.created_at.isoformat(),
         "updated_at": conv.updated_at.isoformat(),
     }
@@ -91,15 +208,63 @@ def delete_conversation(
 
 class ConversationFeedbackRequest(BaseModel):
     worked: bool
+
+
+def _record_feedback(db: Session, conversation_id: str, teacher_id: str, worked: bool) -> bool:
+    convo = (
+        db.query(Conversation)
+        .filter(
+            Conversation.id == conversation_id,
+            Conversation.teacher_id == teacher_id,
+        )
+        .first()
+    )
+
+    if not convo:
+        return False
+
+    convo.worked = worked
+    db.add(convo)
+
+    # 🔥 If solution worked → queue Teaching Insight generation.
+    # Same transaction as the feedback, so a job is never lost or orphaned.
+    if worked:
+        enqueue_insight_job(db, convo.id)
+
+    db.commit()
+    return True
+
+
 @router.post("/{conversation_id}/feedback")
-def submit_feedback(
+async def submit_feedback(
     conversation_id: str,
     payload: ConversationFeedbackRequest,
     db: Session = Depends(get_db),
     teacher_id: str = Depends(get_current_teacher_id),
 ):
-    convo = (
-        db.query(Conversation)
+    """
+    Records feedback and returns immediately; insight generation runs
+    in scripts/insight_worker.py (see app/core/insight_jobs.py).
+    """
+    found = await run_in_threadpool(
+        _record_feedback, db, conversation_id, teacher_id, payload.worked
+    )
+
+    if not found:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    return {"status": "ok"}
+
+
+@router.get("/{conversation_id}/insight-status")
+def get_insight_status(
+    conversation_id: str,
+    db: Session = Depends(get_db),
+    teacher_id: str = Depends(get_current_teacher_id),
+):
+    row = (
+        db.query(TeachingInsightJob)
+        .join(Conversation, Conversation.id == TeachingInsightJob.conversation_id)
         .filter(
             Conversation.id == conversation_id,
             Conversation.teacher_id == teacher_id,
@@ -107,39 +272,98 @@ def submit_feedback(
         .first()
     )
 
-    if not convo:
+    if not row:
+        raise HTTPException(status_code=404, detail="No insight job for this conversation")
+
+    return {
+        "status": row.status.value,
+        "attempts": row.attempts,
+        "last_error": row.last_error,
+        "teaching_insight_id": str(row.teaching_insight_id) if row.teaching_insight_id else None,
+        "updated_at": row.updated_at.isoformat(),
+    }
+
+class FollowUpRequest(BaseModel):
+    prompt: str
+
+
+@router.get("/{conversation_id}/messages")
+def list_messages(
+    conversation_id: str,
+    db: Session = Depends(get_db),
+    teacher_id: str = Depends(get_current_teacher_id),
+):
+    rows = (
+        db.query(ConversationMessage)
+        .join(Conversation, Conversation.id == ConversationMessage.conversation_id)
+        .filter(
+            Conversation.id == conversation_id,
+            Conversation.teacher_id == teacher_id,
+        )
+        .order_by(ConversationMessage.seq)
+        .all()
+    )
+
+    return [
+        {
+            "seq": m.seq,
+            "role": m.role.value,
+            "content": m.content,
+            "created_at": m.created_at.isoformat(),
+        }
+        for m in rows
+    ]
+
+
+def _load_followup(db: Session, conversation_id: str, teacher_id: str, prompt: str):
+    thread = load_thread(db, conversation_id, teacher_id)
+    if thread is not None and thread.ctx is None:
+        thread.ctx = resolve_context(
+            db=db,
+            teacher_id=teacher_id,
+            raw_prompt=prompt,
+            single_query=CONTEXT_SINGLE_QUERY,
+            catalog=get_catalog_cache(),
+        )
+    return thread
+
+
+@router.post("/{conversation_id}/messages")
+async def send_followup(
+    conversation_id: str,
+    payload: FollowUpRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    teacher_id: str = Depends(get_current_teacher_id),
+):
+    """
+    Continue a conversation. The prompt carries a rolling summary plus
+    the recent window only; see app/core/conversation_thread.py.
+    """
+    thread = await run_in_threadpool(
+        _load_followup, db, conversation_id, teacher_id, payload.prompt
+    )
+    if thread is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    convo.worked = payload.worked
-    db.add(convo)
-    db.commit()
+    final_prompt = build_followup_prompt(thread.ctx, thread.summary, thread.turns, payload.prompt)
+    llm = get_llm()
+    try:
+        output = await llm.agenerate(final_prompt)
+    except LLMError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-    # 🔥 If solution worked → generate Teaching Insight
-    if payload.worked:
-        try:
-            insight_data = generate_teaching_insight(
-                raw_query=convo.raw_query,
-                ai_response=convo.ai_response,
-                resolved_context=convo.resolved_context,
-            )
-            
-
-            # Normalize LLM output → DB schema
-            insight = TeachingInsight(
-                title=insight_data["title"],
-                generalized_context=insight_data["generalized_context"],
-                reframed_problem=insight_data["problem"],
-                reframed_solution="\n".join(insight_data["solution"]),
-            )
-            db.add(insight)
-            db.commit()
-
-        except Exception as e:
-            # ❗ Never fail user flow due to AI
-            print("❌ Teaching Insight generation failed:", e)
-            raise
+    saved = await run_in_threadpool(
+        append_turn, db, thread.conversation_id, payload.prompt, output,
+        estimate_tokens(final_prompt), thread.ctx,
+    )
+    if saved.pop("needs_summary"):
+        background_tasks.add_task(
+            refresh_summary_in_background, thread.conversation_id, SessionLocal, llm
+        )
+
+    return {**saved, "output": output}
 
-    return {"status": "ok"}
 
 class CreateConversationRequest(BaseModel):
     title: str
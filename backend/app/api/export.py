@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_teacher_id
+from app.core.exporter import gzip_chunks, iter_conversations, iter_insights, ndjson_lines
+from app.db.session import get_db
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+@router.get("/{kind}")
+def export_ndjson(
+    kind: Literal["conversations", "insights"],
+    since: Optional[datetime] = None,
+    gzip: bool = Query(False),
+    db: Session = Depends(get_db),
+    teacher_id: str = Depends(get_current_teacher_id),
+):
+    """
+    Streams one JSON object per line. Conversations are limited to the
+    caller's own; insights are global and anonymized. Full-table exports
+    for analysis go through scripts/export_ndjson.py.
+    """
+    if kind == "conversations":
+        rows = iter_conversations(db, teacher_id=teacher_id, since=since)
+    else:
+        rows = iter_insights(db, since=since)
+
+    body = ndjson_lines(rows)
+    filename, media_type = f"{kind}.ndjson", "application/x-ndjson"
+    if gzip:
+        # a .gz file download, not Content-Encoding, so clients keep it compressed
+        body = gzip_chunks(body)
+        filename, media_type = filename + ".gz", "application/gzip"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
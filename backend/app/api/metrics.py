@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+
+from app.core.catalog import get_catalog_cache
+from app.core.coach_fast_path import get_coach_fast_path
+from app.core.context_cache import get_context_cache
+from app.core.feed_cache import get_feed_cache
+from app.core.insight_index import get_insight_index
+from app.core.llm import get_llm
+from app.core.semantic_cache import get_semantic_cache
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("")
+def get_metrics():
+    """
+    Public endpoint.
+    In-process counters for this worker (caches, LLM layers).
+    """
+    return {
+        "llm": get_llm().stats(),
+        "semantic_cache": get_semantic_cache().stats(),
+        "context_cache": get_context_cache().stats(),
+        "catalog": get_catalog_cache().stats(),
+        "insight_index": get_insight_index().stats(),
+        "coach_fast_path": get_coach_fast_path().stats(),
+        "feed_cache": get_feed_cache().stats(),
+    }
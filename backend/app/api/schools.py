@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
+from app.core.catalog import get_catalog_cache
 from app.db.session import get_db
-from app.models.core import School
 
 router = APIRouter(prefix="/schools", tags=["schools"])
 
@@ -11,19 +11,6 @@ router = APIRouter(prefix="/schools", tags=["schools"])
 def list_schools(db: Session = Depends(get_db)):
     """
     Public endpoint.
-    Returns list of schools for onboarding.
+    Returns list of schools for onboarding (served from the catalog cache).
     """
-    schools = (
-        db.query(School)
-        .order_by(School.name)
-        .all()
-    )
-
-    return [
-        {
-            "id": str(s.id),
-            "name": s.name,
-            "location": s.location,
-        }
-        for s in schools
-    ]
+    return get_catalog_cache().get(db).schools
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.sql import func
 
+from app.core.config import FEED_CACHE_ENABLED
+from app.core.feed_cache import get_feed_cache
+from app.core.feed_ranking import ranked_page, ranked_segment_key, teacher_segment
+from app.core.insight_sampling import sample_insights
+from app.core.like_counters import current_likes, record_reaction
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
 from app.db.session import get_db
 from app.api.deps import get_current_teacher_id
-from app.models.conversations import (
-    TeachingInsight,
-    TeachingInsightReaction,
-)
+from app.models.conversations import TeachingInsight
 
 router = APIRouter(
     prefix="/api/teaching-insights",
@@ -28,36 +34,85 @@ class InsightReactionRequest(BaseModel):
 # GET: Teaching Insight Feed
 # =========================
 
+def _serialize(i: TeachingInsight) -> dict:
+    return {
+        "id": str(i.id),
+        "title": i.title,
+        "problem": i.reframed_problem,
+        "solution": i.reframed_solution,
+        "context": i.generalized_context,
+        "likes_count": i.likes_count,
+        "support_count": i.support_count,
+        "created_at": i.created_at,
+    }
+
+
+def _render_page(insights: list[TeachingInsight]) -> bytes:
+    # same bytes FastAPI's JSONResponse would produce
+    return json.dumps(
+        jsonable_encoder([_serialize(i) for i in insights]),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _ranked_page_bytes(db: Session, key: str, limit: int, after) -> tuple[bytes, Optional[str]]:
+    rows = ranked_page(db, key, limit + 1, after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, last_score = rows[-1]
+        next_cursor = encode_cursor(key, last_score, last.id)
+    return _render_page([i for i, _ in rows]), next_cursor
+
+
 @router.get("")
 def list_teaching_insights(
     limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     teacher_id: str = Depends(get_current_teacher_id),
 ):
     """
-    Random teaching insight feed.
-    (Ranking & personalization later)
+    Teaching insight feed ranked for the teacher's grade, subject and
+    language (see app/core/feed_ranking.py). Pages are read from the
+    precomputed ranking; `X-Next-Cursor` carries the next page's cursor.
+    Falls back to a random sample until rankings have been built.
+    Rendered pages are cached in-process (see app/core/feed_cache.py).
     """
-
-    insights = (
-        db.query(TeachingInsight)
-        .order_by(func.random())   # 🔀 RANDOM for now
-        .limit(limit)
-        .all()
-    )
-
-    return [
-        {
-            "id": str(i.id),
-            "title": i.title,
-            "problem": i.reframed_problem,
-            "solution": i.reframed_solution,
-            "context": i.generalized_context,
-            "likes_count": i.likes_count,
-            "created_at": i.created_at,
-        }
-        for i in insights
-    ]
+    after = None
+    if cursor:
+        try:
+            key, last_score, last_id = decode_cursor(cursor)
+            after = (float(last_score), UUID(last_id))
+        except (InvalidCursor, ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    cache = get_feed_cache() if FEED_CACHE_ENABLED else None
+    if cache:
+        cache.sync(db)
+    generation = cache.generation if cache else 0
+
+    if not cursor:
+        key = cache.segment_for(teacher_id) if cache else None
+        if key is None:
+            key = ranked_segment_key(db, teacher_segment(db, teacher_id))
+            if key is not None and cache:
+                cache.remember_segment(teacher_id, key, generation)
+
+    if key is None:
+        # 🔀 indexed random-key range scan instead of ORDER BY random()
+        return [_serialize(i) for i in sample_insights(db, limit)]
+
+    page = cache.get_page(key, cursor, limit) if cache else None
+    if page is None:
+        page = _ranked_page_bytes(db, key, limit, after)
+        if cache:
+            cache.put_page(key, cursor, limit, page, generation)
+
+    body, next_cursor = page
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # =========================
@@ -71,41 +126,22 @@ def react_to_insight(
     db: Session = Depends(get_db),
     teacher_id: str = Depends(get_current_teacher_id),
 ):
-    insight = (
-        db.query(TeachingInsight)
-        .filter(TeachingInsight.id == insight_id)
-        .first()
-    )
-
-    if not insight:
+    """
+    Like or dislike an insight. Reacting again replaces the previous
+    reaction. Counts go through sharded counters (see like_counters.py),
+    so the insight row is not locked.
+    """
+    exists = db.query(TeachingInsight.id).filter(TeachingInsight.id == insight_id).first()
+    if not exists:
         raise HTTPException(status_code=404, detail="Teaching Insight not found")
 
-    try:
-        reaction = TeachingInsightReaction(
-            teaching_insight_id=insight.id,
-            teacher_id=teacher_id,
-            liked=payload.liked,
-        )
-        db.add(reaction)
-
-        # Update counter (simple for now)
-        if payload.liked:
-            insight.likes_count += 1
-        else:
-            insight.likes_count -= 1
-
-        db.commit()
-
-    except IntegrityError:
-        db.rollback()
-        raise HTTPException(
-            status_code=400,
-            detail="You already reacted to this insight",
-        )
+    record_reaction(db, insight_id, teacher_id, payload.liked)
+    db.commit()
 
     return {
         "status": "ok",
-        "likes_count": insight.likes_count,
+        "liked": payload.liked,
+        "likes_count": current_likes(db, insight_id),
     }
 
 
@@ -127,12 +163,5 @@ def get_teaching_insight(
     if not insight:
         raise HTTPException(status_code=404, detail="Teaching Insight not found")
 
-    return {
-        "id": str(insight.id),
-        "title": insight.title,
-        "problem": insight.reframed_problem,
-        "solution": insight.reframed_solution,
-        "context": insight.generalized_context,
-        "likes_count": insight.likes_count,
-        "created_at": insight.created_at,
-    }
+    # exact count including deltas not rolled up yet
+    return {**_serialize(insight), "likes_count": current_likes(db, insight.id)}
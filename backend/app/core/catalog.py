@@ -0,0 +1,161 @@
+"""
+In-process cache of the read-mostly catalog tables: Grade, Subject,
+Language and School.
+
+The whole catalog is loaded at once (four small queries) into an
+immutable snapshot with dict lookups by id. It is reloaded after
+CATALOG_TTL_SEC, or on the next read after a session in this process
+commits a change to one of the catalog models. Other processes pick
+up changes within the TTL.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import CATALOG_TTL_SEC
+from app.models import Grade, Language, School, Subject
+
+_CATALOG_MODELS = (Grade, Subject, Language, School)
+
+
+@dataclass(frozen=True)
+class Catalog:
+    grades: dict[int, str] = field(default_factory=dict)
+    subjects: dict[str, str] = field(default_factory=dict)
+    languages: dict[str, str] = field(default_factory=dict)
+    # /schools response, already sorted by name
+    schools: list[dict] = field(default_factory=list)
+
+    def grade_label(self, grade_id) -> Optional[str]:
+        return self.grades.get(grade_id)
+
+    def subject_name(self, subject_id) -> Optional[str]:
+        return self.subjects.get(str(subject_id))
+
+    def language_name(self, language_id) -> Optional[str]:
+        return self.languages.get(str(language_id))
+
+
+def load_catalog(db: Session) -> Catalog:
+    schools = db.query(School).order_by(School.name).all()
+    return Catalog(
+        grades={g.id: g.label for g in db.query(Grade).all()},
+        subjects={str(s.id): s.name for s in db.query(Subject).all()},
+        languages={str(l.id): l.name for l in db.query(Language).all()},
+        schools=[
+            {"id": str(s.id), "name": s.name, "location": s.location}
+            for s in schools
+        ],
+    )
+
+
+class CatalogCache:
+    def __init__(
+        self,
+        ttl_sec: float = CATALOG_TTL_SEC,
+        loader: Callable[[Session], Catalog] = load_catalog,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_sec = ttl_sec
+        self.loader = loader
+        self.clock = clock
+        self._catalog: Optional[Catalog] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def _fresh(self) -> Optional[Catalog]:
+        # read once: invalidate() may clear the attribute concurrently
+        catalog, loaded_at = self._catalog, self._loaded_at
+        if catalog is not None and self.clock() - loaded_at < self.ttl_sec:
+            return catalog
+        return None
+
+    def get(self, db: Session) -> Catalog:
+        catalog = self._fresh()
+        if catalog is not None:
+            with self._state_lock:
+                self.hits += 1
+            return catalog
+
+        # one reload at a time; concurrent readers wait and reuse it
+        with self._lock:
+            catalog = self._fresh()
+            if catalog is not None:
+                with self._state_lock:
+                    self.hits += 1
+                return catalog
+            generation = self._generation
+            catalog = self.loader(db)
+            self.loads += 1
+            with self._state_lock:
+                if generation == self._generation:
+                    self._loaded_at = self.clock()
+                    self._catalog = catalog
+            return catalog
+
+    def invalidate(self) -> None:
+        # not self._lock: that is held for the whole reload query. Bumping
+        # the generation first keeps an in-flight reload from storing a
+        # catalog that predates the write.
+        with self._state_lock:
+            self._generation += 1
+            self._catalog = None
+
+    def stats(self) -> dict:
+        catalog = self._catalog
+        return {
+            "loaded": catalog is not None,
+            "age_sec": round(self.clock() - self._loaded_at, 1) if catalog else None,
+            "hits": self.hits,
+            "loads": self.loads,
+        }
+
+
+@lru_cache
+def get_catalog_cache() -> CatalogCache:
+    return CatalogCache()
+
+
+def warm_catalog(session_factory: Callable[[], Session]) -> None:
+    """Load the catalog before the first request; failures are retried lazily."""
+    try:
+        with session_factory() as db:
+            get_catalog_cache().get(db)
+    except Exception as e:
+        print(f"[catalog] warm load failed: {e}")
+
+
+# ---------- Write-driven invalidation ----------
+
+_DIRTY_KEY = "catalog_dirty"
+
+
+@event.listens_for(Session, "after_flush")
+def _note_catalog_writes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _CATALOG_MODELS):
+            session.info[_DIRTY_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_catalog(session):
+    if session.info.pop(_DIRTY_KEY, False):
+        get_catalog_cache().invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_catalog_writes(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,62 @@
+"""
+Optional /api/coach fast path: when the teacher's problem closely
+matches a well-liked teaching insight for the same grade and subject,
+its solution is returned as the answer and the LLM is not called.
+
+The candidates are the insights already retrieved for the prompt (see
+insight_index.py), so a lookup costs no extra query. Likes are the
+rolled-up likes_count (like_counters.py), which may lag by one rollup.
+"""
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import (
+    COACH_FAST_PATH_MIN_LIKES,
+    COACH_FAST_PATH_MIN_SIMILARITY,
+)
+from app.models.conversations import TeachingInsight
+
+
+class CoachFastPath:
+    def __init__(
+        self,
+        min_similarity: float = COACH_FAST_PATH_MIN_SIMILARITY,
+        min_likes: int = COACH_FAST_PATH_MIN_LIKES,
+    ):
+        self.min_similarity = min_similarity
+        self.min_likes = min_likes
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def match(self, candidates: list[tuple[TeachingInsight, float]]) -> Optional[TeachingInsight]:
+        """Best candidate over both thresholds, if any; counted for the hit ratio."""
+        found = next(
+            (
+                insight for insight, score in candidates
+                if score >= self.min_similarity and insight.likes_count >= self.min_likes
+            ),
+            None,
+        )
+        with self._lock:
+            self.lookups += 1
+            self.hits += found is not None
+        return found
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_ratio": self.hits / self.lookups if self.lookups else 0.0,
+                "min_similarity": self.min_similarity,
+                "min_likes": self.min_likes,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_coach_fast_path() -> CoachFastPath:
+    return CoachFastPath()
@@ -1,3 +1,115 @@
 import os
 
+from dotenv import load_dotenv
+
+# Every setting below is read at import time, and this module is often
+# imported before app.db.session, so backend/.env is loaded here.
+load_dotenv()
+
+# One provider name, or a comma-separated list to route between
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "pollinations")
+
+# Upstream call timeout, circuit breaker and bulkhead (per provider)
+LLM_TIMEOUT_SEC = float(os.getenv("LLM_TIMEOUT_SEC", "30"))
+LLM_BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+LLM_BREAKER_OPEN_SEC = float(os.getenv("LLM_BREAKER_OPEN_SEC", "30"))
+LLM_BULKHEAD_MAX_CONCURRENT = int(os.getenv("LLM_BULKHEAD_MAX_CONCURRENT", "32"))
+
+# Offline stub provider (LLM_PROVIDER=stub)
+LLM_STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "200"))
+LLM_STUB_TOKENS_PER_SEC = float(os.getenv("LLM_STUB_TOKENS_PER_SEC", "50"))
+
+# Router (only used when LLM_PROVIDER lists several providers)
+LLM_HEDGE_DELAY_SEC = float(os.getenv("LLM_HEDGE_DELAY_SEC", "2.0"))
+LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "100"))
+
+# LLM response cache: "memory" | "sqlite" | "none"
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+LLM_CACHE_TTL_SEC = int(os.getenv("LLM_CACHE_TTL_SEC", "3600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+
+# Near-duplicate prompt cache in front of the LLM (see semantic_cache.py)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+SEMANTIC_CACHE_MAX_PER_SCOPE = int(os.getenv("SEMANTIC_CACHE_MAX_PER_SCOPE", "256"))
+SEMANTIC_CACHE_MAX_SCOPES = int(os.getenv("SEMANTIC_CACHE_MAX_SCOPES", "64"))
+
+# Prompt token budget (see prompt_builder.py)
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "1000"))
+PROMPT_MAX_RAW_TOKENS = int(os.getenv("PROMPT_MAX_RAW_TOKENS", "400"))
+PROMPT_MAX_HISTORY_TOKENS = int(os.getenv("PROMPT_MAX_HISTORY_TOKENS", "120"))
+PROMPT_MAX_WORKED_SOLUTIONS = int(os.getenv("PROMPT_MAX_WORKED_SOLUTIONS", "5"))
+PROMPT_MAX_INSIGHT_TOKENS = int(os.getenv("PROMPT_MAX_INSIGHT_TOKENS", "80"))
+
+# Teaching-insight job queue (see insight_jobs.py / scripts/insight_worker.py)
+INSIGHT_JOB_MAX_ATTEMPTS = int(os.getenv("INSIGHT_JOB_MAX_ATTEMPTS", "5"))
+INSIGHT_JOB_BACKOFF_BASE_SEC = float(os.getenv("INSIGHT_JOB_BACKOFF_BASE_SEC", "10"))
+INSIGHT_JOB_BACKOFF_MAX_SEC = float(os.getenv("INSIGHT_JOB_BACKOFF_MAX_SEC", "600"))
+INSIGHT_JOB_STALE_SEC = int(os.getenv("INSIGHT_JOB_STALE_SEC", "300"))
+INSIGHT_WORKER_CONCURRENCY = int(os.getenv("INSIGHT_WORKER_CONCURRENCY", "4"))
+INSIGHT_WORKER_POLL_SEC = float(os.getenv("INSIGHT_WORKER_POLL_SEC", "2"))
+
+# Resolve teacher context with one joined query instead of one per table
+CONTEXT_SINGLE_QUERY = os.getenv("CONTEXT_SINGLE_QUERY", "1") == "1"
+
+# Per-teacher context cache for /api/coach (see context_cache.py)
+CONTEXT_CACHE_ENABLED = os.getenv("CONTEXT_CACHE_ENABLED", "1") == "1"
+CONTEXT_CACHE_TTL_SEC = float(os.getenv("CONTEXT_CACHE_TTL_SEC", "300"))
+CONTEXT_CACHE_MAX_ENTRIES = int(os.getenv("CONTEXT_CACHE_MAX_ENTRIES", "2048"))
+
+# Solution ids kept per kind in teacher_outcome_summaries
+OUTCOME_SUMMARY_RECENT = int(os.getenv("OUTCOME_SUMMARY_RECENT", "20"))
+
+# Grade/Subject/Language/School lookups (see catalog.py)
+CATALOG_TTL_SEC = float(os.getenv("CATALOG_TTL_SEC", "600"))
+
+# Multi-turn threads (see conversation_thread.py): recent messages sent
+# verbatim, older ones folded into a rolling summary in batches
+CONVERSATION_WINDOW_MESSAGES = int(os.getenv("CONVERSATION_WINDOW_MESSAGES", "6"))
+CONVERSATION_SUMMARY_BATCH = int(os.getenv("CONVERSATION_SUMMARY_BATCH", "6"))
+CONVERSATION_SUMMARY_MAX_TOKENS = int(os.getenv("CONVERSATION_SUMMARY_MAX_TOKENS", "200"))
+CONVERSATION_MAX_TURN_TOKENS = int(os.getenv("CONVERSATION_MAX_TURN_TOKENS", "250"))
+CONVERSATION_MAX_PROMPT_TOKENS = int(os.getenv("CONVERSATION_MAX_PROMPT_TOKENS", "2000"))
+
+# Precomputed insight feed ranking (see feed_ranking.py)
+FEED_HALF_LIFE_DAYS = float(os.getenv("FEED_HALF_LIFE_DAYS", "14"))
+FEED_RANK_DEPTH = int(os.getenv("FEED_RANK_DEPTH", "500"))
+FEED_WEIGHT_GRADE = float(os.getenv("FEED_WEIGHT_GRADE", "3"))
+FEED_WEIGHT_SUBJECT = float(os.getenv("FEED_WEIGHT_SUBJECT", "3"))
+FEED_WEIGHT_LANGUAGE = float(os.getenv("FEED_WEIGHT_LANGUAGE", "1"))
+FEED_WEIGHT_LIKES = float(os.getenv("FEED_WEIGHT_LIKES", "1"))
+# smaller score changes are not written back (ln scale, ~1% relative)
+FEED_RESCORE_MIN_DELTA = float(os.getenv("FEED_RESCORE_MIN_DELTA", "0.01"))
+
+# Near-duplicate insight merging (see insight_dedup.py). Changing the
+# permutation count or band count needs scripts/rebuild_insight_dedup.py
+INSIGHT_DEDUP_ENABLED = os.getenv("INSIGHT_DEDUP_ENABLED", "1") == "1"
+INSIGHT_DEDUP_THRESHOLD = float(os.getenv("INSIGHT_DEDUP_THRESHOLD", "0.8"))
+MINHASH_PERMUTATIONS = int(os.getenv("MINHASH_PERMUTATIONS", "128"))
+MINHASH_BANDS = int(os.getenv("MINHASH_BANDS", "16"))
+
+# Sharded like counters (see like_counters.py / scripts/rollup_likes.py)
+LIKE_COUNTER_SHARDS = int(os.getenv("LIKE_COUNTER_SHARDS", "16"))
+LIKE_ROLLUP_INTERVAL_SEC = float(os.getenv("LIKE_ROLLUP_INTERVAL_SEC", "30"))
+
+# Community insights retrieved into /api/coach prompts (see insight_index.py)
+INSIGHT_RETRIEVAL_ENABLED = os.getenv("INSIGHT_RETRIEVAL_ENABLED", "1") == "1"
+INSIGHT_RETRIEVAL_K = int(os.getenv("INSIGHT_RETRIEVAL_K", "3"))
+INSIGHT_RETRIEVAL_MIN_SCORE = float(os.getenv("INSIGHT_RETRIEVAL_MIN_SCORE", "0.2"))
+INSIGHT_INDEX_DIM = int(os.getenv("INSIGHT_INDEX_DIM", "256"))
+INSIGHT_INDEX_REFRESH_SEC = float(os.getenv("INSIGHT_INDEX_REFRESH_SEC", "30"))
+
+# Answer /api/coach straight from a close, well-liked insight (see coach_fast_path.py)
+COACH_FAST_PATH_ENABLED = os.getenv("COACH_FAST_PATH_ENABLED", "0") == "1"
+COACH_FAST_PATH_MIN_SIMILARITY = float(os.getenv("COACH_FAST_PATH_MIN_SIMILARITY", "0.85"))
+COACH_FAST_PATH_MIN_LIKES = int(os.getenv("COACH_FAST_PATH_MIN_LIKES", "5"))
+
+# Rendered feed pages cached per segment/cursor (see feed_cache.py)
+FEED_CACHE_ENABLED = os.getenv("FEED_CACHE_ENABLED", "1") == "1"
+FEED_CACHE_TTL_SEC = float(os.getenv("FEED_CACHE_TTL_SEC", "60"))
+FEED_CACHE_MAX_ENTRIES = int(os.getenv("FEED_CACHE_MAX_ENTRIES", "2048"))
+FEED_CACHE_CHECK_SEC = float(os.getenv("FEED_CACHE_CHECK_SEC", "5"))
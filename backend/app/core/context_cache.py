@@ -0,0 +1,134 @@
+"""
+Per-teacher cache of the teacher portion of ResolvedContext (profile,
+style, default class/subject, outcome history). Request fields such as
+raw_prompt and time_left_minutes are never cached; resolve_context()
+overlays them on every call.
+
+Entries are invalidated when a session commits a change to Teacher,
+TeacherStyle, TeacherClassSubject or TeacherSolutionOutcome. Only ORM
+writes in this process are seen (bulk `query.update()` / raw SQL and
+other workers are not), so the TTL bounds staleness for those.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import CONTEXT_CACHE_MAX_ENTRIES, CONTEXT_CACHE_TTL_SEC
+from app.models import (
+    Teacher, TeacherStyle, TeacherClassSubject, TeacherSolutionOutcome
+)
+
+
+class TeacherContextCache:
+    """LRU + TTL map of teacher_id -> profile dict."""
+
+    def __init__(
+        self,
+        max_entries: int = CONTEXT_CACHE_MAX_ENTRIES,
+        ttl_sec: float = CONTEXT_CACHE_TTL_SEC,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.clock = clock
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        # bumped on every invalidation so a load that raced a write
+        # is not stored over the newer data
+        self._generation: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_load(self, teacher_id, loader: Callable[[], dict]) -> dict:
+        key = str(teacher_id)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._data.pop(key, None)
+            self.misses += 1
+            generation = self._generation.get(key, 0)
+
+        profile = loader()
+
+        with self._lock:
+            if self._generation.get(key, 0) == generation:
+                self._data[key] = (self.clock() + self.ttl_sec, profile)
+                self._data.move_to_end(key)
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+        return profile
+
+    def invalidate(self, teacher_id) -> None:
+        key = str(teacher_id)
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation[key] = self._generation.get(key, 0) + 1
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+@lru_cache
+def get_context_cache() -> TeacherContextCache:
+    return TeacherContextCache()
+
+
+# ---------- Write-driven invalidation ----------
+
+_WATCHED = (TeacherStyle, TeacherClassSubject, TeacherSolutionOutcome)
+_PENDING_KEY = "context_cache_dirty_teachers"
+
+
+def _teacher_id_of(obj):
+    if isinstance(obj, Teacher):
+        return obj.id
+    if isinstance(obj, _WATCHED):
+        return obj.teacher_id
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_teachers(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        teacher_id = _teacher_id_of(obj)
+        if teacher_id is not None:
+            pending.add(teacher_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dirty_teachers(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        cache = get_context_cache()
+        for teacher_id in pending:
+            cache.invalidate(teacher_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_dirty_teachers(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
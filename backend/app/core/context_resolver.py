@@ -1,14 +1,67 @@
 from sqlalchemy.orm import Session
 
+from app.core.catalog import CatalogCache
+from app.core.context_cache import TeacherContextCache
 from app.core.context_schema import (
     ResolvedContext, TeacherCtx, TeacherStyleCtx,
     ClassroomCtx, ConstraintsCtx, HistoryCtx
 )
 from app.models import (
-    Teacher, TeacherStyle, TeacherClassSubject,
-    TeacherSolutionOutcome, SolutionOutcome
+    Teacher, TeacherStyle, TeacherClassSubject, TeacherOutcomeSummary
 )
-from app.core.db_fetchers import first_by_id, first_by_field, all_by_field
+from app.core.db_fetchers import (
+    DEFAULT_CLASS_ORDER, first_by_id, first_by_field, fetch_teacher_context
+)
+
+
+def _load_profile(db: Session, teacher_id: str, need_default_class: bool) -> dict:
+    """Teacher portion of the context, one query per table."""
+    teacher = first_by_id(db, Teacher, teacher_id)
+    style = first_by_field(db, TeacherStyle, TeacherStyle.teacher_id, teacher_id)
+
+    tcs = None
+    if need_default_class:
+        tcs = first_by_field(
+            db, TeacherClassSubject, TeacherClassSubject.teacher_id, teacher_id,
+            order_by=DEFAULT_CLASS_ORDER,
+        )
+
+    # recent ids are stored newest first, so prompt budgeting keeps the
+    # freshest history; cost does not grow with the teacher's history
+    summary = first_by_field(
+        db, TeacherOutcomeSummary, TeacherOutcomeSummary.teacher_id, teacher_id
+    )
+
+    return {
+        "years_experience": getattr(teacher, "years_experience", None),
+        "language": getattr(teacher, "language", None),
+        "interactive_vs_passive": style.interactive_vs_passive if style else None,
+        "light_vs_strict": style.light_vs_strict if style else None,
+        "conventional_vs_modern": style.conventional_vs_modern if style else None,
+        "has_style": style is not None,
+        "grade_id": tcs.grade_id if tcs else None,
+        "subject_id": tcs.subject_id if tcs else None,
+        "worked": summary.recent_worked if summary else [],
+        "failed": summary.recent_failed if summary else [],
+    }
+
+
+def _load_profile_single_query(db: Session, teacher_id: str) -> dict:
+    """Same shape as _load_profile(), in one round trip."""
+    row = fetch_teacher_context(db, teacher_id) or {}
+    return {
+        "years_experience": row.get("years_experience"),
+        "language": row.get("language"),
+        "interactive_vs_passive": row.get("interactive_vs_passive"),
+        "light_vs_strict": row.get("light_vs_strict"),
+        "conventional_vs_modern": row.get("conventional_vs_modern"),
+        # style columns are NOT NULL, so a NULL here means no style row
+        "has_style": row.get("interactive_vs_passive") is not None,
+        "grade_id": row.get("grade_id"),
+        "subject_id": row.get("subject_id"),
+        "worked": row.get("worked") or [],
+        "failed": row.get("failed") or [],
+    }
 
 
 def resolve_context(
@@ -19,25 +72,42 @@ def resolve_context(
     subject: str | None = None,
     language: str | None = None,
     time_left_minutes: int | None = None,
+    single_query: bool = False,
+    cache: TeacherContextCache | None = None,
+    catalog: CatalogCache | None = None,
 ) -> ResolvedContext:
+    """
+    `single_query=True` fetches the teacher portion with one joined
+    statement (see db_fetchers.fetch_teacher_context) instead of up to
+    four sequential queries.
 
-    teacher = first_by_id(db, Teacher, teacher_id)
-    style = first_by_field(db, TeacherStyle, TeacherStyle.teacher_id, teacher_id)
+    With a `cache`, the teacher portion is reused across calls and only
+    the request arguments below are applied fresh. With a `catalog`,
+    subject ids are turned into subject names for the prompt.
+    """
+    def load() -> dict:
+        if single_query:
+            return _load_profile_single_query(db, teacher_id)
+        # a cached profile must carry the default class for later callers
+        need_default_class = cache is not None or grade is None or subject is None
+        return _load_profile(db, teacher_id, need_default_class)
+
+    profile = cache.get_or_load(teacher_id, load) if cache else load()
 
     teacher_ctx = TeacherCtx(
-        years_experience=getattr(teacher, "years_experience", None),
-        preferred_language=language or getattr(teacher, "language", None),
+        years_experience=profile["years_experience"],
+        preferred_language=language or profile["language"],
         style=TeacherStyleCtx(
-            interactive_vs_passive=style.interactive_vs_passive,
-            light_vs_strict=style.light_vs_strict,
-            conventional_vs_modern=style.conventional_vs_modern,
-        ) if style else None
+            interactive_vs_passive=profile["interactive_vs_passive"],
+            light_vs_strict=profile["light_vs_strict"],
+            conventional_vs_modern=profile["conventional_vs_modern"],
+        ) if profile["has_style"] else None
     )
 
-    if grade is None or subject is None:
-        tcs = first_by_field(db, TeacherClassSubject, TeacherClassSubject.teacher_id, teacher_id)
-        grade = grade or (tcs.grade_id if tcs else None)
-        subject = subject or (tcs.subject_id if tcs else None)
+    grade = grade or profile["grade_id"]
+    subject = subject or profile["subject_id"]
+    if catalog is not None and subject:
+        subject = catalog.get(db).subject_name(subject) or subject
 
     classroom_ctx = ClassroomCtx(
         grade=grade,
@@ -45,16 +115,10 @@ def resolve_context(
         language=language
     )
 
-    outcomes = all_by_field(db, TeacherSolutionOutcome, TeacherSolutionOutcome.teacher_id, teacher_id)
-
-    worked, failed = [], []
-    for o in outcomes:
-        if o.outcome == SolutionOutcome.worked:
-            worked.append(str(o.solution_id))
-        elif o.outcome == SolutionOutcome.failed:
-            failed.append(str(o.solution_id))
-
-    history_ctx = HistoryCtx(worked_solutions=worked, failed_solutions=failed)
+    history_ctx = HistoryCtx(
+        worked_solutions=[str(s) for s in profile["worked"]],
+        failed_solutions=[str(s) for s in profile["failed"]],
+    )
 
     constraints_ctx = ConstraintsCtx(
         time_left_minutes=time_left_minutes,
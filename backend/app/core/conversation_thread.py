@@ -0,0 +1,175 @@
+"""
+Multi-turn conversation threads on top of conversation_messages.
+
+A follow-up prompt carries the conversation's stored context, a rolling
+summary of older messages and only the most recent messages verbatim.
+The summary is advanced in batches of CONVERSATION_SUMMARY_BATCH
+messages once they fall out of the CONVERSATION_WINDOW_MESSAGES window,
+so prompt size stays bounded however long a thread gets.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    CONVERSATION_SUMMARY_BATCH,
+    CONVERSATION_SUMMARY_MAX_TOKENS,
+    CONVERSATION_WINDOW_MESSAGES,
+)
+from app.core.context_schema import ResolvedContext
+from app.core.llm import LLMClient
+from app.core.prompt_builder import build_summary_prompt
+from app.core.token_budget import clip_to_tokens
+from app.models.conversations import Conversation, ConversationMessage, MessageRole
+
+
+@dataclass
+class Thread:
+    conversation_id: str
+    ctx: Optional[ResolvedContext]
+    summary: Optional[str]
+    # (role, content), oldest first
+    turns: list[tuple[str, str]] = field(default_factory=list)
+
+
+def load_thread(db: Session, conversation_id, teacher_id) -> Optional[Thread]:
+    """The teacher's conversation with its prompt window, or None."""
+    convo = (
+        db.query(Conversation)
+        .filter(Conversation.id == conversation_id, Conversation.teacher_id == teacher_id)
+        .first()
+    )
+    if convo is None:
+        return None
+
+    try:
+        ctx = ResolvedContext.model_validate(convo.resolved_context)
+    except ValidationError:
+        ctx = None   # empty shell from POST /api/conversations
+
+    # Everything not yet summarized, bounded in case summaries lag behind
+    rows = (
+        db.query(ConversationMessage.role, ConversationMessage.content)
+        .filter(
+            ConversationMessage.conversation_id == convo.id,
+            ConversationMessage.seq > convo.summarized_through,
+        )
+        .order_by(ConversationMessage.seq.desc())
+        .limit(CONVERSATION_WINDOW_MESSAGES + CONVERSATION_SUMMARY_BATCH)
+        .all()
+    )
+    return Thread(
+        conversation_id=str(convo.id),
+        ctx=ctx,
+        summary=convo.summary,
+        turns=[(r.role.value, r.content) for r in reversed(rows)],
+    )
+
+
+def append_turn(
+    db: Session,
+    conversation_id,
+    prompt: str,
+    reply: str,
+    prompt_tokens: Optional[int] = None,
+    ctx: Optional[ResolvedContext] = None,
+) -> dict:
+    """
+    Append the teacher's message and the reply, and point the
+    conversation's preview at the latest reply. Returns the new seq
+    numbers and whether older messages are due for summarizing.
+    """
+    # row lock serializes seq allocation per conversation
+    convo = db.query(Conversation).filter(Conversation.id == conversation_id).with_for_update().one()
+    last_seq = (
+        db.query(func.coalesce(func.max(ConversationMessage.seq), 0))
+        .filter(ConversationMessage.conversation_id == convo.id)
+        .scalar()
+    )
+
+    db.add(ConversationMessage(
+        conversation_id=convo.id, seq=last_seq + 1, role=MessageRole.teacher, content=prompt,
+    ))
+    db.add(ConversationMessage(
+        conversation_id=convo.id, seq=last_seq + 2, role=MessageRole.assistant, content=reply,
+    ))
+
+    if not convo.raw_query:
+        convo.raw_query = prompt
+    if ctx is not None and not convo.resolved_context:
+        convo.resolved_context = ctx.model_dump()
+    convo.ai_response = reply
+    convo.prompt_tokens = prompt_tokens
+
+    last_seq += 2
+    unsummarized = last_seq - CONVERSATION_WINDOW_MESSAGES - convo.summarized_through
+    saved = {
+        "conversation_id": str(convo.id),
+        "seq": last_seq,
+        "needs_summary": unsummarized >= CONVERSATION_SUMMARY_BATCH,
+    }
+    db.commit()
+    return saved
+
+
+def refresh_summary(db: Session, conversation_id, llm: LLMClient) -> bool:
+    """
+    Fold messages that have left the window into the rolling summary.
+    Safe to run concurrently: only one writer advances a given
+    `summarized_through`. Returns True if the summary moved.
+    """
+    convo = db.get(Conversation, conversation_id)
+    if convo is None:
+        return False
+
+    start = convo.summarized_through
+    last_seq = (
+        db.query(func.coalesce(func.max(ConversationMessage.seq), 0))
+        .filter(ConversationMessage.conversation_id == convo.id)
+        .scalar()
+    )
+    cutoff = last_seq - CONVERSATION_WINDOW_MESSAGES
+    if cutoff - start < CONVERSATION_SUMMARY_BATCH:
+        return False
+
+    rows = (
+        db.query(ConversationMessage.role, ConversationMessage.content)
+        .filter(
+            ConversationMessage.conversation_id == convo.id,
+            ConversationMessage.seq > start,
+            ConversationMessage.seq <= cutoff,
+        )
+        .order_by(ConversationMessage.seq)
+        .all()
+    )
+    previous = convo.summary
+    db.commit()   # end the read transaction; don't hold it across the LLM call
+
+    summary = llm.generate(
+        build_summary_prompt(previous, [(r.role.value, r.content) for r in rows])
+    ).strip()
+    summary = clip_to_tokens(summary, CONVERSATION_SUMMARY_MAX_TOKENS)
+
+    result = db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id, Conversation.summarized_through == start)
+        # keep updated_at: summarizing is not activity in the history list
+        .values(summary=summary, summarized_through=cutoff, updated_at=Conversation.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def refresh_summary_in_background(
+    conversation_id, session_factory: Callable[[], Session], llm: LLMClient
+) -> None:
+    """BackgroundTasks entry point; failures only delay the summary."""
+    try:
+        with session_factory() as db:
+            refresh_summary(db, conversation_id, llm)
+    except Exception as e:
+        print(f"[conversation-summary] {conversation_id}: {e}")
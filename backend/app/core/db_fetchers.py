@@ -1,14 +1,63 @@
 from __future__ import annotations
 from typing import Optional, Type, TypeVar
+from sqlalchemy import select, true
 from sqlalchemy.orm import Session
 
+from app.models import (
+    Teacher, TeacherStyle, TeacherClassSubject, TeacherOutcomeSummary
+)
+
 T = TypeVar("T")
 
 def first_by_id(db: Session, model: Type[T], id_value) -> Optional[T]:
     return db.query(model).filter(model.id == id_value).first()
 
-def first_by_field(db: Session, model: Type[T], field, value) -> Optional[T]:
-    return db.query(model).filter(field == value).first()
+def first_by_field(db: Session, model: Type[T], field, value, order_by=()) -> Optional[T]:
+    return db.query(model).filter(field == value).order_by(*order_by).first()
+
+def all_by_field(db: Session, model: Type[T], field, value, order_by=None) -> list[T]:
+    query = db.query(model).filter(field == value)
+    if order_by is not None:
+        query = query.order_by(order_by)
+    return query.all()
+
+
+# a teacher's default class is their oldest; id breaks ties so both
+# context paths always agree
+DEFAULT_CLASS_ORDER = (TeacherClassSubject.created_at, TeacherClassSubject.id)
+
 
-def all_by_field(db: Session, model: Type[T], field, value) -> list[T]:
-    return db.query(model).filter(field == value).all()
+def fetch_teacher_context(db: Session, teacher_id) -> Optional[dict]:
+    """
+    Everything resolve_context() needs about a teacher in one statement:
+    profile, style, default class/subject and recent worked/failed solution
+    ids from the outcome summary.
+    Returns None if the teacher does not exist.
+    """
+    default_class = (
+        select(TeacherClassSubject.grade_id, TeacherClassSubject.subject_id)
+        .where(TeacherClassSubject.teacher_id == Teacher.id)
+        .order_by(*DEFAULT_CLASS_ORDER)
+        .limit(1)
+        .lateral("default_class")
+    )
+    stmt = (
+        select(
+            Teacher.years_experience,
+            Teacher.language,
+            TeacherStyle.interactive_vs_passive,
+            TeacherStyle.light_vs_strict,
+            TeacherStyle.conventional_vs_modern,
+            default_class.c.grade_id,
+            default_class.c.subject_id,
+            TeacherOutcomeSummary.recent_worked.label("worked"),
+            TeacherOutcomeSummary.recent_failed.label("failed"),
+        )
+        .select_from(Teacher)
+        .outerjoin(TeacherStyle, TeacherStyle.teacher_id == Teacher.id)
+        .outerjoin(default_class, true())
+        .outerjoin(TeacherOutcomeSummary, TeacherOutcomeSummary.teacher_id == Teacher.id)
+        .where(Teacher.id == teacher_id)
+    )
+    row = db.execute(stmt).mappings().first()
+    return dict(row) if row else None
@@ -0,0 +1,107 @@
+"""
+Streaming NDJSON export of conversations and teaching insights.
+
+Rows are read with `yield_per`, which on Postgres uses a server-side
+cursor, and encoded one line at a time, so memory stays at roughly one
+batch regardless of table size. Optional gzip is applied incrementally.
+"""
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.conversations import Conversation, TeachingInsight
+
+EXPORT_BATCH_SIZE = 1000
+
+_CONVERSATION_COLUMNS = (
+    Conversation.id,
+    Conversation.teacher_id,
+    Conversation.title,
+    Conversation.raw_query,
+    Conversation.ai_response,
+    Conversation.resolved_context,
+    Conversation.worked,
+    Conversation.prompt_tokens,
+    Conversation.created_at,
+    Conversation.updated_at,
+)
+
+_INSIGHT_COLUMNS = (
+    TeachingInsight.id,
+    TeachingInsight.title,
+    TeachingInsight.generalized_context,
+    TeachingInsight.reframed_problem,
+    TeachingInsight.reframed_solution,
+    TeachingInsight.likes_count,
+    TeachingInsight.support_count,
+    TeachingInsight.created_at,
+)
+
+
+def _stream(db: Session, stmt, batch_size: int) -> Iterator[dict]:
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for row in result.mappings():
+        yield dict(row)
+
+
+def iter_conversations(
+    db: Session,
+    teacher_id=None,
+    since: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[dict]:
+    stmt = select(*_CONVERSATION_COLUMNS).order_by(Conversation.created_at, Conversation.id)
+    if teacher_id is not None:
+        stmt = stmt.where(Conversation.teacher_id == teacher_id)
+    if since is not None:
+        stmt = stmt.where(Conversation.updated_at >= since)
+    return _stream(db, stmt, batch_size)
+
+
+def iter_insights(
+    db: Session,
+    since: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[dict]:
+    stmt = select(*_INSIGHT_COLUMNS).order_by(TeachingInsight.created_at, TeachingInsight.id)
+    if since is not None:
+        stmt = stmt.where(TeachingInsight.created_at >= since)
+    return _stream(db, stmt, batch_size)
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)   # UUIDs
+
+
+def ndjson_lines(rows: Iterable[dict]) -> Iterator[bytes]:
+    for row in rows:
+        yield (json.dumps(row, default=_default, ensure_ascii=False) + "\n").encode()
+
+
+def gzip_chunks(chunks: Iterable[bytes], min_chunk: int = 64 * 1024) -> Iterator[bytes]:
+    """Incremental gzip; emits compressed output in ~min_chunk pieces."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    pending = []
+    size = 0
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            pending.append(out)
+            size += len(out)
+        if size >= min_chunk:
+            yield b"".join(pending)
+            pending, size = [], 0
+    pending.append(compressor.flush())
+    yield b"".join(pending)
+
+
+EXPORTERS = {
+    "conversations": iter_conversations,
+    "insights": iter_insights,
+}
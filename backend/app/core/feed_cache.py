@@ -0,0 +1,153 @@
+"""
+In-process cache of rendered teaching-insight feed pages.
+
+Pages are stored as the exact JSON bytes sent to the client, together
+with their X-Next-Cursor. A hit therefore skips both the ranking query
+and serialization. Keys are (segment key, cursor, limit). Each
+teacher's resolved segment key is cached too, so a hit needs no
+database round trip at all.
+
+Rankings are written by other processes: the insight worker and the
+like rollup. To notice their writes, the cache polls the single-row
+insight_feed_ranking_version counter at most every FEED_CACHE_CHECK_SEC,
+and clears itself when the value moves. Triggers bump the counter in
+the same transaction as any insert, update or delete of ranking rows,
+cascaded deletes included. It therefore changes exactly when a ranking
+change is committed, whatever order transactions start in.
+feed_ranking only rewrites a score when it changes by more than
+FEED_RESCORE_MIN_DELTA, so a trickle of likes does not keep flushing
+pages. Entries also expire after FEED_CACHE_TTL_SEC.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    FEED_CACHE_CHECK_SEC,
+    FEED_CACHE_MAX_ENTRIES,
+    FEED_CACHE_TTL_SEC,
+)
+from app.models.conversations import InsightFeedRankingVersion
+
+Page = tuple[bytes, Optional[str]]
+
+
+class FeedPageCache:
+    """LRU + TTL map of feed page key -> (JSON bytes, next cursor)."""
+
+    def __init__(
+        self,
+        max_entries: int = FEED_CACHE_MAX_ENTRIES,
+        ttl_sec: float = FEED_CACHE_TTL_SEC,
+        check_sec: float = FEED_CACHE_CHECK_SEC,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.check_sec = check_sec
+        self.clock = clock
+        self._pages: OrderedDict[tuple, tuple[float, Page]] = OrderedDict()
+        self._segments: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._version = None
+        self._checked_at: Optional[float] = None
+        # bumped on every clear so a page rendered from older rankings
+        # is not stored after the clear
+        self.generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # ----- invalidation -----
+
+    def sync(self, db: Session) -> None:
+        """Clear everything if the rankings changed since the last check."""
+        now = self.clock()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_sec:
+                return
+            self._checked_at = now
+
+        version = db.execute(select(InsightFeedRankingVersion.version)).scalar()
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._clear_locked()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear_locked()
+
+    def _clear_locked(self) -> None:
+        if self._pages or self._segments:
+            self.invalidations += 1
+        self.generation += 1
+        self._pages.clear()
+        self._segments.clear()
+
+    # ----- lookups -----
+
+    def _get(self, store: OrderedDict, key):
+        entry = store.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            del store[key]
+            return None
+        store.move_to_end(key)
+        return entry[1]
+
+    def _put(self, store: OrderedDict, key, value) -> None:
+        store[key] = (self.clock() + self.ttl_sec, value)
+        store.move_to_end(key)
+        while len(store) > self.max_entries:
+            store.popitem(last=False)
+
+    def segment_for(self, teacher_id) -> Optional[str]:
+        with self._lock:
+            return self._get(self._segments, str(teacher_id))
+
+    def remember_segment(self, teacher_id, key: str, generation: int) -> None:
+        with self._lock:
+            if generation == self.generation:
+                self._put(self._segments, str(teacher_id), key)
+
+    def get_page(self, key: str, cursor: Optional[str], limit: int) -> Optional[Page]:
+        with self._lock:
+            page = self._get(self._pages, (key, cursor or "", limit))
+            if page is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return page
+
+    def put_page(
+        self, key: str, cursor: Optional[str], limit: int, page: Page, generation: int
+    ) -> None:
+        with self._lock:
+            if generation == self.generation:
+                self._put(self._pages, (key, cursor or "", limit), page)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "pages": len(self._pages),
+                "teachers": len(self._segments),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_feed_cache() -> FeedPageCache:
+    return FeedPageCache()
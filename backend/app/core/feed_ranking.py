@@ -0,0 +1,223 @@
+"""
+Personalized teaching-insight feed, precomputed per audience segment.
+
+A segment is (grade, subject, language), normalized to a string key such
+as "6|mathematics|hindi"; unknown parts are left empty. Each insight is
+scored against each active segment:
+
+    base  = grade/subject/language match weights + likes weight * log1p(likes) + 1
+    score = ln(base) + ln(2) * age_from_epoch_days / FEED_HALF_LIFE_DAYS
+
+The time term is measured from a fixed epoch rather than from "now".
+Exponential decay scales every insight by the same factor as time
+passes, so the ordering this gives is the same as decaying from now.
+Stored scores therefore never go stale. They only need rewriting when
+an insight is created or its likes change (refresh_insight_rankings),
+or when a new segment appears (refresh_segments / the refresh script).
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.catalog import get_catalog_cache
+from app.core.config import (
+    FEED_HALF_LIFE_DAYS,
+    FEED_RANK_DEPTH,
+    FEED_RESCORE_MIN_DELTA,
+    FEED_WEIGHT_GRADE,
+    FEED_WEIGHT_LANGUAGE,
+    FEED_WEIGHT_LIKES,
+    FEED_WEIGHT_SUBJECT,
+)
+from app.core.db_fetchers import fetch_teacher_context
+from app.models import Subject, Teacher, TeacherClassSubject
+from app.models.conversations import InsightFeedRanking, TeachingInsight
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+Segment = tuple[str, str, str]
+
+
+# ---------- Segments ----------
+
+def _norm_grade(value) -> str:
+    # "Grade 6", "6", 6 -> "6"
+    match = re.search(r"\d+", str(value)) if value is not None else None
+    return match.group(0) if match else ""
+
+
+def _norm(value) -> str:
+    return str(value).strip().lower() if value else ""
+
+
+def make_segment(grade, subject, language) -> Segment:
+    return (_norm_grade(grade), _norm(subject), _norm(language))
+
+
+def segment_key(segment: Segment) -> str:
+    return "|".join(segment)
+
+
+def insight_segment(generalized_context: Optional[dict]) -> Segment:
+    ctx = generalized_context or {}
+    return make_segment(ctx.get("grade"), ctx.get("subject"), ctx.get("language"))
+
+
+def teacher_segment(db: Session, teacher_id) -> Segment:
+    """The teacher's default class/subject and language, as for coach prompts."""
+    row = fetch_teacher_context(db, teacher_id) or {}
+    subject = row.get("subject_id")
+    if subject is not None:
+        subject = get_catalog_cache().get(db).subject_name(subject)
+    return make_segment(row.get("grade_id"), subject, row.get("language"))
+
+
+def active_segments(db: Session) -> set[Segment]:
+    """Every segment some teacher belongs to, plus the empty fallback."""
+    rows = db.execute(
+        select(TeacherClassSubject.grade_id, Subject.name, Teacher.language)
+        .select_from(Teacher)
+        .outerjoin(TeacherClassSubject, TeacherClassSubject.teacher_id == Teacher.id)
+        .outerjoin(Subject, Subject.id == TeacherClassSubject.subject_id)
+        .distinct()
+    ).all()
+    return {make_segment(*row) for row in rows} | {("", "", "")}
+
+
+# ---------- Scoring ----------
+
+def score(segment: Segment, insight: Segment, likes: int, created_at: datetime) -> float:
+    grade, subject, language = segment
+    base = 1.0 + FEED_WEIGHT_LIKES * math.log1p(max(likes, 0))
+    if grade and grade == insight[0]:
+        base += FEED_WEIGHT_GRADE
+    if subject and subject == insight[1]:
+        base += FEED_WEIGHT_SUBJECT
+    if language and language == insight[2]:
+        base += FEED_WEIGHT_LANGUAGE
+    age_days = (created_at - EPOCH).total_seconds() / 86400
+    return math.log(base) + math.log(2) * age_days / FEED_HALF_LIFE_DAYS
+
+
+_INSIGHT_COLUMNS = (
+    TeachingInsight.id,
+    TeachingInsight.generalized_context,
+    TeachingInsight.likes_count,
+    TeachingInsight.created_at,
+)
+
+
+# ---------- Refresh ----------
+
+def refresh_segments(
+    db: Session,
+    segments: Optional[Iterable[Segment]] = None,
+    depth: int = FEED_RANK_DEPTH,
+) -> int:
+    """
+    Full recompute of the top `depth` insights for `segments` (default:
+    all active ones) in one streaming pass over teaching_insights.
+    Caller commits. Returns rows written.
+    """
+    segments = list(segments if segments is not None else active_segments(db))
+    tops: dict[Segment, list] = {s: [] for s in segments}
+
+    rows = db.execute(select(*_INSIGHT_COLUMNS).execution_options(yield_per=1000))
+    for insight_id, ctx, likes, created_at in rows:
+        target = insight_segment(ctx)
+        for segment, heap in tops.items():
+            entry = (score(segment, target, likes, created_at), str(insight_id), insight_id)
+            if len(heap) < depth:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    keys = [segment_key(s) for s in segments]
+    db.execute(delete(InsightFeedRanking).where(InsightFeedRanking.segment.in_(keys)))
+    values = [
+        {"segment": segment_key(segment), "teaching_insight_id": insight_id, "score": value}
+        for segment, heap in tops.items()
+        for value, _, insight_id in heap
+    ]
+    if values:
+        db.execute(insert(InsightFeedRanking), values)
+    return len(values)
+
+
+def refresh_insight_rankings(db: Session, insight_id) -> int:
+    """
+    Rescore one insight in every segment that already has a ranking
+    (after it is created or its likes change). Lists may briefly exceed
+    FEED_RANK_DEPTH until the next full refresh trims them. Existing rows
+    are only rewritten when the score moves by more than
+    FEED_RESCORE_MIN_DELTA, which keeps feed caches (feed_cache.py) from
+    being flushed by immaterial like changes. Caller commits.
+    """
+    insight = db.execute(
+        select(*_INSIGHT_COLUMNS).where(TeachingInsight.id == insight_id)
+    ).first()
+    if insight is None:
+        return 0
+
+    keys = db.execute(select(InsightFeedRanking.segment).distinct()).scalars().all()
+    if not keys:
+        return 0
+
+    target = insight_segment(insight.generalized_context)
+    values = [
+        {
+            "segment": key,
+            "teaching_insight_id": insight.id,
+            "score": score(tuple(key.split("|")), target, insight.likes_count, insight.created_at),
+        }
+        for key in keys
+    ]
+    stmt = insert(InsightFeedRanking).values(values)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[InsightFeedRanking.segment, InsightFeedRanking.teaching_insight_id],
+        set_={"score": stmt.excluded.score, "computed_at": stmt.excluded.computed_at},
+        where=func.abs(InsightFeedRanking.score - stmt.excluded.score) > FEED_RESCORE_MIN_DELTA,
+    ))
+    return len(values)
+
+
+# ---------- Serving ----------
+
+def ranked_segment_key(db: Session, segment: Segment) -> Optional[str]:
+    """The segment's key if it has a ranking, else the generic one's, else None."""
+    for key in (segment_key(segment), segment_key(("", "", ""))):
+        exists = db.execute(
+            select(InsightFeedRanking.segment).where(InsightFeedRanking.segment == key).limit(1)
+        ).first()
+        if exists:
+            return key
+    return None
+
+
+def ranked_page(
+    db: Session,
+    key: str,
+    limit: int,
+    after: Optional[tuple] = None,
+) -> list[tuple[TeachingInsight, float]]:
+    """One page of a segment's ranked list, best first, as an index range read."""
+    query = (
+        db.query(TeachingInsight, InsightFeedRanking.score)
+        .join(InsightFeedRanking, InsightFeedRanking.teaching_insight_id == TeachingInsight.id)
+        .filter(InsightFeedRanking.segment == key)
+        .order_by(InsightFeedRanking.score.desc(), InsightFeedRanking.teaching_insight_id.desc())
+    )
+    if after is not None:
+        query = query.filter(
+            tuple_(InsightFeedRanking.score, InsightFeedRanking.teaching_insight_id)
+            < tuple_(*after)
+        )
+    return query.limit(limit).all()
@@ -0,0 +1,220 @@
+"""
+Near-duplicate detection for teaching insights (MinHash + LSH).
+
+Each insight's problem + solution text is reduced to a set of word
+3-shingles and summarized by a MinHash signature of
+MINHASH_PERMUTATIONS 32-bit values. The fraction of equal positions
+between two signatures estimates the Jaccard similarity of their
+shingle sets.
+
+Signatures are split into MINHASH_BANDS bands. Each band is hashed,
+together with the insight's (grade, subject) scope, into a bucket, and
+the buckets are stored in insight_lsh_buckets, so a lookup is an
+indexed `(band, bucket) IN (...)` query. Including the scope means only
+insights for the same grade and subject can ever be merged; it is the
+same scope the feed segments and retrieval partitions use. Candidates
+are then verified against their stored signature. Near-duplicates at or
+above INSIGHT_DEDUP_THRESHOLD bump the existing insight's support_count
+instead of inserting a new row.
+
+Signatures are computed in-process with NumPy from fixed seeds, so they
+are comparable across workers and restarts.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    INSIGHT_DEDUP_THRESHOLD,
+    MINHASH_BANDS,
+    MINHASH_PERMUTATIONS,
+)
+from app.core.insight_index import index_scope
+from app.models.conversations import InsightLshBucket, TeachingInsight
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_SEED = 1
+
+_rng = np.random.RandomState(_SEED)
+_A = _rng.randint(1, int(_MERSENNE_PRIME), size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.randint(0, int(_MERSENNE_PRIME), size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# serializes check-then-insert across workers; held until commit
+_DEDUP_LOCK_KEY = 0x1D5EED
+
+
+def shingles(text: str, size: int = 3) -> set[str]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _hash32(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=4).digest(), "little")
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature (uint64 array holding 32-bit values)."""
+    sig = np.full(MINHASH_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    tokens = shingles(text)
+    if not tokens:
+        return sig
+    hashes = np.fromiter((_hash32(t) for t in tokens), dtype=np.uint64, count=len(tokens))
+    # (a*x + b) mod p, truncated to 32 bits; all permutations at once
+    permuted = ((hashes[:, None] * _A + _B) % _MERSENNE_PRIME) & _MAX_HASH
+    return np.minimum(sig, permuted.min(axis=0))
+
+
+def insight_text(problem: str, solution: str) -> str:
+    return f"{problem}\n{solution}"
+
+
+def similarity(a, b) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(np.asarray(a, dtype=np.uint64) == np.asarray(b, dtype=np.uint64)))
+
+
+def insight_scope(generalized_context: Optional[dict]) -> tuple[str, str]:
+    ctx = generalized_context or {}
+    return index_scope(ctx.get("grade"), ctx.get("subject"))
+
+
+def band_buckets(sig: np.ndarray, scope: tuple[str, str] = ("", "")) -> list[tuple[int, int]]:
+    """
+    (band, bucket) pairs; bucket is a signed 64-bit hash of the scope and
+    the band's rows, so different scopes never share a bucket.
+    """
+    prefix = "\x1f".join(scope).encode() + b"\x00"
+    rows = len(sig) // MINHASH_BANDS
+    return [
+        (
+            band,
+            int.from_bytes(
+                hashlib.blake2b(
+                    prefix + sig[band * rows:(band + 1) * rows].tobytes(), digest_size=8
+                ).digest(),
+                "little",
+                signed=True,
+            ),
+        )
+        for band in range(MINHASH_BANDS)
+    ]
+
+
+# ---------- Index ----------
+
+def index_insight(db: Session, insight_id, sig: np.ndarray, scope: tuple[str, str]) -> None:
+    """Store the signature and its LSH buckets for an insight."""
+    db.execute(
+        update(TeachingInsight)
+        .where(TeachingInsight.id == insight_id)
+        .values(minhash=[int(v) for v in sig])
+        .execution_options(synchronize_session=False)
+    )
+    stmt = insert(InsightLshBucket).values([
+        {"band": band, "bucket": bucket, "teaching_insight_id": insight_id}
+        for band, bucket in band_buckets(sig, scope)
+    ])
+    db.execute(stmt.on_conflict_do_nothing())
+
+
+def find_duplicate(
+    db: Session,
+    sig: np.ndarray,
+    scope: tuple[str, str],
+    threshold: float = INSIGHT_DEDUP_THRESHOLD,
+) -> Optional[tuple[object, float]]:
+    """
+    Most similar indexed insight in the same (grade, subject) scope at or
+    above `threshold`, as (id, similarity).
+    """
+    candidates = (
+        select(InsightLshBucket.teaching_insight_id)
+        .where(tuple_(InsightLshBucket.band, InsightLshBucket.bucket).in_(band_buckets(sig, scope)))
+        .distinct()
+    )
+    rows = db.execute(
+        select(TeachingInsight.id, TeachingInsight.minhash)
+        .where(TeachingInsight.id.in_(candidates))
+    ).all()
+
+    best = None
+    for insight_id, other in rows:
+        if not other or len(other) != len(sig):
+            continue
+        score = similarity(sig, other)
+        if score >= threshold and (best is None or score > best[1]):
+            best = (insight_id, score)
+    return best
+
+
+def add_or_merge_insight(
+    db: Session,
+    title: str,
+    generalized_context: dict,
+    reframed_problem: str,
+    reframed_solution: str,
+    threshold: float = INSIGHT_DEDUP_THRESHOLD,
+) -> tuple[object, bool]:
+    """
+    Insert a new insight, or bump support_count on an existing
+    near-duplicate. Returns (insight_id, merged). Caller commits.
+    """
+    db.execute(select(func.pg_advisory_xact_lock(_DEDUP_LOCK_KEY)))
+
+    sig = signature(insight_text(reframed_problem, reframed_solution))
+    scope = insight_scope(generalized_context)
+    duplicate = find_duplicate(db, sig, scope, threshold)
+    if duplicate is not None:
+        insight_id, _ = duplicate
+        db.execute(
+            update(TeachingInsight)
+            .where(TeachingInsight.id == insight_id)
+            .values(support_count=TeachingInsight.support_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return insight_id, True
+
+    insight = TeachingInsight(
+        title=title,
+        generalized_context=generalized_context,
+        reframed_problem=reframed_problem,
+        reframed_solution=reframed_solution,
+    )
+    db.add(insight)
+    db.flush()
+    index_insight(db, insight.id, sig, scope)
+    return insight.id, False
+
+
+def rebuild_index(db: Session) -> int:
+    """
+    Recompute every signature and bucket, e.g. after changing the MinHash
+    settings or the bucket scheme, or to index insights created before
+    dedup. Caller commits.
+    """
+    db.execute(delete(InsightLshBucket))
+    rows = db.execute(
+        select(
+            TeachingInsight.id,
+            TeachingInsight.generalized_context,
+            TeachingInsight.reframed_problem,
+            TeachingInsight.reframed_solution,
+        )
+    ).all()
+    for insight_id, ctx, problem, solution in rows:
+        index_insight(
+            db, insight_id, signature(insight_text(problem, solution)), insight_scope(ctx)
+        )
+    return len(rows)
@@ -0,0 +1,233 @@
+"""
+In-process retrieval index over teaching insights, used to ground
+/api/coach prompts in what already worked for other teachers.
+
+Insights are embedded locally (hashing vectorizer over title + problem)
+and partitioned by (grade, subject) from generalized_context. A query
+only scans its own partition with one matrix-vector product, which
+keeps latency flat as the table grows.
+
+New insights are written by the job worker in another process, so the
+index polls: at most every INSIGHT_INDEX_REFRESH_SEC, sync() loads rows
+created since the last one it has seen. The window reaches back
+_SYNC_OVERLAP to catch transactions that committed late. Only one
+thread syncs at a time; others keep searching the current state.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    INSIGHT_INDEX_DIM,
+    INSIGHT_INDEX_REFRESH_SEC,
+    INSIGHT_RETRIEVAL_K,
+    INSIGHT_RETRIEVAL_MIN_SCORE,
+)
+from app.core.context_schema import ResolvedContext
+from app.core.feed_ranking import make_segment
+from app.core.text_vectors import HashingVectorizer
+from app.models.conversations import TeachingInsight
+
+_SYNC_OVERLAP = timedelta(minutes=5)
+
+
+def index_scope(grade, subject) -> tuple[str, str]:
+    return make_segment(grade, subject, None)[:2]
+
+
+class _Partition:
+    """Growable matrix of unit vectors for one (grade, subject)."""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.ids: list = []
+
+    def add(self, insight_id, vec: np.ndarray) -> None:
+        size = len(self.ids)
+        if size == len(self.vectors):
+            grown = np.zeros((size * 2, self.vectors.shape[1]), dtype=np.float32)
+            grown[:size] = self.vectors
+            self.vectors = grown
+        self.vectors[size] = vec
+        self.ids.append(insight_id)
+
+    def top(self, vec: np.ndarray, k: int, min_score: float) -> list[tuple[object, float]]:
+        size = len(self.ids)
+        if size == 0:
+            return []
+        scores = self.vectors[:size] @ vec
+        if size > k:
+            idx = np.argpartition(scores, -k)[-k:]
+        else:
+            idx = np.arange(size)
+        idx = idx[np.argsort(scores[idx])[::-1]]
+        return [(self.ids[i], float(scores[i])) for i in idx if scores[i] >= min_score]
+
+
+class InsightIndex:
+    def __init__(
+        self,
+        dim: int = INSIGHT_INDEX_DIM,
+        refresh_sec: float = INSIGHT_INDEX_REFRESH_SEC,
+        vectorizer: HashingVectorizer | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.vectorizer = vectorizer or HashingVectorizer(dim=dim)
+        self.refresh_sec = refresh_sec
+        self._clock = clock
+        self._partitions: dict[tuple[str, str], _Partition] = {}
+        self._known: set = set()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._watermark: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+        self.queries = 0
+        self.syncs = 0
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    @staticmethod
+    def document(title: str, problem: str) -> str:
+        return f"{title}\n{problem}"
+
+    def add(self, insight_id, generalized_context: Optional[dict], text: str) -> bool:
+        """Index one insight; returns False if it was already indexed."""
+        if insight_id in self._known:
+            return False
+        ctx = generalized_context or {}
+        vec = self.vectorizer.transform(text)
+        scope = index_scope(ctx.get("grade"), ctx.get("subject"))
+        with self._lock:
+            if insight_id in self._known:
+                return False
+            partition = self._partitions.get(scope)
+            if partition is None:
+                partition = self._partitions[scope] = _Partition(self.vectorizer.dim)
+            partition.add(insight_id, vec)
+            self._known.add(insight_id)
+        return True
+
+    def search(
+        self,
+        text: str,
+        grade=None,
+        subject=None,
+        k: int = INSIGHT_RETRIEVAL_K,
+        min_score: float = INSIGHT_RETRIEVAL_MIN_SCORE,
+    ) -> list[tuple[object, float]]:
+        """Top-k (insight_id, cosine) within the grade/subject partition."""
+        vec = self.vectorizer.transform(text)
+        with self._lock:
+            self.queries += 1
+            partition = self._partitions.get(index_scope(grade, subject))
+            if partition is None or not vec.any():
+                return []
+            return partition.top(vec, k, min_score)
+
+    def sync_due(self) -> bool:
+        return self._synced_at is None or self._clock() - self._synced_at >= self.refresh_sec
+
+    def sync(self, db: Session, force: bool = False) -> int:
+        """Index insights created since the last sync. Returns how many were added."""
+        now = self._clock()
+        if not force and not self.sync_due():
+            return 0
+        if not self._sync_lock.acquire(blocking=force):
+            return 0
+        try:
+            query = select(
+                TeachingInsight.id,
+                TeachingInsight.title,
+                TeachingInsight.reframed_problem,
+                TeachingInsight.generalized_context,
+                TeachingInsight.created_at,
+            )
+            if self._watermark is not None:
+                query = query.where(TeachingInsight.created_at > self._watermark - _SYNC_OVERLAP)
+
+            added = 0
+            for insight_id, title, problem, ctx, created_at in db.execute(
+                query.execution_options(yield_per=1000)
+            ):
+                added += self.add(insight_id, ctx, self.document(title, problem))
+                if self._watermark is None or created_at > self._watermark:
+                    self._watermark = created_at
+
+            self._synced_at = now
+            self.syncs += 1
+            return added
+        finally:
+            self._sync_lock.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "insights": len(self._known),
+                "partitions": len(self._partitions),
+                "queries": self.queries,
+                "syncs": self.syncs,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_insight_index() -> InsightIndex:
+    return InsightIndex()
+
+
+def warm_insight_index(session_factory: Callable[[], Session]) -> threading.Thread:
+    """
+    Build the index in the background; until it finishes, retrieval
+    simply finds fewer insights.
+    """
+    def _run():
+        try:
+            with session_factory() as db:
+                get_insight_index().sync(db, force=True)
+        except Exception as e:
+            print(f"[insight-index] warm load failed: {e}")
+
+    thread = threading.Thread(target=_run, name="insight-index-warm", daemon=True)
+    thread.start()
+    return thread
+
+
+def retrieve_insights(
+    db: Session,
+    ctx: ResolvedContext,
+    k: int = INSIGHT_RETRIEVAL_K,
+    index: InsightIndex | None = None,
+) -> list[tuple[TeachingInsight, float]]:
+    """
+    Most relevant insights for the teacher's problem with their similarity,
+    best first. Grounding is optional: if the index cannot be refreshed or
+    read, this logs and returns [] so the prompt is built without insights.
+    """
+    index = index or get_insight_index()
+    try:
+        if index.sync_due():
+            # a savepoint keeps a failed sync from aborting the request's transaction
+            with db.begin_nested():
+                index.sync(db)
+        hits = index.search(ctx.raw_prompt, ctx.classroom.grade, ctx.classroom.subject, k)
+        if not hits:
+            return []
+        with db.begin_nested():
+            rows = {
+                i.id: i
+                for i in db.query(TeachingInsight).filter(
+                    TeachingInsight.id.in_([h[0] for h in hits])
+                )
+            }
+    except Exception as e:
+        print(f"[insight-index] retrieval unavailable: {e}")
+        return []
+    return [(rows[insight_id], score) for insight_id, score in hits if insight_id in rows]
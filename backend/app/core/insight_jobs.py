@@ -0,0 +1,261 @@
+"""
+Postgres-table job queue for teaching-insight generation.
+
+Feedback only enqueues a row in `teaching_insight_jobs`; worker
+processes (scripts/insight_worker.py) claim due jobs with
+`FOR UPDATE SKIP LOCKED`, call the LLM and write the TeachingInsight.
+Failures are retried with exponential backoff until `max_attempts`.
+Jobs left `running` by a crashed worker are reclaimed after
+INSIGHT_JOB_STALE_SEC while attempts remain, and failed once they run
+out. A worker only records its result while it still holds the claim.
+Near-duplicates of an existing insight are merged
+into it (see insight_dedup.py).
+"""
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.config import (
+    INSIGHT_DEDUP_ENABLED,
+    INSIGHT_JOB_MAX_ATTEMPTS,
+    INSIGHT_JOB_BACKOFF_BASE_SEC,
+    INSIGHT_JOB_BACKOFF_MAX_SEC,
+    INSIGHT_JOB_STALE_SEC,
+    INSIGHT_WORKER_CONCURRENCY,
+    INSIGHT_WORKER_POLL_SEC,
+)
+from app.core import teaching_insight_generator
+from app.core.feed_ranking import refresh_insight_rankings
+from app.core.insight_dedup import add_or_merge_insight
+from app.models.conversations import (
+    Conversation,
+    InsightJobStatus,
+    TeachingInsight,
+    TeachingInsightJob,
+)
+
+
+def enqueue_insight_job(db: Session, conversation_id) -> None:
+    """
+    Queue insight generation for a conversation. Idempotent: a job that is
+    pending, running or already succeeded is left alone; a permanently
+    failed one is reset for another round of attempts.
+    """
+    stmt = insert(TeachingInsightJob).values(
+        conversation_id=conversation_id,
+        max_attempts=INSIGHT_JOB_MAX_ATTEMPTS,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TeachingInsightJob.conversation_id],
+        set_={
+            "status": InsightJobStatus.pending,
+            "attempts": 0,
+            "run_after": func.now(),
+            "last_error": None,
+            "updated_at": func.now(),
+        },
+        where=TeachingInsightJob.status == InsightJobStatus.failed,
+    )
+    db.execute(stmt)
+
+
+def claim_jobs(db: Session, limit: int) -> list[tuple]:
+    """
+    Atomically mark up to `limit` due jobs as running and return their
+    (id, locked_at) claims. `locked_at` identifies this claim: process_job
+    only records a result while the job still carries it.
+
+    Stale running jobs that have already used up their attempts are
+    marked failed instead of being reclaimed, so a job that keeps
+    killing its worker is not retried forever.
+    """
+    stale_before = func.now() - timedelta(seconds=INSIGHT_JOB_STALE_SEC)
+    stale = and_(
+        TeachingInsightJob.status == InsightJobStatus.running,
+        TeachingInsightJob.locked_at < stale_before,
+    )
+
+    exhausted = (
+        select(TeachingInsightJob.id)
+        .where(stale, TeachingInsightJob.attempts >= TeachingInsightJob.max_attempts)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(TeachingInsightJob)
+        .where(TeachingInsightJob.id.in_(exhausted))
+        .values(
+            status=InsightJobStatus.failed,
+            locked_at=None,
+            last_error="worker stopped before finishing the last attempt",
+            updated_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    due = (
+        select(TeachingInsightJob.id)
+        .where(
+            or_(
+                and_(
+                    TeachingInsightJob.status == InsightJobStatus.pending,
+                    TeachingInsightJob.run_after <= func.now(),
+                ),
+                and_(stale, TeachingInsightJob.attempts < TeachingInsightJob.max_attempts),
+            )
+        )
+        .order_by(TeachingInsightJob.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(TeachingInsightJob)
+        .where(TeachingInsightJob.id.in_(due))
+        .values(
+            status=InsightJobStatus.running,
+            locked_at=func.now(),
+            attempts=TeachingInsightJob.attempts + 1,
+            updated_at=func.now(),
+        )
+        .returning(TeachingInsightJob.id, TeachingInsightJob.locked_at)
+        .execution_options(synchronize_session=False)
+    )
+    claims = [tuple(row) for row in db.execute(stmt)]
+    db.commit()
+    return claims
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff, capped, jittered over the upper half."""
+    ceiling = min(INSIGHT_JOB_BACKOFF_MAX_SEC, INSIGHT_JOB_BACKOFF_BASE_SEC * 2 ** (attempts - 1))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def process_job(db: Session, job_id, claimed_at) -> Optional[InsightJobStatus]:
+    """
+    Run one claimed job to success, retry or permanent failure.
+
+    The outcome is recorded only if the job still carries this claim's
+    `claimed_at`. If the LLM call outlasted INSIGHT_JOB_STALE_SEC and
+    another worker reclaimed the job, the whole result, including any
+    insight, is rolled back and None is returned.
+    """
+    job = db.get(TeachingInsightJob, job_id)
+    convo = db.get(Conversation, job.conversation_id)
+    attempts, max_attempts = job.attempts, job.max_attempts
+    source = dict(
+        raw_query=convo.raw_query,
+        ai_response=convo.ai_response,
+        resolved_context=convo.resolved_context,
+    )
+    db.commit()   # end the read transaction; don't hold it across the LLM call
+
+    values = dict(locked_at=None, updated_at=func.now())
+    try:
+        insight_data = teaching_insight_generator.generate_teaching_insight(**source)
+
+        # Normalize LLM output → DB schema
+        fields = dict(
+            title=insight_data["title"],
+            generalized_context=insight_data["generalized_context"],
+            reframed_problem=insight_data["problem"],
+            reframed_solution="\n".join(insight_data["solution"]),
+        )
+
+        with db.begin_nested():
+            if INSIGHT_DEDUP_ENABLED:
+                insight_id, merged = add_or_merge_insight(db, **fields)
+            else:
+                insight = TeachingInsight(**fields)
+                db.add(insight)
+                db.flush()
+                insight_id, merged = insight.id, False
+            if not merged:
+                refresh_insight_rankings(db, insight_id)
+
+        values.update(
+            status=InsightJobStatus.succeeded, teaching_insight_id=insight_id, last_error=None
+        )
+
+    except Exception as e:
+        values["last_error"] = str(e)[:2000]
+        if attempts >= max_attempts:
+            values["status"] = InsightJobStatus.failed
+        else:
+            values["status"] = InsightJobStatus.pending
+            values["run_after"] = datetime.now(timezone.utc) + timedelta(
+                seconds=backoff_seconds(attempts)
+            )
+
+    owned = db.execute(
+        update(TeachingInsightJob)
+        .where(TeachingInsightJob.id == job_id, TeachingInsightJob.locked_at == claimed_at)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not owned:
+        db.rollback()
+        return None
+    db.commit()
+    return values["status"]
+
+
+def run_worker(
+    session_factory: Callable[[], Session],
+    concurrency: int = INSIGHT_WORKER_CONCURRENCY,
+    poll_sec: float = INSIGHT_WORKER_POLL_SEC,
+    stop: threading.Event | None = None,
+    once: bool = False,
+) -> None:
+    """
+    Poll for due jobs and process them on a bounded thread pool.
+    Only as many jobs are claimed as there are free slots, so a busy
+    worker never sits on jobs another worker could run.
+    """
+    stop = stop or threading.Event()
+    in_flight = 0
+    lock = threading.Lock()
+
+    def _run(job_id, claimed_at):
+        nonlocal in_flight
+        try:
+            with session_factory() as db:
+                status = process_job(db, job_id, claimed_at)
+            if status is None:
+                print(f"[insight-worker] job {job_id}: reclaimed by another worker, result dropped")
+            else:
+                print(f"[insight-worker] job {job_id}: {status.value}")
+        except Exception as e:
+            print(f"[insight-worker] job {job_id} crashed: {e}")
+        finally:
+            with lock:
+                in_flight -= 1
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="insight-job") as pool:
+        while not stop.is_set():
+            with lock:
+                free = concurrency - in_flight
+            if free == 0:
+                stop.wait(min(poll_sec, 0.1))
+                continue
+
+            with session_factory() as db:
+                claims = claim_jobs(db, free)
+
+            for job_id, claimed_at in claims:
+                with lock:
+                    in_flight += 1
+                pool.submit(_run, job_id, claimed_at)
+
+            if once:
+                break
+            if not claims:
+                stop.wait(poll_sec)
@@ -0,0 +1,43 @@
+"""
+O(limit) random sampling of teaching insights.
+
+Each insight carries an indexed `random_key` drawn uniformly from
+[0, 1) at insert time. A sample is one index range scan starting at a
+random point, wrapping around to the start of the key space if it runs
+off the end. Cost depends on `limit`, not on table size, unlike
+ORDER BY random(), which sorts the whole table.
+
+Neighbouring keys tend to be served together; that is fine for a feed
+and much cheaper than re-keying rows on every read.
+"""
+import random
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.conversations import TeachingInsight
+
+
+def sample_insights(
+    db: Session,
+    limit: int,
+    rng: Optional[random.Random] = None,
+) -> list[TeachingInsight]:
+    start = (rng or random).random()
+
+    rows = (
+        db.query(TeachingInsight)
+        .filter(TeachingInsight.random_key >= start)
+        .order_by(TeachingInsight.random_key)
+        .limit(limit)
+        .all()
+    )
+    if len(rows) < limit:
+        rows += (
+            db.query(TeachingInsight)
+            .filter(TeachingInsight.random_key < start)
+            .order_by(TeachingInsight.random_key)
+            .limit(limit - len(rows))
+            .all()
+        )
+    return rows
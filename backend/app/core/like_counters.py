@@ -0,0 +1,141 @@
+"""
+Contention-free like counters for teaching insights.
+
+A reaction never touches the teaching_insights row. It upserts the
+teacher's own reaction row, which is one per teacher per insight, so
+like <-> dislike toggles are allowed. It then adds the change in net
+likes to one of LIKE_COUNTER_SHARDS shard rows, chosen at random.
+Parallel reactions on a popular insight therefore spread over
+different rows. Each shard update is a single atomic
+`delta = delta + n`, so no update is lost.
+
+rollup_likes() (scripts/rollup_likes.py) periodically drains every
+shard into teaching_insights.likes_count in one statement. Readers that
+need the exact figure use current_likes(), which adds the pending
+shard deltas.
+"""
+import random
+from typing import Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import LIKE_COUNTER_SHARDS
+from app.core.feed_ranking import refresh_insight_rankings
+from app.models.conversations import (
+    TeachingInsight,
+    TeachingInsightLikeShard,
+    TeachingInsightReaction,
+)
+
+
+def _value(liked: Optional[bool]) -> int:
+    if liked is None:
+        return 0
+    return 1 if liked else -1
+
+
+def add_likes(db: Session, insight_id, delta: int, shard: Optional[int] = None) -> None:
+    """Atomically add `delta` to one counter shard of the insight."""
+    if delta == 0:
+        return
+    if shard is None:
+        shard = random.randrange(LIKE_COUNTER_SHARDS)
+    stmt = insert(TeachingInsightLikeShard).values(
+        teaching_insight_id=insight_id, shard=shard, delta=delta
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[TeachingInsightLikeShard.teaching_insight_id, TeachingInsightLikeShard.shard],
+        set_={"delta": TeachingInsightLikeShard.delta + stmt.excluded.delta},
+    ))
+
+
+def _lock_reaction(db: Session, insight_id, teacher_id) -> Optional[bool]:
+    return db.execute(
+        select(TeachingInsightReaction.liked)
+        .where(
+            TeachingInsightReaction.teaching_insight_id == insight_id,
+            TeachingInsightReaction.teacher_id == teacher_id,
+        )
+        .with_for_update()
+    ).scalar_one_or_none()
+
+
+def record_reaction(db: Session, insight_id, teacher_id, liked: bool) -> int:
+    """
+    Set the teacher's reaction and count the change. Repeating the same
+    reaction is a no-op; switching like <-> dislike moves the count by 2.
+    Returns the change in net likes. Caller commits.
+    """
+    previous = _lock_reaction(db, insight_id, teacher_id)
+    if previous is None:
+        inserted = db.execute(
+            insert(TeachingInsightReaction)
+            .values(teaching_insight_id=insight_id, teacher_id=teacher_id, liked=liked)
+            .on_conflict_do_nothing(constraint="uq_teacher_insight_reaction_once")
+            .returning(TeachingInsightReaction.id)
+        ).first()
+        if inserted is None:
+            # same teacher reacted concurrently; their row is committed now
+            previous = _lock_reaction(db, insight_id, teacher_id)
+
+    if previous is not None:
+        if previous == liked:
+            return 0
+        db.execute(
+            update(TeachingInsightReaction)
+            .where(
+                TeachingInsightReaction.teaching_insight_id == insight_id,
+                TeachingInsightReaction.teacher_id == teacher_id,
+            )
+            .values(liked=liked, created_at=func.now())
+        )
+
+    delta = _value(liked) - _value(previous)
+    add_likes(db, insight_id, delta)
+    return delta
+
+
+def current_likes(db: Session, insight_id) -> int:
+    """likes_count plus deltas not rolled up yet."""
+    pending = (
+        select(func.coalesce(func.sum(TeachingInsightLikeShard.delta), 0))
+        .where(TeachingInsightLikeShard.teaching_insight_id == insight_id)
+        .scalar_subquery()
+    )
+    value = db.execute(
+        select(TeachingInsight.likes_count + pending).where(TeachingInsight.id == insight_id)
+    ).scalar_one_or_none()
+    return int(value or 0)
+
+
+def rollup_likes(db: Session) -> list:
+    """
+    Move all pending shard deltas into likes_count and rescore the
+    affected insights in the feed rankings. Drain and update happen in
+    one statement, so no delta can be counted twice or lost. Reactions
+    that arrive meanwhile recreate their shard row and wait for the
+    next rollup. Caller commits. Returns the updated insight ids.
+    """
+    drained = (
+        delete(TeachingInsightLikeShard)
+        .returning(TeachingInsightLikeShard.teaching_insight_id, TeachingInsightLikeShard.delta)
+        .cte("drained")
+    )
+    totals = (
+        select(drained.c.teaching_insight_id, func.sum(drained.c.delta).label("delta"))
+        .group_by(drained.c.teaching_insight_id)
+        .cte("totals")
+    )
+    stmt = (
+        update(TeachingInsight)
+        .where(TeachingInsight.id == totals.c.teaching_insight_id, totals.c.delta != 0)
+        .values(likes_count=TeachingInsight.likes_count + totals.c.delta)
+        .returning(TeachingInsight.id)
+        .execution_options(synchronize_session=False)
+    )
+    ids = list(db.execute(stmt).scalars())
+    for insight_id in ids:
+        refresh_insight_rankings(db, insight_id)
+    return ids
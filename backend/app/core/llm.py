@@ -1,9 +1,30 @@
 from __future__ import annotations
 
+import ast
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
 from functools import lru_cache
 from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Iterator
 
-from app.core.config import LLM_PROVIDER
+from app.core.config import (
+    LLM_PROVIDER,
+    LLM_CACHE_BACKEND,
+    LLM_STUB_LATENCY_MS,
+    LLM_STUB_TOKENS_PER_SEC,
+    LLM_TIMEOUT_SEC,
+    LLM_BREAKER_FAILURE_RATE,
+    LLM_BREAKER_WINDOW,
+    LLM_BREAKER_MIN_CALLS,
+    LLM_BREAKER_OPEN_SEC,
+    LLM_BULKHEAD_MAX_CONCURRENT,
+)
 
 # ---------- Errors ----------
 
@@ -11,46 +32,621 @@ class LLMError(RuntimeError):
     pass
 
 
+class LLMUnavailableError(LLMError):
+    """Rejected locally (circuit open / bulkhead full) without calling upstream."""
+    pass
+
+
 # ---------- Interface ----------
 
 class LLMClient:
     def generate(self, prompt: str) -> str:
         raise NotImplementedError
 
+    def fingerprint(self) -> str:
+        """
+        Identifies the provider + model settings behind this client.
+        Two clients with the same fingerprint must answer a prompt
+        interchangeably (used for cache/coalescing keys).
+        """
+        return type(self).__name__
+
+    def stats(self) -> dict:
+        """Runtime counters for monitoring; wrappers merge their own in."""
+        return {}
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Yield the completion in chunks as the provider produces them.
+        Providers without native streaming fall back to one chunk.
+        """
+        yield self.generate(prompt)
+
+    async def agenerate(self, prompt: str) -> str:
+        """
+        Async variant of generate(). Providers without a native async
+        client run the blocking call on a worker thread.
+        """
+        return await asyncio.to_thread(self.generate, prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Async variant of stream(). The default pulls from the sync
+        iterator one chunk at a time on a worker thread.
+        """
+        chunks = self.stream(prompt)
+        done = object()
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+
 
 # ---------- Pollinations Provider ----------
 
 class PollinationsClient(LLMClient):
+    MODEL = "openai"
+    TEMPERATURE = 0.6
+
     def __init__(self):
         from langchain_openai import ChatOpenAI
 
         self.model = ChatOpenAI(
             base_url="https://text.pollinations.ai/openai/v1",
             api_key="free-testing",     # not validated
-            model="openai",
-            temperature=0.6,
+            model=self.MODEL,
+            temperature=self.TEMPERATURE,
+            timeout=LLM_TIMEOUT_SEC,
         )
 
-    def generate(self, prompt: str) -> str:
-        full_prompt = (
+    def fingerprint(self) -> str:
+        return f"pollinations:{self.MODEL}:t={self.TEMPERATURE}"
+
+    @staticmethod
+    def _wrap(prompt: str) -> str:
+        return (
             "You are a classroom coaching assistant.\n"
             "Give practical, immediate, in-class advice.\n"
             "Limit to bullet points. No generic pedagogy talk.\n\n"
             f"Teacher problem:\n{prompt}"
         )
 
+    def generate(self, prompt: str) -> str:
+        try:
+            response = self.model.invoke(self._wrap(prompt))
+            return response.content.strip()
+        except Exception as e:
+            raise LLMError(f"Pollinations failed: {e}") from e
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        try:
+            for chunk in self.model.stream(self._wrap(prompt)):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            raise LLMError(f"Pollinations failed: {e}") from e
+
+    async def agenerate(self, prompt: str) -> str:
         try:
-            response = self.model.invoke(full_prompt)
+            response = await self.model.ainvoke(self._wrap(prompt))
             return response.content.strip()
         except Exception as e:
             raise LLMError(f"Pollinations failed: {e}") from e
 
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        try:
+            async for chunk in self.model.astream(self._wrap(prompt)):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            raise LLMError(f"Pollinations failed: {e}") from e
+
+
+# ---------- Stub Provider (offline / load testing) ----------
+
+class StubLLMClient(LLMClient):
+    """
+    Deterministic offline provider for benchmarks and tests.
+
+    The same prompt always yields the same text. Teaching-insight prompts
+    get valid insight JSON so the feedback pipeline runs end to end.
+    Latency is modelled as a fixed time-to-first-token plus a constant
+    token rate: `latency_ms + n_tokens / tokens_per_sec`.
+    """
+
+    _CONTROL = [
+        "Raise your hand and wait for silence; count down from five.",
+        "Clap a rhythm and have the class echo it back.",
+        "Ask everyone to freeze and point to the board.",
+        "Lower your voice and walk to the noisiest corner.",
+    ]
+    _HOOK = [
+        "Show a quick real-life example using objects in the room.",
+        "Tell a 30-second story that needs today's concept to finish.",
+        "Pose a puzzle on the board and let pairs guess for one minute.",
+        "Draw a simple picture and ask what is missing.",
+    ]
+    _EXTENSION = [
+        "Ask advanced students to create their own example for the class.",
+        "Have fast finishers explain the idea to a partner in their own words.",
+        "Give a harder variant with one extra step.",
+    ]
+    _CHECK = [
+        "Ask one student to explain the first step aloud.",
+        "Thumbs up / thumbs down: is this answer right?",
+        "Write one quick question on the board; everyone answers on a slate.",
+    ]
+
+    def __init__(
+        self,
+        latency_ms: float = LLM_STUB_LATENCY_MS,
+        tokens_per_sec: float = LLM_STUB_TOKENS_PER_SEC,
+    ):
+        self.latency_ms = latency_ms
+        self.tokens_per_sec = tokens_per_sec
+
+    def fingerprint(self) -> str:
+        return "stub:v1"
+
+    # ----- deterministic content -----
+
+    @staticmethod
+    def _seed(prompt: str) -> int:
+        return int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "big")
+
+    @staticmethod
+    def _section(prompt: str, start: str, end: str) -> str:
+        match = re.search(re.escape(start) + r"\s*(.*?)\s*" + re.escape(end), prompt, re.DOTALL)
+        return match.group(1).strip() if match else ""
+
+    def _insight(self, prompt: str, seed: int) -> str:
+        problem = self._section(prompt, "Teacher Problem:", "AI Solution:")
+        solution = self._section(prompt, "AI Solution:", "Context:")
+        try:
+            context = ast.literal_eval(self._section(prompt, "Context:", "TASK:"))
+            classroom = context.get("classroom") or {}
+        except (ValueError, SyntaxError, AttributeError):
+            classroom = {}
+
+        steps = [
+            line.lstrip("-• ").strip()
+            for line in solution.splitlines()
+            if line.strip()
+        ] or [self._CONTROL[seed % len(self._CONTROL)]]
+
+        return json.dumps({
+            "title": (problem or "Classroom challenge")[:60],
+            "generalized_context": {
+                "grade": str(classroom.get("grade") or ""),
+                "subject": str(classroom.get("subject") or ""),
+                "language": str(classroom.get("language") or ""),
+                "constraints": "No materials required",
+            },
+            "reframed_problem": problem or "Students lose focus during class.",
+            "reframed_solution": "\n".join(steps),
+        })
+
+    def _coach(self, seed: int) -> str:
+        def pick(options: list[str], shift: int) -> str:
+            return options[(seed >> shift) % len(options)]
+
+        return "\n".join([
+            f"- Control move (30–60 sec): {pick(self._CONTROL, 0)}",
+            f"- Concept hook (2 min): {pick(self._HOOK, 8)}",
+            f"- Extension task (advanced students): {pick(self._EXTENSION, 16)}",
+            f"- Quick check question: {pick(self._CHECK, 24)}",
+        ])
+
+    def _respond(self, prompt: str) -> str:
+        seed = self._seed(prompt)
+        if "reusable teaching insight" in prompt:
+            return self._insight(prompt, seed)
+        return self._coach(seed)
+
+    # ----- latency model -----
+
+    @staticmethod
+    def _tokens(text: str) -> list[str]:
+        return re.findall(r"\S+\s*", text)
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    def generate(self, prompt: str) -> str:
+        text = self._respond(prompt)
+        time.sleep(self.latency_ms / 1000 + len(self._tokens(text)) * self._token_delay())
+        return text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        text = self._respond(prompt)
+        time.sleep(self.latency_ms / 1000)
+        for token in self._tokens(text):
+            yield token
+            time.sleep(self._token_delay())
+
+    async def agenerate(self, prompt: str) -> str:
+        text = self._respond(prompt)
+        await asyncio.sleep(self.latency_ms / 1000 + len(self._tokens(text)) * self._token_delay())
+        return text
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        text = self._respond(prompt)
+        await asyncio.sleep(self.latency_ms / 1000)
+        for token in self._tokens(text):
+            yield token
+            await asyncio.sleep(self._token_delay())
+
+
+# ---------- Helpers ----------
+
+def prompt_key(client: LLMClient, prompt: str) -> str:
+    """Content address of `prompt` as answered by `client`."""
+    payload = f"{client.fingerprint()}\x00{prompt}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+# ---------- Request Coalescing ----------
+
+@dataclass
+class _Flight:
+    future: Future
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; callers that arrive while
+    it is in flight wait for and share its result (or exception).
+    Sync and async callers share the same flights.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+        self.coalesced = 0
+
+    def _join(self, key: str) -> tuple[_Flight, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.coalesced += 1
+                return flight, False
+            flight = _Flight(future=Future())
+            self._flights[key] = flight
+            return flight, True
+
+    def _leave(self, flight: _Flight) -> None:
+        with self._lock:
+            flight.waiters -= 1
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+
+    def do(self, key: str, fn: Callable[[], str]) -> str:
+        flight, leader = self._join(key)
+        if not leader:
+            try:
+                return flight.future.result()
+            finally:
+                self._leave(flight)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result
+        finally:
+            self._finish(key, flight)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[str]]) -> str:
+        flight, leader = self._join(key)
+        if not leader:
+            try:
+                # shield: a cancelled follower must not cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(flight.future))
+            finally:
+                self._leave(flight)
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            flight.future.set_exception(LLMError("Coalesced LLM call was cancelled"))
+            raise
+        except BaseException as e:
+            flight.future.set_exception(e)
+            raise
+        else:
+            flight.future.set_result(result)
+            return result
+        finally:
+            self._finish(key, flight)
+
+    def waiters(self) -> dict[str, int]:
+        """In-flight keys (truncated hash) -> callers waiting on them."""
+        with self._lock:
+            return {key[:12]: f.waiters for key, f in self._flights.items()}
+
+
+class CoalescingLLMClient(LLMClient):
+    """
+    Collapses concurrent identical prompts into one upstream call.
+    Streams are passed through untouched since each consumer needs
+    its own chunk sequence.
+    """
+
+    def __init__(self, inner: LLMClient):
+        self.inner = inner
+        self.flights = SingleFlight()
+
+    def fingerprint(self) -> str:
+        return self.inner.fingerprint()
+
+    def generate(self, prompt: str) -> str:
+        key = prompt_key(self.inner, prompt)
+        return self.flights.do(key, lambda: self.inner.generate(prompt))
+
+    async def agenerate(self, prompt: str) -> str:
+        key = prompt_key(self.inner, prompt)
+        return await self.flights.ado(key, lambda: self.inner.agenerate(prompt))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        return self.inner.stream(prompt)
+
+    def astream(self, prompt: str) -> AsyncIterator[str]:
+        return self.inner.astream(prompt)
+
+    def stats(self) -> dict:
+        waiters = self.flights.waiters()
+        return {
+            **self.inner.stats(),
+            "singleflight": {
+                "in_flight": len(waiters),
+                "waiters": waiters,
+                "coalesced_total": self.flights.coalesced,
+            },
+        }
+
+
+# ---------- Circuit Breaker & Bulkhead ----------
+
+class CircuitBreaker:
+    """
+    closed    -> calls pass; outcomes go into a rolling window.
+    open      -> calls fail fast until `open_sec` has elapsed.
+    half_open -> exactly one probe call is let through; success closes
+                 the circuit, failure re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        failure_rate: float = LLM_BREAKER_FAILURE_RATE,
+        window: int = LLM_BREAKER_WINDOW,
+        min_calls: int = LLM_BREAKER_MIN_CALLS,
+        open_sec: float = LLM_BREAKER_OPEN_SEC,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate = failure_rate
+        self.window = window
+        self.min_calls = min_calls
+        self.open_sec = open_sec
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: list[bool] = []
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened_total = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.open_sec:
+            self._state = self.HALF_OPEN
+            self._probing = False
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+        self._probing = False
+        self.opened_total += 1
+
+    def before_call(self) -> None:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.OPEN or (self._state == self.HALF_OPEN and self._probing):
+                self.rejected += 1
+                raise LLMUnavailableError("LLM circuit open; failing fast")
+            if self._state == self.HALF_OPEN:
+                self._probing = True
+
+    def cancel_call(self) -> None:
+        """The call admitted by before_call() never reached upstream."""
+        with self._lock:
+            self._probing = False
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._probing = False
+                self._outcomes.clear()
+                return
+            self._record(True)
+
+    def on_failure(self) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            self._record(False)
+            failures = self._outcomes.count(False)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open()
+
+    def _record(self, ok: bool) -> None:
+        self._outcomes.append(ok)
+        if len(self._outcomes) > self.window:
+            del self._outcomes[0]
+
+    def snapshot(self) -> dict:
+        state = self.state
+        with self._lock:
+            n = len(self._outcomes)
+            return {
+                "state": state,
+                "failure_rate": round(self._outcomes.count(False) / n, 3) if n else 0.0,
+                "opened_total": self.opened_total,
+                "rejected": self.rejected,
+            }
+
+
+class Bulkhead:
+    """Caps concurrent upstream calls; excess calls are rejected, not queued."""
+
+    def __init__(self, max_concurrent: int = LLM_BULKHEAD_MAX_CONCURRENT):
+        self.max_concurrent = max_concurrent
+        self._sem = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.rejected = 0
+
+    def acquire(self) -> None:
+        if not self._sem.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise LLMUnavailableError("Too many concurrent LLM calls; try again shortly")
+        with self._lock:
+            self.in_use += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+        self._sem.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "in_use": self.in_use,
+            "max_concurrent": self.max_concurrent,
+            "rejected": self.rejected,
+        }
+
+
+class ResilientLLMClient(LLMClient):
+    """
+    Guards one provider with a circuit breaker and a bulkhead so an
+    unhealthy upstream fails fast instead of tying up every request.
+    Local rejections raise LLMUnavailableError and are not counted as
+    upstream failures.
+    """
+
+    def __init__(
+        self,
+        inner: LLMClient,
+        breaker: CircuitBreaker | None = None,
+        bulkhead: Bulkhead | None = None,
+    ):
+        self.inner = inner
+        self.breaker = breaker or CircuitBreaker()
+        self.bulkhead = bulkhead or Bulkhead()
+
+    def fingerprint(self) -> str:
+        return self.inner.fingerprint()
+
+    @contextmanager
+    def _guard(self):
+        self.breaker.before_call()
+        try:
+            self.bulkhead.acquire()
+        except LLMUnavailableError:
+            self.breaker.cancel_call()
+            raise
+        try:
+            yield
+        except Exception:
+            self.breaker.on_failure()
+            raise
+        except BaseException:
+            # cancelled request / consumer stopped reading a stream:
+            # not the provider's fault
+            self.breaker.cancel_call()
+            raise
+        else:
+            self.breaker.on_success()
+        finally:
+            self.bulkhead.release()
+
+    def generate(self, prompt: str) -> str:
+        with self._guard():
+            return self.inner.generate(prompt)
+
+    async def agenerate(self, prompt: str) -> str:
+        with self._guard():
+            return await self.inner.agenerate(prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        with self._guard():
+            yield from self.inner.stream(prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        with self._guard():
+            async for chunk in self.inner.astream(prompt):
+                yield chunk
+
+    def stats(self) -> dict:
+        return {
+            **self.inner.stats(),
+            "circuit_breaker": self.breaker.snapshot(),
+            "bulkhead": self.bulkhead.snapshot(),
+        }
+
 
 # ---------- Provider Switch ----------
 
+_PROVIDERS: dict[str, Callable[[], LLMClient]] = {
+    "pollinations": PollinationsClient,
+    "stub": StubLLMClient,
+}
+
+
+def build_provider(name: str) -> LLMClient:
+    factory = _PROVIDERS.get(name)
+    if factory is None:
+        raise LLMError(f"Unknown LLM_PROVIDER={name}")
+    # each provider gets its own breaker + bulkhead
+    return ResilientLLMClient(factory())
+
+
 @lru_cache(maxsize=1)
 def get_llm() -> LLMClient:
-    if LLM_PROVIDER == "pollinations":
-        return PollinationsClient()
+    names = [n.strip() for n in LLM_PROVIDER.split(",") if n.strip()]
+    if len(names) == 1:
+        client = build_provider(names[0])
+    else:
+        from app.core.llm_router import RouterLLMClient
+        client = RouterLLMClient({name: build_provider(name) for name in names})
+
+    client = CoalescingLLMClient(client)
+
+    if LLM_CACHE_BACKEND != "none":
+        from app.core.llm_cache import CachedLLMClient, build_cache_backend
+        client = CachedLLMClient(client, build_cache_backend(LLM_CACHE_BACKEND))
+
+    return client
 
-    raise LLMError(f"Unknown LLM_PROVIDER={LLM_PROVIDER}")
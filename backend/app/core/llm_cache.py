@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from app.core.config import (
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SEC,
+)
+from app.core.llm import LLMClient, LLMError, prompt_key
+
+
+# ---------- Backends ----------
+
+class CacheBackend:
+    """
+    Key/value store for completed LLM responses.
+    Implementations own TTL expiry and LRU eviction.
+    """
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU dict. Lost on restart, not shared across workers."""
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_sec: float = LLM_CACHE_TTL_SEC,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.clock = clock
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = (self.clock() + self.ttl_sec, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    On-disk cache that survives restarts and can be shared by the
+    worker processes of one host.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_sec: float = LLM_CACHE_TTL_SEC,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = self.clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_sec, now),
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "  SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def build_cache_backend(kind: str) -> CacheBackend:
+    if kind == "memory":
+        return InMemoryCacheBackend()
+    if kind == "sqlite":
+        return SQLiteCacheBackend()
+    raise LLMError(f"Unknown LLM_CACHE_BACKEND={kind}")
+
+
+# ---------- Client wrapper ----------
+
+class CachedLLMClient(LLMClient):
+    """
+    Serves repeated prompts from `backend` instead of calling `inner`.
+    Keys are content addresses of the final prompt plus the inner
+    client's provider/model fingerprint. Failed calls are never cached.
+    """
+
+    def __init__(self, inner: LLMClient, backend: CacheBackend):
+        self.inner = inner
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self) -> str:
+        return self.inner.fingerprint()
+
+    def _lookup(self, prompt: str) -> tuple[str, Optional[str]]:
+        key = prompt_key(self.inner, prompt)
+        cached = self.backend.get(key)
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return key, cached
+
+    def generate(self, prompt: str) -> str:
+        key, cached = self._lookup(prompt)
+        if cached is not None:
+            return cached
+        output = self.inner.generate(prompt)
+        self.backend.set(key, output)
+        return output
+
+    async def agenerate(self, prompt: str) -> str:
+        key, cached = self._lookup(prompt)
+        if cached is not None:
+            return cached
+        output = await self.inner.agenerate(prompt)
+        self.backend.set(key, output)
+        return output
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        key, cached = self._lookup(prompt)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        for chunk in self.inner.stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.backend.set(key, "".join(chunks).strip())
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        key, cached = self._lookup(prompt)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async for chunk in self.inner.astream(prompt):
+            chunks.append(chunk)
+            yield chunk
+        self.backend.set(key, "".join(chunks).strip())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **self.inner.stats(),
+            "response_cache": {
+                "backend": type(self.backend).__name__,
+                "entries": len(self.backend),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            },
+        }
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Iterator, Optional
+
+import numpy as np
+
+from app.core.config import (
+    LLM_HEDGE_DELAY_SEC,
+    LLM_ROUTER_MAX_ERROR_RATE,
+    LLM_ROUTER_WINDOW,
+)
+from app.core.llm import LLMClient, LLMError
+
+
+# ---------- Rolling provider health ----------
+
+class ProviderHealth:
+    """Rolling latency/error window for one provider."""
+
+    def __init__(self, window: int = LLM_ROUTER_WINDOW):
+        self._lock = threading.Lock()
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+
+    def record(self, ok: bool, latency_sec: Optional[float] = None) -> None:
+        with self._lock:
+            self.outcomes.append(ok)
+            if ok and latency_sec is not None:
+                self.latencies.append(latency_sec)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self.latencies:
+                return None
+            return float(np.percentile(self.latencies, q))
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def samples(self) -> int:
+        return len(self.outcomes)
+
+    def snapshot(self) -> dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "samples": self.samples,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 3),
+        }
+
+
+# ---------- Router ----------
+
+class RouterLLMClient(LLMClient):
+    """
+    Sends each prompt to the fastest healthy provider (lowest rolling
+    p50; providers without samples sort first so they get measured).
+
+    If the chosen provider has not answered within `hedge_delay_sec`
+    a second request is fired at the next provider and the first
+    successful answer wins. Errors fail over to the next provider.
+    `hedge_delay_sec=None` disables hedging.
+    """
+
+    def __init__(
+        self,
+        providers: dict[str, LLMClient],
+        hedge_delay_sec: Optional[float] = LLM_HEDGE_DELAY_SEC,
+        max_error_rate: float = LLM_ROUTER_MAX_ERROR_RATE,
+        window: int = LLM_ROUTER_WINDOW,
+        min_samples: int = 5,
+    ):
+        if not providers:
+            raise LLMError("RouterLLMClient needs at least one provider")
+        self.providers = providers
+        self.health = {name: ProviderHealth(window) for name in providers}
+        self.hedge_delay_sec = hedge_delay_sec
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.hedged = 0
+        self.hedge_wins = 0
+        # Losing hedges keep running to completion (threads can't be
+        # cancelled) and still feed the latency stats.
+        self._pool = ThreadPoolExecutor(
+            max_workers=8 * len(providers), thread_name_prefix="llm-router"
+        )
+
+    def fingerprint(self) -> str:
+        parts = sorted(p.fingerprint() for p in self.providers.values())
+        return "router(" + ",".join(parts) + ")"
+
+    def _healthy(self, name: str) -> bool:
+        h = self.health[name]
+        return h.samples < self.min_samples or h.error_rate <= self.max_error_rate
+
+    def ranked(self) -> list[str]:
+        """Healthy providers fastest first, then unhealthy ones as a last resort."""
+        def speed(name: str) -> float:
+            p50 = self.health[name].percentile(50)
+            return p50 if p50 is not None else 0.0
+
+        healthy = sorted((n for n in self.providers if self._healthy(n)), key=speed)
+        unhealthy = sorted((n for n in self.providers if not self._healthy(n)), key=speed)
+        return healthy + unhealthy
+
+    # ----- sync -----
+
+    def _timed(self, name: str, prompt: str) -> str:
+        start = time.perf_counter()
+        try:
+            result = self.providers[name].generate(prompt)
+        except Exception:
+            self.health[name].record(False)
+            raise
+        self.health[name].record(True, time.perf_counter() - start)
+        return result
+
+    def generate(self, prompt: str) -> str:
+        order = self.ranked()
+        pending = {self._pool.submit(self._timed, order[0], prompt): order[0]}
+        next_idx = 1
+        hedged = False
+        errors: list[str] = []
+
+        if self.hedge_delay_sec is not None and next_idx < len(order):
+            done, _ = wait(pending, timeout=self.hedge_delay_sec)
+            if not done:
+                pending[self._pool.submit(self._timed, order[next_idx], prompt)] = order[next_idx]
+                next_idx += 1
+                self.hedged += 1
+                hedged = True
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    continue
+                if hedged and name != order[0]:
+                    self.hedge_wins += 1
+                return result
+
+            if not pending and next_idx < len(order):
+                pending[self._pool.submit(self._timed, order[next_idx], prompt)] = order[next_idx]
+                next_idx += 1
+
+        raise LLMError("All LLM providers failed: " + "; ".join(errors))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        # No hedging for streams; fail over only before the first chunk.
+        errors: list[str] = []
+        for name in self.ranked():
+            start = time.perf_counter()
+            started = False
+            try:
+                for chunk in self.providers[name].stream(prompt):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self.health[name].record(False)
+                if started:
+                    raise
+                errors.append(f"{name}: {e}")
+                continue
+            self.health[name].record(True, time.perf_counter() - start)
+            return
+        raise LLMError("All LLM providers failed: " + "; ".join(errors))
+
+    # ----- async -----
+
+    async def _atimed(self, name: str, prompt: str) -> str:
+        start = time.perf_counter()
+        try:
+            result = await self.providers[name].agenerate(prompt)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.health[name].record(False)
+            raise
+        self.health[name].record(True, time.perf_counter() - start)
+        return result
+
+    async def agenerate(self, prompt: str) -> str:
+        order = self.ranked()
+        pending = {asyncio.ensure_future(self._atimed(order[0], prompt)): order[0]}
+        next_idx = 1
+        hedged = False
+        errors: list[str] = []
+
+        try:
+            if self.hedge_delay_sec is not None and next_idx < len(order):
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_delay_sec)
+                if not done:
+                    pending[asyncio.ensure_future(self._atimed(order[next_idx], prompt))] = order[next_idx]
+                    next_idx += 1
+                    self.hedged += 1
+                    hedged = True
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        errors.append(f"{name}: {e}")
+                        continue
+                    if hedged and name != order[0]:
+                        self.hedge_wins += 1
+                    return result
+
+                if not pending and next_idx < len(order):
+                    pending[asyncio.ensure_future(self._atimed(order[next_idx], prompt))] = order[next_idx]
+                    next_idx += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise LLMError("All LLM providers failed: " + "; ".join(errors))
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        errors: list[str] = []
+        for name in self.ranked():
+            start = time.perf_counter()
+            started = False
+            try:
+                async for chunk in self.providers[name].astream(prompt):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                self.health[name].record(False)
+                if started:
+                    raise
+                errors.append(f"{name}: {e}")
+                continue
+            self.health[name].record(True, time.perf_counter() - start)
+            return
+        raise LLMError("All LLM providers failed: " + "; ".join(errors))
+
+    def stats(self) -> dict:
+        return {
+            "router": {
+                "order": self.ranked(),
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "providers": {
+                    name: {
+                        **self.health[name].snapshot(),
+                        "healthy": self._healthy(name),
+                        **provider.stats(),
+                    }
+                    for name, provider in self.providers.items()
+                },
+            },
+        }
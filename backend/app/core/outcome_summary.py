@@ -0,0 +1,118 @@
+"""
+Maintains teacher_outcome_summaries, the per-teacher rollup of
+TeacherSolutionOutcome used by context resolution.
+
+Every ORM insert of a TeacherSolutionOutcome upserts the teacher's
+summary in the same transaction (counts +1, solution id prepended to
+the recent list and trimmed). An ORM update that changes the outcome,
+solution, teacher or time, and an ORM delete, recompute the affected
+teachers' summaries from the source table, also in the same
+transaction. The listeners are registered by app.db.session, where
+every writer gets its session. Outcomes written by other means (raw
+SQL, bulk Core statements) are not tracked; run
+scripts/backfill_outcome_summaries.py to rebuild from the source table.
+"""
+from sqlalchemy import delete, event, func, literal_column, select, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, aggregate_order_by, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.core.config import OUTCOME_SUMMARY_RECENT
+from app.models import SolutionOutcome, TeacherOutcomeSummary, TeacherSolutionOutcome
+
+_IDS = ARRAY(UUID(as_uuid=True))
+_summaries = TeacherOutcomeSummary.__table__
+
+
+def _recent(ids):
+    """Trim a uuid[] expression to the newest OUTCOME_SUMMARY_RECENT ids."""
+    return type_coerce(ids, _IDS)[1:OUTCOME_SUMMARY_RECENT]
+
+
+def record_outcome_stmt(teacher_id, solution_id, outcome: SolutionOutcome):
+    worked = outcome == SolutionOutcome.worked
+    stmt = insert(_summaries).values(
+        teacher_id=teacher_id,
+        worked_count=1 if worked else 0,
+        failed_count=0 if worked else 1,
+        recent_worked=[solution_id] if worked else [],
+        recent_failed=[] if worked else [solution_id],
+    )
+    new = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[_summaries.c.teacher_id],
+        set_={
+            "worked_count": _summaries.c.worked_count + new.worked_count,
+            "failed_count": _summaries.c.failed_count + new.failed_count,
+            "recent_worked": _recent(func.array_cat(new.recent_worked, _summaries.c.recent_worked)),
+            "recent_failed": _recent(func.array_cat(new.recent_failed, _summaries.c.recent_failed)),
+            "updated_at": func.now(),
+        },
+    )
+
+
+@event.listens_for(TeacherSolutionOutcome, "after_insert")
+def _summarize_new_outcome(mapper, connection, target):
+    connection.execute(
+        record_outcome_stmt(target.teacher_id, target.solution_id, target.outcome)
+    )
+
+
+_SUMMARIZED = ("teacher_id", "solution_id", "outcome", "created_at")
+
+
+@event.listens_for(TeacherSolutionOutcome, "after_update")
+def _resummarize_changed_outcome(mapper, connection, target):
+    if not any(get_history(target, attr).has_changes() for attr in _SUMMARIZED):
+        return
+    # a moved outcome changes both the old and the new teacher's summary
+    teachers = {target.teacher_id, *get_history(target, "teacher_id").deleted} - {None}
+    for teacher_id in teachers:
+        for stmt in _rebuild_stmts(teacher_id):
+            connection.execute(stmt)
+
+
+@event.listens_for(TeacherSolutionOutcome, "after_delete")
+def _resummarize_deleted_outcome(mapper, connection, target):
+    for stmt in _rebuild_stmts(target.teacher_id):
+        connection.execute(stmt)
+
+
+def _rebuild_stmts(teacher_id=None):
+    o = TeacherSolutionOutcome
+
+    def recent(kind: SolutionOutcome):
+        ids = func.array_agg(aggregate_order_by(o.solution_id, o.created_at.desc())).filter(
+            o.outcome == kind
+        )
+        return func.coalesce(_recent(ids), literal_column("'{}'::uuid[]"))
+
+    rollup = (
+        select(
+            o.teacher_id,
+            func.count().filter(o.outcome == SolutionOutcome.worked),
+            func.count().filter(o.outcome == SolutionOutcome.failed),
+            recent(SolutionOutcome.worked),
+            recent(SolutionOutcome.failed),
+        )
+        .group_by(o.teacher_id)
+    )
+    clear = delete(_summaries)
+    if teacher_id is not None:
+        rollup = rollup.where(o.teacher_id == teacher_id)
+        clear = clear.where(_summaries.c.teacher_id == teacher_id)
+
+    return clear, insert(_summaries).from_select(
+        ["teacher_id", "worked_count", "failed_count", "recent_worked", "recent_failed"],
+        rollup,
+    )
+
+
+def rebuild_outcome_summaries(db: Session, teacher_id=None) -> int:
+    """
+    Recompute summaries from teacher_solution_outcomes (all teachers, or
+    one). Returns the number of summary rows written. Caller commits.
+    """
+    clear, fill = _rebuild_stmts(teacher_id)
+    db.execute(clear)
+    return db.execute(fill).rowcount
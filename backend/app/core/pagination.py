@@ -0,0 +1,29 @@
+"""Opaque keyset cursors: urlsafe base64 of a small JSON list."""
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else str(v) if isinstance(v, UUID) else v
+         for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e)) from e
+    if not isinstance(values, list):
+        raise InvalidCursor("cursor must encode a list")
+    return values
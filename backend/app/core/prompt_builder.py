@@ -1,7 +1,37 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+from app.core.config import (
+    CONVERSATION_MAX_PROMPT_TOKENS,
+    CONVERSATION_MAX_TURN_TOKENS,
+    CONVERSATION_SUMMARY_MAX_TOKENS,
+    PROMPT_MAX_TOKENS,
+    PROMPT_MAX_RAW_TOKENS,
+    PROMPT_MAX_HISTORY_TOKENS,
+    PROMPT_MAX_INSIGHT_TOKENS,
+    PROMPT_MAX_WORKED_SOLUTIONS,
+)
 from app.core.context_schema import ResolvedContext
+from app.core.token_budget import estimate_tokens, clip_to_tokens
+
+
+@dataclass(frozen=True)
+class PromptBudget:
+    max_total_tokens: int = PROMPT_MAX_TOKENS
+    max_raw_prompt_tokens: int = PROMPT_MAX_RAW_TOKENS
+    max_history_tokens: int = PROMPT_MAX_HISTORY_TOKENS
+    max_worked_solutions: int = PROMPT_MAX_WORKED_SOLUTIONS
+    max_insight_tokens: int = PROMPT_MAX_INSIGHT_TOKENS
 
 
-def build_prompt(ctx: ResolvedContext) -> str:
+def _render(
+    ctx: ResolvedContext, raw_prompt: str, worked: list[str], insights: Sequence[str] = ()
+) -> str:
+    # `insights` are the already clipped "title: solution" lines from build_prompt
+    community = "".join(f"\n- {line}" for line in insights)
+    community = f"""
+WHAT WORKED FOR OTHER TEACHERS (adapt, do not copy):{community}
+""" if insights else ""
     return f"""
 You are assisting a government school teacher DURING class.
 
@@ -11,15 +41,15 @@ KNOWN FACTS:
 - Language: {ctx.classroom.language}
 - Teaching style: {ctx.teacher.style}
 - Experience: {ctx.teacher.years_experience} years
-- Previously worked approaches: {ctx.history.worked_solutions}
-
+- Previously worked approaches: {worked}
+{community}
 UNKNOWN:
 - Materials availability
 - Class size
 - Time pressure (unless specified)
 
 CURRENT PROBLEM (teacher words):
-{ctx.raw_prompt}
+{raw_prompt}
 
 RULES:
 - Do NOT assume missing information.
@@ -32,3 +62,121 @@ OUTPUT FORMAT:
 - Extension task (advanced students)
 - Quick check question
 """
+
+
+def build_prompt(
+    ctx: ResolvedContext,
+    budget: PromptBudget = PromptBudget(),
+    insights: Sequence[tuple[str, str]] = (),
+) -> str:
+    """
+    Render the coach prompt within `budget`.
+
+    `insights` are (title, solution) pairs of community teaching insights,
+    most relevant first (see insight_index.py). Each is clipped on its own.
+
+    Each section is first capped on its own (most recent N worked
+    solutions, clipped teacher text). If the whole prompt is still over
+    the total budget, community insights are dropped least relevant
+    first, then history oldest-first, before the teacher's own words are
+    clipped further.
+    """
+    raw_prompt = clip_to_tokens(ctx.raw_prompt, budget.max_raw_prompt_tokens)
+    community = [
+        clip_to_tokens(f"{title}: {solution}", budget.max_insight_tokens)
+        for title, solution in insights
+    ]
+
+    # history is ordered most recent first
+    worked = list(ctx.history.worked_solutions[:budget.max_worked_solutions])
+    while worked and estimate_tokens(str(worked)) > budget.max_history_tokens:
+        worked.pop()
+
+    prompt = _render(ctx, raw_prompt, worked, community)
+    while community and estimate_tokens(prompt) > budget.max_total_tokens:
+        community.pop()
+        prompt = _render(ctx, raw_prompt, worked, community)
+    while worked and estimate_tokens(prompt) > budget.max_total_tokens:
+        worked.pop()
+        prompt = _render(ctx, raw_prompt, worked, community)
+
+    overflow = estimate_tokens(prompt) - budget.max_total_tokens
+    if overflow > 0:
+        raw_prompt = clip_to_tokens(raw_prompt, max(0, estimate_tokens(raw_prompt) - overflow))
+        prompt = _render(ctx, raw_prompt, worked, community)
+
+    return prompt
+
+
+# ---------- Follow-up turns ----------
+
+def _render_followup(
+    ctx: ResolvedContext, summary: str | None, turns: list[tuple[str, str]], message: str
+) -> str:
+    earlier = f"""
+EARLIER IN THIS CONVERSATION (summary):
+{summary}
+""" if summary else ""
+    recent = "\n".join(f"{role.upper()}: {content}" for role, content in turns)
+    return f"""
+You are assisting a government school teacher DURING class.
+This is a follow-up in an ongoing conversation.
+
+KNOWN FACTS:
+- Grade: {ctx.classroom.grade}
+- Subject: {ctx.classroom.subject}
+- Language: {ctx.classroom.language}
+- Teaching style: {ctx.teacher.style}
+- Experience: {ctx.teacher.years_experience} years
+{earlier}
+RECENT MESSAGES:
+{recent}
+
+TEACHER NOW SAYS:
+{message}
+
+RULES:
+- Build on what was already suggested; do not repeat it.
+- Do NOT assume missing information.
+- Give immediate, in-class actions only.
+"""
+
+
+def build_followup_prompt(
+    ctx: ResolvedContext,
+    summary: str | None,
+    turns: list[tuple[str, str]],
+    message: str,
+    max_total_tokens: int = CONVERSATION_MAX_PROMPT_TOKENS,
+) -> str:
+    """
+    Prompt for a follow-up message. `turns` are (role, content) pairs,
+    oldest first, from the recent window only; anything older is
+    represented by `summary`. Turns are clipped individually, then
+    dropped oldest-first until the prompt fits.
+    """
+    message = clip_to_tokens(message, PROMPT_MAX_RAW_TOKENS)
+    summary = clip_to_tokens(summary, CONVERSATION_SUMMARY_MAX_TOKENS) if summary else None
+    turns = [(role, clip_to_tokens(content, CONVERSATION_MAX_TURN_TOKENS)) for role, content in turns]
+
+    prompt = _render_followup(ctx, summary, turns, message)
+    while turns and estimate_tokens(prompt) > max_total_tokens:
+        turns.pop(0)
+        prompt = _render_followup(ctx, summary, turns, message)
+    return prompt
+
+
+def build_summary_prompt(previous_summary: str | None, turns: list[tuple[str, str]]) -> str:
+    """Fold a batch of older turns into the running summary."""
+    transcript = "\n".join(f"{role.upper()}: {content}" for role, content in turns)
+    return f"""
+Update the running summary of a conversation between a teacher and a
+classroom coach. Keep what was tried, what worked or failed, and any
+facts about the class. At most {CONVERSATION_SUMMARY_MAX_TOKENS * 3 // 4} words. Reply with the summary only.
+
+CURRENT SUMMARY:
+{previous_summary or "(none)"}
+
+NEW MESSAGES:
+{transcript}
+"""
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import (
+    SEMANTIC_CACHE_MAX_PER_SCOPE,
+    SEMANTIC_CACHE_MAX_SCOPES,
+    SEMANTIC_CACHE_THRESHOLD,
+)
+from app.core.context_schema import ResolvedContext
+from app.core.text_vectors import HashingVectorizer
+
+
+def _norm(value) -> str:
+    return str(value).strip().lower() if value is not None else ""
+
+
+def context_scope(ctx: ResolvedContext) -> tuple[str, str, str]:
+    """Responses are only reused within the same grade/subject/language."""
+    return (
+        _norm(ctx.classroom.grade),
+        _norm(ctx.classroom.subject),
+        _norm(ctx.classroom.language),
+    )
+
+
+class _ScopeIndex:
+    """Fixed-capacity matrix of prompt vectors with LRU slot reuse."""
+
+    def __init__(self, capacity: int, dim: int):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.responses: list[Optional[str]] = [None] * capacity
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+
+    def nearest(self, vec: np.ndarray) -> tuple[int, float]:
+        scores = self.vectors[:self.size] @ vec
+        idx = int(np.argmax(scores))
+        return idx, float(scores[idx])
+
+    def add(self, vec: np.ndarray, response: str, tick: int) -> None:
+        if self.size < len(self.responses):
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(np.argmin(self.last_used))
+        self.vectors[slot] = vec
+        self.responses[slot] = response
+        self.last_used[slot] = tick
+
+
+class SemanticCache:
+    """
+    Near-duplicate response cache for coach prompts.
+
+    `ctx.raw_prompt` is embedded locally with a hashing vectorizer and
+    compared by cosine similarity against earlier prompts from the same
+    scope. Memory is bounded by `max_scopes * max_per_scope` vectors;
+    both the scopes and the entries inside a scope are evicted LRU.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_per_scope: int = SEMANTIC_CACHE_MAX_PER_SCOPE,
+        max_scopes: int = SEMANTIC_CACHE_MAX_SCOPES,
+        vectorizer: HashingVectorizer | None = None,
+    ):
+        self.threshold = threshold
+        self.max_per_scope = max_per_scope
+        self.max_scopes = max_scopes
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self._scopes: OrderedDict[tuple, _ScopeIndex] = OrderedDict()
+        self._lock = threading.Lock()
+        self._tick = 0
+        self.lookups = 0
+        self.hits = 0
+        self.evicted_scopes = 0
+
+    def lookup(self, ctx: ResolvedContext) -> Optional[str]:
+        vec = self.vectorizer.transform(ctx.raw_prompt)
+        scope = context_scope(ctx)
+        with self._lock:
+            self.lookups += 1
+            index = self._scopes.get(scope)
+            if index is None or index.size == 0 or not vec.any():
+                return None
+            self._scopes.move_to_end(scope)
+
+            idx, score = index.nearest(vec)
+            if score < self.threshold:
+                return None
+
+            self._tick += 1
+            index.last_used[idx] = self._tick
+            self.hits += 1
+            return index.responses[idx]
+
+    def store(self, ctx: ResolvedContext, response: str) -> None:
+        vec = self.vectorizer.transform(ctx.raw_prompt)
+        if not vec.any():
+            return
+        scope = context_scope(ctx)
+        with self._lock:
+            index = self._scopes.get(scope)
+            if index is None:
+                index = _ScopeIndex(self.max_per_scope, self.vectorizer.dim)
+                self._scopes[scope] = index
+                if len(self._scopes) > self.max_scopes:
+                    self._scopes.popitem(last=False)
+                    self.evicted_scopes += 1
+            self._scopes.move_to_end(scope)
+            self._tick += 1
+            index.add(vec, response, self._tick)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "scopes": len(self._scopes),
+                "entries": sum(i.size for i in self._scopes.values()),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "evicted_scopes": self.evicted_scopes,
+                "threshold": self.threshold,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticCache:
+    return SemanticCache()
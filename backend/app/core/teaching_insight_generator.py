@@ -12,8 +12,6 @@ def generate_teaching_insight(
     ai_response: str,
     resolved_context: dict,
 ) -> dict:
-    llm = get_llm()
-
     prompt = build_teaching_insight_prompt(
         raw_query=raw_query,
         ai_response=ai_response,
@@ -21,7 +19,15 @@ def generate_teaching_insight(
     )
 
     try:
-        output = llm.generate(prompt)
+        output = get_llm().generate(prompt)
+    except LLMError as e:
+        raise TeachingInsightGenerationError(str(e))
+
+    return parse_teaching_insight(output)
+
+
+def parse_teaching_insight(output: str) -> dict:
+    try:
         # print("🧠 RAW LLM OUTPUT:\n", output)
 
         # 🛡️ Extract JSON defensively (LLMs often add text)
@@ -37,8 +43,6 @@ def generate_teaching_insight(
         raise TeachingInsightGenerationError(
             f"Invalid JSON from LLM: {e}"
         )
-    except LLMError as e:
-        raise TeachingInsightGenerationError(str(e))
 
     # =========================
     # 🔁 Normalize LLM output
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import re
+import zlib
+from collections import Counter
+from typing import Iterable
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Small English list; Hindi/Marathi text passes through untouched.
+STOPWORDS = frozenset("""
+a an and are as at be been but by can do does for from had has have how i
+in is it its me my of on or our so that the their them then there they this
+to too was we were what when which who will with you your very just
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        t for t in _TOKEN_RE.findall(text.lower())
+        if t not in STOPWORDS
+    ]
+
+
+class HashingVectorizer:
+    """
+    Stateless text -> unit vector mapping using the hashing trick.
+
+    Features are word unigrams, word bigrams and (optionally) character
+    trigrams inside words, so "listen"/"listening" still overlap. Nothing
+    is fitted, which keeps vectors comparable across processes and lets
+    indexes grow one document at a time.
+    """
+
+    def __init__(self, dim: int = 4096, char_ngrams: bool = True):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+
+    def _features(self, text: str) -> Iterable[tuple[str, float]]:
+        tokens = tokenize(text)
+        for t in tokens:
+            yield t, 1.0
+        for a, b in zip(tokens, tokens[1:]):
+            yield f"{a} {b}", 1.0
+        if self.char_ngrams:
+            for t in tokens:
+                padded = f" {t} "
+                for i in range(len(padded) - 2):
+                    yield "#" + padded[i:i + 3], 0.5
+
+    def transform(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        counts: Counter[str] = Counter()
+        weights: dict[str, float] = {}
+        for feature, weight in self._features(text):
+            counts[feature] += 1
+            weights[feature] = weight
+
+        for feature, count in counts.items():
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            # sublinear tf so one repeated word can't dominate
+            vec[h % self.dim] += sign * weights[feature] * (1.0 + np.log(count))
+
+        norm = float(np.linalg.norm(vec))
+        if norm > 0:
+            vec /= norm
+        return vec
+
+    def transform_many(self, texts: Iterable[str]) -> np.ndarray:
+        rows = [self.transform(t) for t in texts]
+        if not rows:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack(rows)
@@ -3,6 +3,11 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+# Mapper listeners that keep teacher_outcome_summaries in step with
+# TeacherSolutionOutcome. Every writer gets its session from this module,
+# so registering them here covers the API, the worker and the scripts.
+from app.core import outcome_summary  # noqa: F401
+
 load_dotenv() # reads backend/.env
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -1,4 +1,7 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 
 from app.api.coach import router as coach_router
 from app.api.schools import router as schools_router
@@ -6,9 +9,23 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.auth import router as auth_router
 from app.api.conversations import router as conversations_router
 from app.api.teaching_insights import router as teaching_insights_router
+from app.api.metrics import router as metrics_router
+from app.api.export import router as export_router
+from app.core.catalog import warm_catalog
+from app.core.config import INSIGHT_RETRIEVAL_ENABLED
+from app.core.insight_index import warm_insight_index
+from app.db.session import SessionLocal
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(warm_catalog, SessionLocal)
+    if INSIGHT_RETRIEVAL_ENABLED:
+        warm_insight_index(SessionLocal)
+    yield
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(auth_router)
 
 app.add_middleware(
@@ -21,6 +38,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/health")
@@ -31,4 +49,6 @@ app.include_router(teaching_insights_router)
 app.include_router(schools_router)
 app.include_router(coach_router)
 app.include_router(conversations_router)
+app.include_router(metrics_router)
+app.include_router(export_router)
 
@@ -6,7 +6,6 @@ from app.models.core import (  # noqa: F401
     School, Grade, Subject, Solution, SolutionOutcome,
     Language, TeacherLanguage,  
     Teacher, TeacherStyle, TeacherClassSubject, TeacherPastGrade, TeacherPastSubject,
-    TeacherSolutionOutcome,
+    TeacherSolutionOutcome, TeacherOutcomeSummary,
     Session, SessionFeedback,
 )
-
@@ -1,14 +1,26 @@
+import enum
 import uuid
 from sqlalchemy import (
+    DDL,
+    CheckConstraint,
     Column,
+    Computed,
     Text,
     DateTime,
     Boolean,
+    Enum as SAEnum,
     ForeignKey,
     Integer,
+    BigInteger,
+    Float,
+    Index,
+    SmallInteger,
     UniqueConstraint,
+    event,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR, ARRAY
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from app.db.base import Base
@@ -37,6 +49,13 @@ class Conversation(Base):
     # feedback
     worked = Column(Boolean, nullable=True)
 
+    # estimated size of the final prompt sent to the LLM
+    prompt_tokens = Column(Integer, nullable=True)
+
+    # rolling summary of messages with seq <= summarized_through
+    summary = Column(Text, nullable=True)
+    summarized_through = Column(Integer, nullable=False, server_default="0")
+
     # 🆕 added columns
     title = Column(Text, nullable=False)
     updated_at = Column(
@@ -52,6 +71,62 @@ class Conversation(Base):
         nullable=False
     )
 
+    # full-text search over title > question > answer; 'simple' config
+    # because conversations mix English, Hindi and transliteration
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(raw_query, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(ai_response, '')), 'C')",
+            persisted=True,
+        ),
+    ))
+
+    __table_args__ = (
+        # history list: keyset pagination on (updated_at, id) per teacher
+        Index(
+            "ix_conversations_teacher_updated_at",
+            teacher_id, updated_at.desc(), id.desc(),
+        ),
+        Index("ix_conversations_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+# =====================================================
+# Conversation messages (append-only thread log)
+# =====================================================
+
+class MessageRole(enum.Enum):
+    teacher = "teacher"
+    assistant = "assistant"
+
+
+class ConversationMessage(Base):
+    """
+    One turn of a conversation thread. Never updated; `seq` is
+    1-based and dense per conversation.
+    """
+
+    __tablename__ = "conversation_messages"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    conversation_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    seq = Column(Integer, nullable=False)
+    role = Column(SAEnum(MessageRole, name="message_role"), nullable=False)
+    content = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("conversation_id", "seq", name="uq_conversation_message_seq"),
+    )
+
 
 # =====================================================
 # Teaching Insight (global, anonymized)
@@ -76,16 +151,144 @@ class TeachingInsight(Base):
     reframed_problem = Column(Text, nullable=False)
     reframed_solution = Column(Text, nullable=False)
 
-    # Engagement metrics (no ranking yet)
+    # Net likes (likes minus dislikes) as of the last rollup; pending
+    # deltas live in teaching_insight_like_shards
     likes_count = Column(Integer, nullable=False, server_default="0")
 
+    # uniform [0, 1) sort key for O(limit) random sampling of the feed
+    random_key = Column(Float, nullable=False, server_default=func.random(), index=True)
+
+    # How many worked conversations produced this insight; near-duplicates
+    # are merged into it instead of creating new rows (insight_dedup.py)
+    support_count = Column(Integer, nullable=False, server_default="1")
+
+    # MinHash signature of problem + solution; only read by the dedup check
+    minhash = deferred(Column(ARRAY(BigInteger), nullable=True))
+
+    # indexed for the retrieval index's incremental sync (insight_index.py)
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
         nullable=False,
+        index=True,
+    )
+
+
+class InsightLshBucket(Base):
+    """
+    LSH band buckets of insight MinHash signatures. Insights sharing any
+    (band, bucket) with a new one are its near-duplicate candidates.
+    """
+
+    __tablename__ = "insight_lsh_buckets"
+
+    band = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    teaching_insight_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("teaching_insights.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+
+# =====================================================
+# Insight feed ranking (precomputed per audience segment)
+# =====================================================
+
+class InsightFeedRanking(Base):
+    """
+    Score of an insight for one audience segment ("grade|subject|language").
+    Written by app/core/feed_ranking.py; the feed is a range read on
+    (segment, score DESC).
+    """
+
+    __tablename__ = "insight_feed_rankings"
+
+    segment = Column(Text, primary_key=True)
+    teaching_insight_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("teaching_insights.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_insight_feed_rankings_segment_score",
+            segment, score.desc(), teaching_insight_id.desc(),
+        ),
+    )
+
+
+class InsightFeedRankingVersion(Base):
+    """
+    Single-row change counter for insight_feed_rankings, polled by the
+    feed page cache (feed_cache.py). Statement triggers on the rankings
+    table bump it whenever rows are inserted, updated or deleted,
+    including deletes cascaded from teaching_insights. The bump is part
+    of the writing transaction, so the new value only becomes visible
+    once the ranking change itself is committed.
+    """
+
+    __tablename__ = "insight_feed_ranking_version"
+
+    id = Column(SmallInteger, primary_key=True, server_default=text("1"))
+    version = Column(BigInteger, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        CheckConstraint("id = 1", name="ck_insight_feed_ranking_version_single_row"),
     )
 
 
+# Kept in step with migration 9c1e7a4b2d58. Transition tables let a
+# statement that changed no rows (e.g. a rescore under
+# FEED_RESCORE_MIN_DELTA) leave the version alone.
+FEED_RANKING_VERSION_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION bump_insight_feed_ranking_version() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM 1 FROM old_rows LIMIT 1;
+        ELSE
+            PERFORM 1 FROM new_rows LIMIT 1;
+        END IF;
+        IF FOUND THEN
+            INSERT INTO insight_feed_ranking_version (id, version) VALUES (1, 1)
+            ON CONFLICT (id) DO UPDATE
+            SET version = insight_feed_ranking_version.version + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER trg_insight_feed_rankings_version_insert
+    AFTER INSERT ON insight_feed_rankings REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_insight_feed_ranking_version()
+    """,
+    """
+    CREATE TRIGGER trg_insight_feed_rankings_version_update
+    AFTER UPDATE ON insight_feed_rankings REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_insight_feed_ranking_version()
+    """,
+    """
+    CREATE TRIGGER trg_insight_feed_rankings_version_delete
+    AFTER DELETE ON insight_feed_rankings REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_insight_feed_ranking_version()
+    """,
+]
+
+for _statement in FEED_RANKING_VERSION_DDL:
+    event.listen(InsightFeedRanking.__table__, "after_create", DDL(_statement))
+event.listen(
+    InsightFeedRanking.__table__,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS bump_insight_feed_ranking_version()"),
+)
+
+
 # =====================================================
 # Teaching Insight Reaction (like / dislike)
 # =====================================================
@@ -129,3 +332,81 @@ class TeachingInsightReaction(Base):
             name="uq_teacher_insight_reaction_once",
         ),
     )
+
+
+class TeachingInsightLikeShard(Base):
+    """
+    Pending likes_count deltas, spread over LIKE_COUNTER_SHARDS rows per
+    insight so concurrent reactions rarely touch the same row. Drained into
+    teaching_insights.likes_count by like_counters.rollup_likes().
+    """
+
+    __tablename__ = "teaching_insight_like_shards"
+
+    teaching_insight_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("teaching_insights.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    shard = Column(Integer, primary_key=True)
+    delta = Column(Integer, nullable=False, server_default="0")
+
+
+# =====================================================
+# Teaching Insight generation jobs (Postgres-backed queue)
+# =====================================================
+
+class InsightJobStatus(enum.Enum):
+    pending = "pending"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class TeachingInsightJob(Base):
+    """
+    One insight-generation job per conversation marked as worked.
+    Claimed by workers with FOR UPDATE SKIP LOCKED; see app/core/insight_jobs.py.
+    """
+
+    __tablename__ = "teaching_insight_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    conversation_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+
+    status = Column(
+        SAEnum(InsightJobStatus, name="insight_job_status"),
+        nullable=False,
+        server_default=InsightJobStatus.pending.value,
+    )
+    attempts = Column(Integer, nullable=False, server_default="0")
+    max_attempts = Column(Integer, nullable=False, server_default="5")
+
+    # earliest time the job may be (re)claimed; pushed out on retry backoff
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    teaching_insight_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("teaching_insights.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_teaching_insight_jobs_status_run_after", "status", "run_after"),
+    )
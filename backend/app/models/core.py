@@ -5,7 +5,7 @@ from sqlalchemy import (
     Column, Text, Integer, DateTime, ForeignKey, Enum as SAEnum,
     UniqueConstraint, CheckConstraint
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.sql import func
 
 from sqlalchemy import text
@@ -207,6 +207,26 @@ class TeacherSolutionOutcome(Base):
     )
 
 
+class TeacherOutcomeSummary(Base):
+    """
+    Rollup of TeacherSolutionOutcome per teacher: counts plus the most
+    recent solution ids of each kind (newest first), so context
+    resolution does not scale with history length.
+    Maintained by app/core/outcome_summary.py.
+    """
+    __tablename__ = "teacher_outcome_summaries"
+
+    teacher_id = Column(UUID(as_uuid=True), ForeignKey("teachers.id", ondelete="CASCADE"), primary_key=True)
+
+    worked_count = Column(Integer, nullable=False, server_default="0")
+    failed_count = Column(Integer, nullable=False, server_default="0")
+
+    recent_worked = Column(ARRAY(UUID(as_uuid=True)), nullable=False, server_default=text("'{}'"))
+    recent_failed = Column(ARRAY(UUID(as_uuid=True)), nullable=False, server_default=text("'{}'"))
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
 # -----------------------
 # Your existing tables (recommendation: normalize Session too)
 # -----------------------
@@ -0,0 +1,22 @@
+import argparse
+
+from app.core.outcome_summary import rebuild_outcome_summaries
+from app.db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild teacher_outcome_summaries from teacher_solution_outcomes."
+    )
+    parser.add_argument("--teacher-id", help="Only rebuild this teacher's summary.")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        written = rebuild_outcome_summaries(db, teacher_id=args.teacher_id)
+        db.commit()
+
+    print(f"Rebuilt {written} teacher outcome summaries.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import statistics
+import time
+
+from sqlalchemy import event, select
+
+from app.core.context_resolver import resolve_context
+from app.db.session import SessionLocal, engine
+from app.models.core import Teacher
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare per-table vs single-query context resolution."
+    )
+    parser.add_argument("--email", help="Teacher to resolve (default: first teacher).")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument(
+        "--rtt-ms",
+        type=float,
+        default=0.0,
+        help="Extra delay added to every statement, to mimic a remote DB link.",
+    )
+    args = parser.parse_args()
+
+    queries = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        nonlocal queries
+        queries += 1
+        if args.rtt_ms:
+            time.sleep(args.rtt_ms / 1000)
+
+    with SessionLocal() as db:
+        stmt = select(Teacher.id)
+        if args.email:
+            stmt = stmt.where(Teacher.email == args.email)
+        teacher_id = db.execute(stmt.limit(1)).scalar_one_or_none()
+        if teacher_id is None:
+            raise SystemExit("No teacher found; run scripts/seed_db.py first.")
+
+        for single_query in (False, True):
+            resolve_context(db, teacher_id, "warmup", single_query=single_query)
+
+            queries = 0
+            timings = []
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                resolve_context(db, teacher_id, "benchmark", single_query=single_query)
+                timings.append((time.perf_counter() - start) * 1000)
+                db.rollback()
+
+            timings.sort()
+            label = "single-query" if single_query else "per-table"
+            print(
+                f"{label:>12}: {queries / args.iterations:.1f} queries/call, "
+                f"p50 {statistics.median(timings):.2f} ms, "
+                f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
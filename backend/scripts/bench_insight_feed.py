@@ -0,0 +1,72 @@
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.insight_sampling import sample_insights
+from app.db.session import engine
+from app.models.conversations import TeachingInsight
+
+
+FILL = text("""
+    INSERT INTO teaching_insights
+        (id, title, generalized_context, reframed_problem, reframed_solution)
+    SELECT gen_random_uuid(), 'bench ' || n, '{}'::jsonb, 'problem', 'solution'
+    FROM generate_series(1, :n) AS n
+""")
+
+
+def _time(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare ORDER BY random() with random-key sampling for the insight feed. "
+                    "Rows are inserted in a transaction that is rolled back at the end."
+    )
+    parser.add_argument("--sizes", default="100000,1000000", help="Comma-separated table sizes.")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        db = Session(bind=conn)
+        try:
+            existing = db.query(TeachingInsight).count()
+            for size in sizes:
+                if size > existing:
+                    conn.execute(FILL, {"n": size - existing})
+                    existing = size
+                conn.execute(text("ANALYZE teaching_insights"))
+
+                def order_by_random():
+                    conn.execute(text(
+                        "SELECT id FROM teaching_insights ORDER BY random() LIMIT :limit"
+                    ), {"limit": args.limit}).all()
+
+                def random_key():
+                    sample_insights(db, args.limit)
+                    db.expunge_all()
+
+                for label, fn in (("ORDER BY random()", order_by_random), ("random_key scan", random_key)):
+                    p50, p95 = _time(fn, args.iterations)
+                    print(f"{size:>9} rows  {label:<18} p50 {p50:8.2f} ms  p95 {p95:8.2f} ms")
+        finally:
+            db.close()
+            trans.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from app.core.insight_index import InsightIndex
+
+WORDS = (
+    "students noisy group work listen talk homework fractions reading copy "
+    "attention phone late absent shy answer question board chalk exam test "
+    "story poem drawing experiment plants water map history games pairs"
+).split()
+SUBJECTS = ["Mathematics", "Science", "English", "Hindi", "EVS", "Social Science"]
+
+
+def _text(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 25)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure insight retrieval latency on a synthetic in-memory index."
+    )
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    index = InsightIndex()
+
+    start = time.perf_counter()
+    for _ in range(args.size):
+        ctx = {"grade": rng.randint(1, 12), "subject": rng.choice(SUBJECTS)}
+        index.add(uuid.uuid4(), ctx, _text(rng))
+    print(f"indexed {args.size} insights in {time.perf_counter() - start:.1f}s "
+          f"({index.stats()['partitions']} partitions)")
+
+    timings = []
+    for _ in range(args.queries):
+        text, grade, subject = _text(rng), rng.randint(1, 12), rng.choice(SUBJECTS)
+        start = time.perf_counter()
+        index.search(text, grade, subject, k=args.k, min_score=0.0)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f"query p50={statistics.median(timings):.2f}ms "
+          f"p95={timings[int(len(timings) * 0.95) - 1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
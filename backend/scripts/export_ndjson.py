@@ -0,0 +1,49 @@
+import argparse
+import sys
+from datetime import datetime
+
+from app.core.exporter import EXPORTERS, EXPORT_BATCH_SIZE, gzip_chunks, ndjson_lines
+from app.db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stream conversations or teaching insights as NDJSON."
+    )
+    parser.add_argument("kind", choices=sorted(EXPORTERS))
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout).")
+    parser.add_argument("--gzip", action="store_true", help="Gzip-compress the output.")
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Only rows updated/created at or after this ISO timestamp.",
+    )
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    count = 0
+    try:
+        with SessionLocal() as db:
+            rows = EXPORTERS[args.kind](db, since=args.since, batch_size=args.batch_size)
+
+            def counted():
+                nonlocal count
+                for row in rows:
+                    count += 1
+                    yield row
+
+            chunks = ndjson_lines(counted())
+            if args.gzip:
+                chunks = gzip_chunks(chunks)
+            for chunk in chunks:
+                out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+    print(f"Exported {count} {args.kind}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
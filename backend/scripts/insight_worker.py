@@ -0,0 +1,47 @@
+import argparse
+import signal
+import threading
+
+from app.core.config import INSIGHT_WORKER_CONCURRENCY, INSIGHT_WORKER_POLL_SEC
+from app.core.insight_jobs import run_worker
+from app.db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process queued teaching-insight generation jobs.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=INSIGHT_WORKER_CONCURRENCY,
+        help="Max jobs processed at the same time by this worker.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=INSIGHT_WORKER_POLL_SEC,
+        help="Seconds to wait before polling again when the queue is empty.",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Claim one batch, finish it and exit (useful for cron / tests).",
+    )
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    print(f"Insight worker started (concurrency={args.concurrency}).")
+    run_worker(
+        SessionLocal,
+        concurrency=args.concurrency,
+        poll_sec=args.poll_interval,
+        stop=stop,
+        once=args.once,
+    )
+    print("Insight worker stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import argparse
+
+from app.core.insight_dedup import rebuild_index
+from app.db.session import SessionLocal
+
+
+def main():
+    argparse.ArgumentParser(
+        description="Recompute MinHash signatures and LSH buckets for all teaching insights."
+    ).parse_args()
+
+    with SessionLocal() as db:
+        indexed = rebuild_index(db)
+        db.commit()
+
+    print(f"Indexed {indexed} teaching insights.")
+
+
+if __name__ == "__main__":
+    main()
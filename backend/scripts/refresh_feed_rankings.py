@@ -0,0 +1,24 @@
+import argparse
+
+from app.core.config import FEED_RANK_DEPTH
+from app.core.feed_ranking import refresh_segments
+from app.db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild insight_feed_rankings for every active teacher segment."
+    )
+    parser.add_argument("--depth", type=int, default=FEED_RANK_DEPTH,
+                        help="Insights kept per segment.")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        written = refresh_segments(db, depth=args.depth)
+        db.commit()
+
+    print(f"Wrote {written} feed ranking rows.")
+
+
+if __name__ == "__main__":
+    main()
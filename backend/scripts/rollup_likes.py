@@ -0,0 +1,42 @@
+import argparse
+import signal
+import threading
+
+from app.core.config import LIKE_ROLLUP_INTERVAL_SEC
+from app.core.like_counters import rollup_likes
+from app.db.session import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Periodically fold sharded like counters into teaching_insights.likes_count."
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=LIKE_ROLLUP_INTERVAL_SEC,
+        help="Seconds between rollups.",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run a single rollup and exit (useful for cron / tests).",
+    )
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    while not stop.is_set():
+        with SessionLocal() as db:
+            ids = rollup_likes(db)
+            db.commit()
+        print(f"[like-rollup] updated {len(ids)} insights")
+        if args.once:
+            break
+        stop.wait(args.interval)
+
+
+if __name__ == "__main__":
+    main()
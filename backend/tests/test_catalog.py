@@ -0,0 +1,132 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.core import catalog as catalog_module
+from app.core.catalog import Catalog, CatalogCache
+from app.core.context_resolver import resolve_context
+from app.db.session import get_db
+from app.main import app
+from app.models import Subject, TeacherStyle
+
+
+SUBJECT_ID = "5b0e7c1c-1111-4a5e-9c8e-000000000001"
+
+CATALOG = Catalog(
+    grades={4: "Grade 4"},
+    subjects={SUBJECT_ID: "Mathematics"},
+    schools=[{"id": "s1", "name": "GHS Andheri", "location": "Mumbai"}],
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingLoader:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self, db):
+        self.calls += 1
+        time.sleep(self.delay)
+        return CATALOG
+
+
+def test_lookups():
+    assert CATALOG.subject_name(SUBJECT_ID) == "Mathematics"
+    assert CATALOG.grade_label(4) == "Grade 4"
+    assert CATALOG.subject_name("unknown") is None
+
+
+def test_reloads_after_ttl():
+    clock, loader = FakeClock(), CountingLoader()
+    cache = CatalogCache(ttl_sec=60, loader=loader, clock=clock)
+
+    cache.get(None)
+    cache.get(None)
+    clock.now = 61
+    cache.get(None)
+
+    assert loader.calls == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_concurrent_cold_reads_load_once():
+    loader = CountingLoader(delay=0.05)
+    cache = CatalogCache(loader=loader)
+
+    threads = [threading.Thread(target=cache.get, args=(None,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert loader.calls == 1
+
+
+def test_invalidate_during_cached_read_still_returns_catalog():
+    cache = CatalogCache(loader=CountingLoader())
+    cache.get(None)
+
+    def clock():
+        # a commit in another thread lands between the freshness check
+        # and the return
+        cache.invalidate()
+        return 0.0
+
+    cache.clock = clock
+    assert cache.get(None) is CATALOG
+
+
+def test_committed_catalog_write_invalidates():
+    loader = CountingLoader()
+    cache = CatalogCache(loader=loader)
+    cache.get(None)
+
+    unrelated = SimpleNamespace(info={}, new=[TeacherStyle()], dirty=[], deleted=[])
+    subject_write = SimpleNamespace(info={}, new=[Subject(name="EVS")], dirty=[], deleted=[])
+
+    with patch.object(catalog_module, "get_catalog_cache", return_value=cache):
+        for session in (unrelated, subject_write):
+            catalog_module._note_catalog_writes(session, None)
+            catalog_module._invalidate_catalog(session)
+            cache.get(None)
+
+    assert loader.calls == 2
+
+
+def test_resolver_turns_subject_id_into_name():
+    cache = CatalogCache(loader=CountingLoader())
+    row = {"grade_id": 4, "subject_id": SUBJECT_ID}
+
+    with patch("app.core.context_resolver.fetch_teacher_context", return_value=row):
+        ctx = resolve_context(None, "t1", "Help", single_query=True, catalog=cache)
+        given = resolve_context(None, "t1", "Help", subject="EVS", single_query=True, catalog=cache)
+
+    assert ctx.classroom.subject == "Mathematics"
+    assert given.classroom.subject == "EVS"
+
+
+def test_schools_endpoint_served_from_catalog():
+    cache = CatalogCache(loader=CountingLoader())
+    app.dependency_overrides[get_db] = lambda: None
+    try:
+        with patch("app.api.schools.get_catalog_cache", return_value=cache), \
+             patch("app.main.warm_catalog"):
+            with TestClient(app) as c:
+                first = c.get("/schools")
+                second = c.get("/schools")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.json() == second.json() == CATALOG.schools
+    assert cache.stats()["loads"] == 1
@@ -0,0 +1,226 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.session import get_db
+from app.core.llm import LLMClient, LLMError
+from app.core.coach_fast_path import CoachFastPath
+from app.core.semantic_cache import SemanticCache
+from app.core.context_schema import (
+    ResolvedContext, TeacherCtx, ClassroomCtx, ConstraintsCtx, HistoryCtx
+)
+from app.utils.auth import create_access_token
+
+
+class FakeDB:
+    def __init__(self):
+        self.added = []
+        self.commits = 0
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class ChunkedLLM(LLMClient):
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+
+    def generate(self, prompt: str) -> str:
+        return "".join(self.chunks)
+
+    def stream(self, prompt: str):
+        for i, c in enumerate(self.chunks):
+            if self.fail_after is not None and i == self.fail_after:
+                raise LLMError("upstream died")
+            yield c
+
+
+def _ctx():
+    return ResolvedContext(
+        teacher=TeacherCtx(years_experience=3, preferred_language="Hindi", style=None),
+        classroom=ClassroomCtx(grade=6, subject="Mathematics", language="Hindi"),
+        constraints=ConstraintsCtx(time_left_minutes=10, materials_available=None, device=None),
+        history=HistoryCtx(),
+        raw_prompt="Class is noisy",
+    )
+
+
+def _events(body: str):
+    out = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def _post(llm, db, path="/api/coach/stream", semantic_cache=None,
+          candidates=(), fast_path=None, payload=None):
+    app.dependency_overrides[get_db] = lambda: db
+    token = create_access_token(sub="t1")
+    try:
+        with patch("app.api.coach.resolve_context", return_value=_ctx()), \
+             patch("app.api.coach.get_llm", return_value=llm), \
+             patch("app.api.coach.SEMANTIC_CACHE_ENABLED", semantic_cache is not None), \
+             patch("app.api.coach.get_semantic_cache", return_value=semantic_cache), \
+             patch("app.api.coach.retrieve_insights", return_value=list(candidates)), \
+             patch("app.api.coach.COACH_FAST_PATH_ENABLED", fast_path is not None), \
+             patch("app.api.coach.get_coach_fast_path", return_value=fast_path):
+            with TestClient(app) as c:
+                return c.post(
+                    path,
+                    json={"prompt": "Class is noisy", **(payload or {})},
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_default_stream_yields_full_generation():
+    class OneShot(LLMClient):
+        def generate(self, prompt: str) -> str:
+            return "all at once"
+
+    assert list(OneShot().stream("x")) == ["all at once"]
+
+
+def test_coach_stream_sends_tokens_then_persists_conversation():
+    db = FakeDB()
+    r = _post(ChunkedLLM(["- Clap ", "twice", "\n"]), db)
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(r.text)
+    assert [e for e, _ in events] == ["token", "token", "token", "done"]
+    assert "".join(d["text"] for e, d in events if e == "token") == "- Clap twice\n"
+
+    assert db.commits == 1
+    convo = db.added[0]
+    assert convo.ai_response == "- Clap twice"
+    assert events[-1][1]["conversation_id"] == str(convo.id)
+
+
+def test_coach_stream_reports_llm_failure_as_error_event():
+    db = FakeDB()
+    r = _post(ChunkedLLM(["partial", "never"], fail_after=1), db)
+
+    events = _events(r.text)
+    assert events[0] == ("token", {"text": "partial"})
+    assert events[-1][0] == "error"
+    assert events[-1][1]["status"] == 503
+    assert db.commits == 0
+
+
+def test_default_async_methods_bridge_sync_provider():
+    llm = ChunkedLLM(["a", "b", "c"])
+
+    async def collect():
+        return await llm.agenerate("x"), [c async for c in llm.astream("x")]
+
+    assert asyncio.run(collect()) == ("abc", ["a", "b", "c"])
+
+
+def test_coach_awaits_agenerate():
+    class AsyncOnly(LLMClient):
+        def generate(self, prompt: str) -> str:
+            raise AssertionError("sync path must not be used")
+
+        async def agenerate(self, prompt: str) -> str:
+            return "- Ask a quick question"
+
+    db = FakeDB()
+    r = _post(AsyncOnly(), db, path="/api/coach")
+
+    assert r.status_code == 200, r.text
+    assert r.json()["output"] == "- Ask a quick question"
+    assert db.added[0].ai_response == "- Ask a quick question"
+
+
+def test_coach_serves_near_duplicate_from_semantic_cache():
+    cache = SemanticCache(threshold=0.5)
+    first = _post(ChunkedLLM(["- Clap twice"]), FakeDB(), path="/api/coach", semantic_cache=cache)
+    assert first.json()["source"] == "llm"
+
+    class Unreachable(LLMClient):
+        async def agenerate(self, prompt: str) -> str:
+            raise AssertionError("should be served from cache")
+
+    db = FakeDB()
+    second = _post(Unreachable(), db, path="/api/coach", semantic_cache=cache)
+
+    assert second.json()["source"] == "semantic_cache"
+    assert second.json()["output"] == "- Clap twice"
+    assert db.added[0].ai_response == "- Clap twice"
+
+
+class Unreachable(LLMClient):
+    def generate(self, prompt: str) -> str:
+        raise AssertionError("should be served from the matched insight")
+
+    async def agenerate(self, prompt: str) -> str:
+        raise AssertionError("should be served from the matched insight")
+
+
+def _insight(likes, solution="Use a talking stick"):
+    return SimpleNamespace(id="i1", title="Talking stick", reframed_solution=solution, likes_count=likes)
+
+
+def test_fast_path_requires_similarity_and_likes():
+    fast_path = CoachFastPath(min_similarity=0.8, min_likes=5)
+
+    assert fast_path.match([(_insight(likes=10), 0.7)]) is None
+    assert fast_path.match([(_insight(likes=2), 0.95)]) is None
+    assert fast_path.match([(_insight(likes=2), 0.95), (_insight(likes=9), 0.9)]).likes_count == 9
+
+    stats = fast_path.stats()
+    assert (stats["lookups"], stats["hits"]) == (3, 1)
+    assert abs(stats["hit_ratio"] - 1 / 3) < 1e-9
+
+
+def test_coach_serves_matching_insight_without_llm():
+    db = FakeDB()
+    fast_path = CoachFastPath(min_similarity=0.8, min_likes=5)
+
+    r = _post(Unreachable(), db, path="/api/coach",
+              candidates=[(_insight(likes=12), 0.93)], fast_path=fast_path)
+
+    assert r.status_code == 200, r.text
+    assert r.json()["source"] == "teaching_insight"
+    assert r.json()["teaching_insight_id"] == "i1"
+    assert r.json()["output"] == "Use a talking stick"
+    assert db.added[0].ai_response == "Use a talking stick"
+    assert db.added[0].prompt_tokens is None
+    assert fast_path.stats()["hits"] == 1
+
+
+def test_fresh_request_skips_fast_path():
+    fast_path = CoachFastPath(min_similarity=0.8, min_likes=5)
+
+    r = _post(ChunkedLLM(["- New idea"]), FakeDB(), path="/api/coach",
+              candidates=[(_insight(likes=12), 0.93)], fast_path=fast_path,
+              payload={"fresh": True})
+
+    assert r.json()["source"] == "llm"
+    assert r.json()["output"] == "- New idea"
+    assert fast_path.stats()["lookups"] == 0
+
+
+def test_coach_stream_serves_matching_insight():
+    fast_path = CoachFastPath(min_similarity=0.8, min_likes=5)
+
+    r = _post(Unreachable(), FakeDB(), candidates=[(_insight(likes=12), 0.93)], fast_path=fast_path)
+
+    events = _events(r.text)
+    assert events[0] == ("token", {"text": "Use a talking stick"})
+    assert events[-1][1]["source"] == "teaching_insight"
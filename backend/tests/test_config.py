@@ -0,0 +1,24 @@
+import importlib
+import os
+from unittest.mock import patch
+
+from app.core import config
+
+
+def test_dotenv_values_reach_config(tmp_path, monkeypatch):
+    env_file = tmp_path / ".env"
+    env_file.write_text('LLM_PROVIDER="stub"\nINSIGHT_WORKER_CONCURRENCY=7\n')
+    monkeypatch.delenv("LLM_PROVIDER", raising=False)
+    monkeypatch.delenv("INSIGHT_WORKER_CONCURRENCY", raising=False)
+
+    try:
+        with patch("dotenv.main.find_dotenv", return_value=str(env_file)):
+            importlib.reload(config)
+        assert config.LLM_PROVIDER == "stub"
+        assert config.INSIGHT_WORKER_CONCURRENCY == 7
+    finally:
+        # load_dotenv wrote straight to os.environ; restore it, then config
+        for name in ("LLM_PROVIDER", "INSIGHT_WORKER_CONCURRENCY"):
+            os.environ.pop(name, None)
+        monkeypatch.undo()
+        importlib.reload(config)
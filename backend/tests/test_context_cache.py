@@ -0,0 +1,136 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.core import context_cache
+from app.core.context_cache import TeacherContextCache
+from app.core.context_resolver import resolve_context
+from app.models import TeacherSolutionOutcome, TeacherStyle
+
+
+PROFILE = {
+    "years_experience": 7,
+    "language": "Hindi",
+    "interactive_vs_passive": 7,
+    "light_vs_strict": 3,
+    "conventional_vs_modern": 6,
+    "has_style": True,
+    "grade_id": 4,
+    "subject_id": "Mathematics",
+    "worked": ["sol1"],
+    "failed": [],
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_miss_and_ttl():
+    clock = FakeClock()
+    cache = TeacherContextCache(max_entries=10, ttl_sec=60, clock=clock)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return PROFILE
+
+    cache.get_or_load("t1", loader)
+    cache.get_or_load("t1", loader)
+    clock.now += 61
+    cache.get_or_load("t1", loader)
+
+    assert len(loads) == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction():
+    cache = TeacherContextCache(max_entries=2, ttl_sec=60)
+    for key in ("a", "b", "a", "c"):
+        cache.get_or_load(key, lambda: PROFILE)
+
+    assert cache.stats()["entries"] == 2
+    cache.get_or_load("a", lambda: PROFILE)
+    assert cache.stats()["hits"] == 2   # "a" twice; "b" was evicted
+
+
+def test_invalidate_during_load_is_not_overwritten():
+    cache = TeacherContextCache()
+
+    def racing_loader():
+        # a write commits while this (now stale) load is in flight
+        cache.invalidate("t1")
+        return PROFILE
+
+    cache.get_or_load("t1", racing_loader)
+    assert cache.stats()["entries"] == 0
+
+
+def test_request_fields_are_overlaid_on_cached_profile():
+    cache = TeacherContextCache()
+
+    with patch("app.core.context_resolver.fetch_teacher_context", return_value=PROFILE) as mock_fetch:
+        first = resolve_context(
+            None, "t1", "Class is noisy", time_left_minutes=10,
+            single_query=True, cache=cache,
+        )
+        second = resolve_context(
+            None, "t1", "Fractions confuse them", grade=6, language="English",
+            single_query=True, cache=cache,
+        )
+
+    assert mock_fetch.call_count == 1
+    assert first.raw_prompt == "Class is noisy"
+    assert first.constraints.time_left_minutes == 10
+    assert first.classroom.grade == 4
+    assert second.raw_prompt == "Fractions confuse them"
+    assert second.constraints.time_left_minutes is None
+    assert second.classroom.grade == 6
+    assert second.teacher.preferred_language == "English"
+    assert second.history.worked_solutions == ["sol1"]
+
+
+def test_committed_writes_invalidate_the_teacher():
+    cache = TeacherContextCache()
+    teacher_id = uuid.uuid4()
+    other_id = uuid.uuid4()
+    cache.get_or_load(teacher_id, lambda: PROFILE)
+    cache.get_or_load(other_id, lambda: PROFILE)
+
+    session = SimpleNamespace(
+        info={},
+        new=[TeacherSolutionOutcome(teacher_id=teacher_id)],
+        dirty=[TeacherStyle(teacher_id=teacher_id)],
+        deleted=[],
+    )
+
+    with patch.object(context_cache, "get_context_cache", return_value=cache):
+        context_cache._collect_dirty_teachers(session, None)
+        assert cache.stats()["entries"] == 2     # nothing until commit
+        context_cache._invalidate_dirty_teachers(session)
+
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["invalidations"] == 1
+    cache.get_or_load(other_id, lambda: PROFILE)
+    assert cache.stats()["hits"] == 1
+
+
+def test_rolled_back_writes_do_not_invalidate():
+    cache = TeacherContextCache()
+    teacher_id = uuid.uuid4()
+    cache.get_or_load(teacher_id, lambda: PROFILE)
+    session = SimpleNamespace(
+        info={}, new=[TeacherStyle(teacher_id=teacher_id)], dirty=[], deleted=[]
+    )
+
+    with patch.object(context_cache, "get_context_cache", return_value=cache):
+        context_cache._collect_dirty_teachers(session, None)
+        context_cache._forget_dirty_teachers(session, SimpleNamespace(parent=None))
+        context_cache._invalidate_dirty_teachers(session)
+
+    assert cache.stats()["entries"] == 1
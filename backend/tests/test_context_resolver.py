@@ -1,8 +1,9 @@
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 from unittest.mock import patch
 
 from app.core.context_resolver import resolve_context
-from app.models import SolutionOutcome
+from app.models import Grade, Subject, Teacher, TeacherClassSubject, TeacherStyle
 
 
 class DummyDB:
@@ -18,22 +19,20 @@ def test_resolve_context_fills_from_db_when_missing_grade_subject():
     fake_style = SimpleNamespace(interactive_vs_passive=7, light_vs_strict=3, conventional_vs_modern=6)
     fake_tcs = SimpleNamespace(grade_id=4, subject_id="Mathematics")
 
-    fake_outcomes = [
-        SimpleNamespace(solution_id="sol1", outcome=SolutionOutcome.worked),
-        SimpleNamespace(solution_id="sol2", outcome=SolutionOutcome.failed),
-    ]
+    fake_summary = SimpleNamespace(recent_worked=["sol1"], recent_failed=["sol2"])
 
     with patch("app.core.context_resolver.first_by_id", return_value=fake_teacher), \
-         patch("app.core.context_resolver.first_by_field") as mock_first_by_field, \
-         patch("app.core.context_resolver.all_by_field", return_value=fake_outcomes):
+         patch("app.core.context_resolver.first_by_field") as mock_first_by_field:
 
-        # first_by_field is used twice: TeacherStyle then TeacherClassSubject
-        def side_effect(db_arg, model, field, value):
+        # first_by_field is used for TeacherStyle, TeacherClassSubject and TeacherOutcomeSummary
+        def side_effect(db_arg, model, field, value, order_by=()):
             name = getattr(model, "__name__", str(model))
             if "TeacherStyle" in name:
                 return fake_style
             if "TeacherClassSubject" in name:
                 return fake_tcs
+            if "TeacherOutcomeSummary" in name:
+                return fake_summary
             return None
 
         mock_first_by_field.side_effect = side_effect
@@ -67,8 +66,7 @@ def test_resolve_context_does_not_override_teacher_provided_grade_subject():
     fake_teacher = SimpleNamespace(years_experience=None, language="Hindi")
 
     with patch("app.core.context_resolver.first_by_id", return_value=fake_teacher), \
-         patch("app.core.context_resolver.first_by_field", return_value=None), \
-         patch("app.core.context_resolver.all_by_field", return_value=[]):
+         patch("app.core.context_resolver.first_by_field", return_value=None):
 
         ctx = resolve_context(
             db=db,
@@ -85,3 +83,80 @@ def test_resolve_context_does_not_override_teacher_provided_grade_subject():
     assert ctx.classroom.language == "English"
     # preferred_language comes from request language first
     assert ctx.teacher.preferred_language == "English"
+
+
+def test_single_query_path_matches_per_table_path():
+    db = DummyDB()
+    row = {
+        "years_experience": 7,
+        "language": "Hindi",
+        "interactive_vs_passive": 7,
+        "light_vs_strict": 3,
+        "conventional_vs_modern": 6,
+        "grade_id": 4,
+        "subject_id": "Mathematics",
+        "worked": ["sol1"],
+        "failed": ["sol2"],
+    }
+
+    with patch("app.core.context_resolver.fetch_teacher_context", return_value=row) as mock_fetch, \
+         patch("app.core.context_resolver.first_by_id") as mock_first_by_id:
+        ctx = resolve_context(
+            db=db,
+            teacher_id="t1",
+            raw_prompt="Help now",
+            time_left_minutes=10,
+            single_query=True,
+        )
+
+    mock_fetch.assert_called_once_with(db, "t1")
+    mock_first_by_id.assert_not_called()
+
+    assert ctx.teacher.years_experience == 7
+    assert ctx.teacher.preferred_language == "Hindi"
+    assert ctx.teacher.style.light_vs_strict == 3
+    assert ctx.classroom.grade == 4
+    assert ctx.classroom.subject == "Mathematics"
+    assert ctx.history.worked_solutions == ["sol1"]
+    assert ctx.history.failed_solutions == ["sol2"]
+
+
+def test_single_query_path_handles_unknown_teacher():
+    with patch("app.core.context_resolver.fetch_teacher_context", return_value=None):
+        ctx = resolve_context(
+            db=DummyDB(),
+            teacher_id="missing",
+            raw_prompt="Help now",
+            single_query=True,
+        )
+
+    assert ctx.teacher.style is None
+    assert ctx.classroom.grade is None
+    assert ctx.history.worked_solutions == []
+
+
+def test_both_paths_pick_the_same_default_class(db_session):
+    teacher = Teacher(name="T", phone="+910000000003", email="classes@school.com", language="Hindi")
+    maths, english = Subject(name="Maths-ctx"), Subject(name="English-ctx")
+    db_session.add_all([teacher, maths, english, Grade(id=91, label="G91"), Grade(id=92, label="G92")])
+    db_session.flush()
+    db_session.add(TeacherStyle(
+        teacher_id=teacher.id, interactive_vs_passive=5, light_vs_strict=5, conventional_vs_modern=5,
+    ))
+
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # inserted newest first, so insertion order differs from created_at order
+    for grade_id, subject, days in ((92, english, 2), (91, english, 1), (91, maths, 0)):
+        db_session.add(TeacherClassSubject(
+            teacher_id=teacher.id, grade_id=grade_id, subject_id=subject.id,
+            created_at=base + timedelta(days=days),
+        ))
+    db_session.flush()
+
+    per_table, single = (
+        resolve_context(db_session, teacher.id, "Help now", single_query=flag)
+        for flag in (False, True)
+    )
+
+    assert per_table == single
+    assert (single.classroom.grade, single.classroom.subject) == (91, str(maths.id))
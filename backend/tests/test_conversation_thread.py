@@ -0,0 +1,120 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.core import conversation_thread
+from app.core.context_schema import (
+    ResolvedContext, TeacherCtx, ClassroomCtx, ConstraintsCtx, HistoryCtx
+)
+from app.core.conversation_thread import Thread, append_turn, load_thread, refresh_summary
+from app.core.llm import LLMClient
+from app.db.session import get_db
+from app.main import app
+from app.models.conversations import Conversation, ConversationMessage
+from app.models.core import Teacher
+from app.utils.auth import create_access_token
+
+
+class RecordingLLM(LLMClient):
+    def __init__(self, reply="Try think-pair-share"):
+        self.reply = reply
+        self.prompts = []
+
+    def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.reply
+
+
+def _ctx():
+    return ResolvedContext(
+        teacher=TeacherCtx(years_experience=3, preferred_language="Hindi", style=None),
+        classroom=ClassroomCtx(grade=6, subject="Mathematics", language="Hindi"),
+        constraints=ConstraintsCtx(time_left_minutes=10, materials_available=None, device=None),
+        history=HistoryCtx(),
+        raw_prompt="Class is noisy",
+    )
+
+
+def test_followup_endpoint_sends_window_and_schedules_summary():
+    llm = RecordingLLM()
+    thread = Thread(
+        conversation_id="c1",
+        ctx=_ctx(),
+        summary="Clapping worked once.",
+        turns=[("teacher", "Class is noisy"), ("assistant", "Clap twice")],
+    )
+    app.dependency_overrides[get_db] = lambda: None
+    token = create_access_token(sub="t1")
+    try:
+        with patch("app.api.conversations._load_followup", return_value=thread), \
+             patch("app.api.conversations.append_turn",
+                   return_value={"conversation_id": "c1", "seq": 14, "needs_summary": True}) as mock_append, \
+             patch("app.api.conversations.get_llm", return_value=llm), \
+             patch("app.api.conversations.refresh_summary_in_background") as mock_summary, \
+             patch("app.main.warm_catalog"):
+            with TestClient(app) as c:
+                resp = c.post(
+                    "/api/conversations/c1/messages",
+                    json={"prompt": "They stopped listening again"},
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert resp.json() == {"conversation_id": "c1", "seq": 14, "output": "Try think-pair-share"}
+    [prompt] = llm.prompts
+    assert "Clapping worked once." in prompt
+    assert "ASSISTANT: Clap twice" in prompt
+    assert "They stopped listening again" in prompt
+    assert mock_append.call_args[0][2:4] == ("They stopped listening again", "Try think-pair-share")
+    mock_summary.assert_called_once()
+
+
+# ---------- DB-backed ----------
+
+def _mk_conversation(db_session):
+    t = Teacher(name="T", phone="+910000000006", email="thread@school.com")
+    db_session.add(t)
+    db_session.flush()
+    c = Conversation(
+        teacher_id=t.id, title="t", raw_query="", ai_response="", resolved_context={},
+    )
+    db_session.add(c)
+    db_session.commit()
+    return t, c
+
+
+def test_append_turn_allocates_seq_and_fills_shell(db_session):
+    t, c = _mk_conversation(db_session)
+
+    first = append_turn(db_session, c.id, "q1", "a1", ctx=_ctx())
+    second = append_turn(db_session, c.id, "q2", "a2")
+
+    assert (first["seq"], second["seq"]) == (2, 4)
+    db_session.refresh(c)
+    assert c.raw_query == "q1"
+    assert c.ai_response == "a2"
+    assert c.resolved_context["classroom"]["grade"] == 6
+    thread = load_thread(db_session, c.id, t.id)
+    assert thread.turns == [("teacher", "q1"), ("assistant", "a1"), ("teacher", "q2"), ("assistant", "a2")]
+
+
+def test_summary_advances_in_batches_and_shrinks_window(db_session):
+    t, c = _mk_conversation(db_session)
+    llm = RecordingLLM(reply="Summary of early turns")
+
+    with patch.object(conversation_thread, "CONVERSATION_WINDOW_MESSAGES", 4), \
+         patch.object(conversation_thread, "CONVERSATION_SUMMARY_BATCH", 4):
+        flags = [append_turn(db_session, c.id, f"q{i}", f"a{i}")["needs_summary"] for i in range(4)]
+        assert flags == [False, False, False, True]   # 8 messages: 4 outside the window
+
+        assert refresh_summary(db_session, c.id, llm) is True
+        assert refresh_summary(db_session, c.id, llm) is False   # nothing new to fold
+        thread = load_thread(db_session, c.id, t.id)
+
+    assert "TEACHER: q0" in llm.prompts[0]
+    assert "TEACHER: q2" not in llm.prompts[0]
+    assert thread.summary == "Summary of early turns"
+    assert thread.turns[0] == ("teacher", "q2")
+    assert db_session.query(ConversationMessage).count() == 8
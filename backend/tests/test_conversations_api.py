@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.conversations import Conversation
+from app.models.core import Teacher
+from app.utils.auth import create_access_token
+
+
+def _auth(teacher):
+    return {"Authorization": f"Bearer {create_access_token(sub=str(teacher.id))}"}
+
+
+def _mk_history(db_session, n, email="history@school.com", phone="+910000000003"):
+    t = Teacher(name="T", phone=phone, email=email)
+    db_session.add(t)
+    db_session.flush()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(n):
+        db_session.add(Conversation(
+            teacher_id=t.id,
+            title=f"c{i}",
+            raw_query="q",
+            ai_response="x" * (100 + i * 10),
+            resolved_context={"big": "y" * 1000},
+            updated_at=base + timedelta(minutes=i),
+        ))
+    db_session.commit()
+    return t
+
+
+def test_cursor_round_trip():
+    ts = datetime(2026, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(ts, "abc")) == [ts.isoformat(), "abc"]
+
+
+def test_unpaginated_list_keeps_old_shape(client, db_session):
+    t = _mk_history(db_session, 3)
+
+    resp = client.get("/api/conversations", headers=_auth(t))
+
+    assert resp.status_code == 200
+    assert [c["title"] for c in resp.json()] == ["c2", "c1", "c0"]
+    assert "X-Next-Cursor" not in resp.headers
+    assert set(resp.json()[0]) == {"id", "title", "last_message_preview", "updated_at", "worked"}
+
+
+def test_keyset_pages_cover_history_once(client, db_session):
+    t = _mk_history(db_session, 5)
+
+    titles, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/api/conversations", params=params, headers=_auth(t))
+        assert resp.status_code == 200
+        titles += [c["title"] for c in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert titles == ["c4", "c3", "c2", "c1", "c0"]
+
+
+def test_preview_is_cut_in_sql(client, db_session):
+    t = _mk_history(db_session, 4)
+
+    previews = {c["title"]: c["last_message_preview"] for c in
+                client.get("/api/conversations", headers=_auth(t)).json()}
+
+    assert previews["c0"] == "x" * 100
+    assert previews["c2"] == "x" * 120
+    assert previews["c3"] == "x" * 120 + "..."
+
+
+def test_invalid_cursor_is_rejected(client, db_session):
+    t = _mk_history(db_session, 1)
+
+    resp = client.get("/api/conversations", params={"cursor": "not-a-cursor"}, headers=_auth(t))
+
+    assert resp.status_code == 400
+
+
+def _mk_searchable(db_session):
+    t = Teacher(name="T", phone="+910000000004", email="search@school.com")
+    db_session.add(t)
+    db_session.flush()
+    rows = [
+        ("Fractions with pizza", "how to teach fractions", "Use pizza slices"),
+        ("Noisy class", "class is noisy after lunch", "Try a clap pattern; fractions later"),
+        ("Subtraction", "borrowing across zero", "Use base ten blocks"),
+    ]
+    for title, q, a in rows:
+        db_session.add(Conversation(
+            teacher_id=t.id, title=title, raw_query=q, ai_response=a, resolved_context={},
+        ))
+    db_session.commit()
+    return t
+
+
+def test_search_ranks_title_matches_first(client, db_session):
+    t = _mk_searchable(db_session)
+
+    resp = client.get("/api/conversations/search", params={"q": "fractions"}, headers=_auth(t))
+
+    assert resp.status_code == 200
+    assert [c["title"] for c in resp.json()] == ["Fractions with pizza", "Noisy class"]
+
+
+def test_search_pages_and_scopes_to_teacher(client, db_session):
+    t = _mk_searchable(db_session)
+    other = _mk_history(db_session, 1, email="other@school.com", phone="+910000000005")
+
+    first = client.get(
+        "/api/conversations/search", params={"q": "fractions", "limit": 1}, headers=_auth(t)
+    )
+    second = client.get(
+        "/api/conversations/search",
+        params={"q": "fractions", "limit": 1, "cursor": first.headers["X-Next-Cursor"]},
+        headers=_auth(t),
+    )
+    foreign = client.get("/api/conversations/search", params={"q": "fractions"}, headers=_auth(other))
+
+    assert [c["title"] for c in first.json() + second.json()] == ["Fractions with pizza", "Noisy class"]
+    assert "X-Next-Cursor" not in second.headers
+    assert foreign.json() == []
@@ -3,7 +3,6 @@ from unittest.mock import patch
 
 from app.core.context_resolver import resolve_context
 from app.core.prompt_builder import build_prompt
-from app.models import SolutionOutcome
 
 
 class DummyDB:
@@ -17,13 +16,11 @@ def test_missing_input_context_is_filled_from_db_and_injected_into_prompt():
     fake_teacher = SimpleNamespace(years_experience=10, language="Hindi")
     fake_style = SimpleNamespace(interactive_vs_passive=6, light_vs_strict=4, conventional_vs_modern=5)
     fake_tcs = SimpleNamespace(grade_id=4, subject_id="Mathematics")
-    fake_outcomes = []
 
     with patch("app.core.context_resolver.first_by_id", return_value=fake_teacher), \
-         patch("app.core.context_resolver.first_by_field") as mock_first, \
-         patch("app.core.context_resolver.all_by_field", return_value=fake_outcomes):
+         patch("app.core.context_resolver.first_by_field") as mock_first:
 
-        def side_effect(db_arg, model, field, value):
+        def side_effect(db_arg, model, field, value, order_by=()):
             if "TeacherStyle" in model.__name__:
                 return fake_style
             if "TeacherClassSubject" in model.__name__:
@@ -0,0 +1,88 @@
+import gzip
+import json
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.core.exporter import gzip_chunks, iter_conversations, ndjson_lines
+from app.db.session import get_db
+from app.main import app
+from app.utils.auth import create_access_token
+
+
+ROWS = [
+    {"id": uuid.UUID(int=i), "title": f"t{i}", "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc)}
+    for i in range(3)
+]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return iter(self.rows)
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        return FakeResult(self.rows)
+
+
+def test_ndjson_lines_encode_uuid_and_datetime():
+    lines = list(ndjson_lines(ROWS))
+
+    assert len(lines) == 3
+    first = json.loads(lines[0])
+    assert first == {
+        "id": "00000000-0000-0000-0000-000000000000",
+        "title": "t0",
+        "created_at": "2026-01-01T00:00:00+00:00",
+    }
+
+
+def test_gzip_chunks_round_trip_in_small_pieces():
+    lines = [json.dumps({"n": i, "id": uuid.uuid4().hex}).encode() + b"\n" for i in range(5000)]
+
+    chunks = list(gzip_chunks(iter(lines), min_chunk=1024))
+
+    assert len(chunks) > 2
+    assert gzip.decompress(b"".join(chunks)) == b"".join(lines)
+
+
+def test_iter_conversations_uses_yield_per_and_teacher_filter():
+    db = FakeDB(ROWS)
+
+    rows = list(iter_conversations(db, teacher_id="t1", batch_size=50))
+
+    assert rows == ROWS
+    stmt = db.statements[0]
+    assert stmt.get_execution_options()["yield_per"] == 50
+    assert "conversations.teacher_id" in str(stmt)
+
+
+def test_export_endpoint_streams_gzip():
+    db = FakeDB(ROWS)
+    app.dependency_overrides[get_db] = lambda: db
+    token = create_access_token(sub="t1")
+    try:
+        with patch("app.main.warm_catalog"), TestClient(app) as c:
+            resp = c.get(
+                "/api/export/insights",
+                params={"gzip": True},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/gzip"
+    lines = gzip.decompress(resp.content).decode().splitlines()
+    assert [json.loads(l)["title"] for l in lines] == ["t0", "t1", "t2"]
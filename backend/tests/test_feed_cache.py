@@ -0,0 +1,140 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.core.feed_cache import FeedPageCache
+from app.db.session import get_db
+from app.main import app
+from app.models.conversations import InsightFeedRanking, TeachingInsight
+from app.utils.auth import create_access_token
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class VersionDB:
+    """Answers the ranking version poll with a settable value."""
+
+    def __init__(self, version=None):
+        self.version = version
+        self.queries = 0
+
+    def execute(self, stmt):
+        self.queries += 1
+        return SimpleNamespace(scalar=lambda: self.version)
+
+
+def test_pages_expire_after_ttl():
+    clock = Clock()
+    cache = FeedPageCache(ttl_sec=10, clock=clock)
+    cache.put_page("6|maths|", None, 10, (b"[]", None), cache.generation)
+
+    assert cache.get_page("6|maths|", None, 10) == (b"[]", None)
+    assert cache.get_page("6|maths|", "c1", 10) is None
+    clock.now = 11
+    assert cache.get_page("6|maths|", None, 10) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_lru_bound():
+    cache = FeedPageCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put_page(key, None, 10, (key.encode(), None), cache.generation)
+
+    assert cache.get_page("a", None, 10) is None
+    assert cache.get_page("c", None, 10) == (b"c", None)
+
+
+def test_sync_clears_when_rankings_change_and_is_rate_limited():
+    clock = Clock()
+    db = VersionDB(version=1)
+    cache = FeedPageCache(check_sec=5, clock=clock)
+    cache.sync(db)
+    cache.put_page("k", None, 10, (b"[1]", None), cache.generation)
+    cache.remember_segment("t1", "k", cache.generation)
+
+    db.version = 2
+    cache.sync(db)                      # within check_sec: not polled
+    assert db.queries == 1
+    assert cache.get_page("k", None, 10) is not None
+
+    clock.now = 6
+    cache.sync(db)
+    assert db.queries == 2
+    assert cache.get_page("k", None, 10) is None
+    assert cache.segment_for("t1") is None
+    assert cache.invalidations == 1
+
+
+def test_page_rendered_before_a_clear_is_not_stored():
+    cache = FeedPageCache()
+    generation = cache.generation
+    cache.clear()
+
+    cache.put_page("k", None, 10, (b"stale", None), generation)
+
+    assert cache.get_page("k", None, 10) is None
+
+
+def test_deleting_an_insight_invalidates_cached_pages(db_session):
+    insight = TeachingInsight(
+        title="t", generalized_context={}, reframed_problem="p", reframed_solution="s",
+    )
+    db_session.add(insight)
+    db_session.flush()
+    db_session.add(InsightFeedRanking(segment="||", teaching_insight_id=insight.id, score=1.0))
+    db_session.commit()
+
+    cache = FeedPageCache(check_sec=0)
+    cache.sync(db_session)
+    cache.put_page("||", None, 10, (b"[1]", None), cache.generation)
+
+    # ranking rows go with the insight through ON DELETE CASCADE
+    db_session.execute(delete(TeachingInsight).where(TeachingInsight.id == insight.id))
+    db_session.commit()
+    cache.sync(db_session)
+
+    assert cache.get_page("||", None, 10) is None
+    assert cache.invalidations == 1
+
+
+def _insight():
+    return SimpleNamespace(
+        id=uuid4(), title="Talking stick", reframed_problem="p", reframed_solution="s",
+        generalized_context={"grade": 6}, likes_count=3, support_count=1,
+        created_at=datetime(2026, 10, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_feed_hit_skips_ranking_query_and_encoding():
+    cache = FeedPageCache()
+    rows = [(_insight(), 2.5), (_insight(), 1.5)]
+    app.dependency_overrides[get_db] = lambda: VersionDB(version=1)
+    token = create_access_token(sub="t1")
+    try:
+        with patch("app.api.teaching_insights.get_feed_cache", return_value=cache), \
+             patch("app.api.teaching_insights.teacher_segment", return_value=("6", "", "")) as seg, \
+             patch("app.api.teaching_insights.ranked_segment_key", return_value="6||"), \
+             patch("app.api.teaching_insights.ranked_page", return_value=rows) as page, \
+             patch("app.main.warm_catalog"), patch("app.main.warm_insight_index"):
+            with TestClient(app) as c:
+                first = c.get("/api/teaching-insights?limit=1", headers={"Authorization": f"Bearer {token}"})
+                second = c.get("/api/teaching-insights?limit=1", headers={"Authorization": f"Bearer {token}"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200, first.text
+    assert first.content == second.content
+    assert first.json()[0]["title"] == "Talking stick"
+    assert first.headers["X-Next-Cursor"] == second.headers["X-Next-Cursor"]
+    assert (seg.call_count, page.call_count) == (1, 1)
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,120 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import FEED_HALF_LIFE_DAYS
+from app.core.feed_ranking import (
+    make_segment,
+    ranked_page,
+    ranked_segment_key,
+    refresh_insight_rankings,
+    refresh_segments,
+    score,
+    segment_key,
+)
+from app.models.conversations import TeachingInsight
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+MATH6 = make_segment("Grade 6", "Mathematics", "Hindi")
+
+
+def test_make_segment_normalizes_parts():
+    assert MATH6 == ("6", "mathematics", "hindi")
+    assert segment_key(make_segment(None, None, None)) == "||"
+
+
+def test_context_match_outranks_likes():
+    matching = score(MATH6, ("6", "mathematics", "hindi"), 0, NOW)
+    popular = score(MATH6, ("9", "science", "english"), 20, NOW)
+    assert matching > popular
+
+
+def test_likes_break_ties_between_equal_matches():
+    assert score(MATH6, MATH6, 5, NOW) > score(MATH6, MATH6, 0, NOW)
+
+
+def test_score_halves_per_half_life():
+    older = NOW - timedelta(days=FEED_HALF_LIFE_DAYS)
+    gap = score(MATH6, MATH6, 0, NOW) - score(MATH6, MATH6, 0, older)
+    assert math.isclose(gap, math.log(2))
+
+
+def _mk(db_session, title, ctx, likes=0):
+    insight = TeachingInsight(
+        title=title,
+        generalized_context=ctx,
+        reframed_problem="p",
+        reframed_solution="s",
+        likes_count=likes,
+    )
+    db_session.add(insight)
+    db_session.flush()
+    return insight
+
+
+def test_refresh_and_page_by_segment(db_session):
+    math = _mk(db_session, "math", {"grade": 6, "subject": "Mathematics", "language": "Hindi"})
+    sci = _mk(db_session, "sci", {"grade": 9, "subject": "Science"}, likes=3)
+
+    written = refresh_segments(db_session, [MATH6, ("", "", "")], depth=10)
+    db_session.commit()
+    assert written == 4
+
+    key = ranked_segment_key(db_session, MATH6)
+    assert key == segment_key(MATH6)
+    first = ranked_page(db_session, key, 1)
+    assert [i.id for i, _ in first] == [math.id]
+
+    (_, last_score), = first
+    rest = ranked_page(db_session, key, 5, after=(last_score, math.id))
+    assert [i.id for i, _ in rest] == [sci.id]
+
+    # generic segment orders by likes alone
+    generic = ranked_page(db_session, segment_key(("", "", "")), 5)
+    assert [i.id for i, _ in generic] == [sci.id, math.id]
+
+
+def test_unknown_segment_falls_back_to_generic(db_session):
+    _mk(db_session, "a", {})
+    refresh_segments(db_session, [("", "", "")])
+    db_session.commit()
+
+    assert ranked_segment_key(db_session, make_segment(3, "art", "tamil")) == "||"
+
+
+def test_refresh_keeps_top_depth(db_session):
+    for n in range(5):
+        _mk(db_session, f"i{n}", {}, likes=n)
+
+    refresh_segments(db_session, [("", "", "")], depth=2)
+    db_session.commit()
+
+    rows = ranked_page(db_session, "||", 10)
+    assert [i.likes_count for i, _ in rows] == [4, 3]
+
+
+def test_incremental_refresh_reorders_after_likes(db_session):
+    a = _mk(db_session, "a", {}, likes=1)
+    b = _mk(db_session, "b", {}, likes=0)
+    refresh_segments(db_session, [("", "", "")])
+    db_session.commit()
+
+    b.likes_count = 10
+    db_session.flush()
+    assert refresh_insight_rankings(db_session, b.id) == 1
+    db_session.commit()
+
+    rows = ranked_page(db_session, "||", 10)
+    assert [i.id for i, _ in rows] == [b.id, a.id]
+
+
+def test_new_insight_is_added_to_existing_segments(db_session):
+    _mk(db_session, "old", {})
+    refresh_segments(db_session, [MATH6])
+    db_session.commit()
+
+    new = _mk(db_session, "new", {"grade": "6", "subject": "mathematics"})
+    refresh_insight_rankings(db_session, new.id)
+    db_session.commit()
+
+    rows = ranked_page(db_session, segment_key(MATH6), 10)
+    assert rows[0][0].id == new.id
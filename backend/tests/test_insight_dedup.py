@@ -0,0 +1,90 @@
+from app.core.insight_dedup import (
+    add_or_merge_insight,
+    band_buckets,
+    rebuild_index,
+    shingles,
+    signature,
+    similarity,
+)
+from app.models.conversations import InsightLshBucket, TeachingInsight
+
+PROBLEM = "Students talk over each other during group work and nobody listens"
+SOLUTION = "Use a talking stick so only one student speaks at a time while the others take notes"
+REWORDED = "Use a talking stick so only one student speaks at a time while others take notes"
+OTHER_PROBLEM = "Students forget multiplication tables after the holidays"
+OTHER_SOLUTION = "Run five minute oral drills and flash card games in pairs every morning"
+
+
+def _jaccard(a, b):
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_signature_is_deterministic():
+    assert (signature(PROBLEM) == signature(PROBLEM)).all()
+
+
+def test_similarity_estimates_jaccard():
+    a = f"{PROBLEM} {SOLUTION}"
+    b = f"{PROBLEM} {REWORDED}"
+    assert abs(similarity(signature(a), signature(b)) - _jaccard(a, b)) < 0.15
+    assert similarity(signature(a), signature(OTHER_SOLUTION)) < 0.1
+
+
+def test_near_duplicates_share_a_band():
+    a = band_buckets(signature(f"{PROBLEM} {SOLUTION}"))
+    b = band_buckets(signature(f"{PROBLEM} {REWORDED}"))
+    assert set(a) & set(b)
+
+
+def test_scopes_never_share_a_bucket():
+    sig = signature(f"{PROBLEM} {SOLUTION}")
+    assert not set(band_buckets(sig, ("3", "english"))) & set(band_buckets(sig, ("10", "maths")))
+
+
+def _add(db_session, problem, solution, context=None, **kw):
+    return add_or_merge_insight(
+        db_session,
+        title="t",
+        generalized_context=context or {},
+        reframed_problem=problem,
+        reframed_solution=solution,
+        **kw,
+    )
+
+
+def test_near_duplicate_bumps_support_count(db_session):
+    first, merged = _add(db_session, PROBLEM, SOLUTION)
+    assert merged is False
+
+    second, merged = _add(db_session, PROBLEM, REWORDED, threshold=0.6)
+    assert (second, merged) == (first, True)
+
+    other, merged = _add(db_session, OTHER_PROBLEM, OTHER_SOLUTION)
+    assert merged is False and other != first
+    db_session.commit()
+
+    assert db_session.query(TeachingInsight).count() == 2
+    assert db_session.get(TeachingInsight, first).support_count == 2
+
+
+def test_other_grade_or_subject_is_not_merged(db_session):
+    maths, _ = _add(db_session, PROBLEM, SOLUTION, {"grade": 10, "subject": "Maths"})
+    english, merged = _add(db_session, PROBLEM, SOLUTION, {"grade": 3, "subject": "English"})
+    assert merged is False and english != maths
+
+    again, merged = _add(db_session, PROBLEM, SOLUTION, {"grade": "10", "subject": "maths"})
+    assert (again, merged) == (maths, True)
+
+
+def test_rebuild_index_covers_existing_insights(db_session):
+    db_session.add(TeachingInsight(
+        title="t", generalized_context={}, reframed_problem=PROBLEM, reframed_solution=SOLUTION,
+    ))
+    db_session.commit()
+
+    assert rebuild_index(db_session) == 1
+    assert db_session.query(InsightLshBucket).count() > 0
+
+    _, merged = _add(db_session, PROBLEM, SOLUTION)
+    assert merged is True
@@ -0,0 +1,96 @@
+import contextlib
+from types import SimpleNamespace
+
+from app.core.insight_index import InsightIndex, retrieve_insights
+from app.models.conversations import TeachingInsight
+
+NOISY = "Students are noisy during group work and do not listen"
+FRACTIONS = "Students confuse numerator and denominator when adding fractions"
+
+
+def test_search_ranks_by_similarity_within_grade_and_subject():
+    index = InsightIndex()
+    index.add("noise", {"grade": 6, "subject": "Mathematics"}, NOISY)
+    index.add("fractions", {"grade": "Grade 6", "subject": "mathematics"}, FRACTIONS)
+    index.add("other-grade", {"grade": 8, "subject": "Mathematics"}, FRACTIONS)
+
+    hits = index.search(
+        "kids mix up numerator and denominator in fractions", 6, "Mathematics", k=2, min_score=-1.0
+    )
+
+    assert [h[0] for h in hits] == ["fractions", "noise"]
+    assert hits[0][1] > hits[1][1]
+
+
+def test_search_applies_min_score_and_unknown_scope():
+    index = InsightIndex()
+    index.add("noise", {"grade": 6, "subject": "Mathematics"}, NOISY)
+
+    assert index.search("photosynthesis in leaves", 6, "Mathematics", min_score=0.5) == []
+    assert index.search(NOISY, 7, "Mathematics") == []
+
+
+def test_partitions_grow_and_duplicates_are_ignored():
+    index = InsightIndex()
+    for i in range(200):
+        assert index.add(i, {"grade": 6, "subject": "EVS"}, f"problem number {i} with plants")
+    assert index.add(0, {"grade": 6, "subject": "EVS"}, "again") is False
+
+    assert len(index) == 200
+    hits = index.search("problem number 150 with plants", 6, "EVS", k=1, min_score=0.0)
+    assert hits[0][0] == 150
+
+
+def test_sync_is_rate_limited():
+    now = [0.0]
+    index = InsightIndex(refresh_sec=30, clock=lambda: now[0])
+    calls = []
+
+    class FakeDB:
+        def execute(self, stmt):
+            calls.append(stmt)
+            return []
+
+    index.sync(FakeDB())
+    index.sync(FakeDB())
+    now[0] = 31
+    index.sync(FakeDB())
+
+    assert len(calls) == 2
+
+
+def test_retrieve_insights_degrades_when_sync_fails(capsys):
+    class BrokenDB:
+        def begin_nested(self):
+            return contextlib.nullcontext()
+
+        def execute(self, stmt):
+            raise RuntimeError("connection reset")
+
+    ctx = SimpleNamespace(
+        raw_prompt="my students are noisy in group work",
+        classroom=SimpleNamespace(grade=6, subject="Mathematics"),
+    )
+
+    assert retrieve_insights(BrokenDB(), ctx, index=InsightIndex()) == []
+    assert "[insight-index]" in capsys.readouterr().out
+
+
+def test_retrieve_insights_syncs_new_rows(db_session):
+    insight = TeachingInsight(
+        title="Talking stick",
+        generalized_context={"grade": 6, "subject": "Mathematics"},
+        reframed_problem=NOISY,
+        reframed_solution="Only the holder speaks",
+    )
+    db_session.add(insight)
+    db_session.commit()
+
+    ctx = SimpleNamespace(
+        raw_prompt="my students are noisy in group work",
+        classroom=SimpleNamespace(grade=6, subject="Mathematics"),
+    )
+    index = InsightIndex()
+
+    [(found, score)] = retrieve_insights(db_session, ctx, index=index)
+    assert found.id == insight.id and score > 0
@@ -0,0 +1,207 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+
+from app.core import insight_jobs
+from app.core.insight_jobs import (
+    backoff_seconds,
+    claim_jobs,
+    enqueue_insight_job,
+    process_job,
+)
+from app.models.conversations import (
+    Conversation,
+    InsightJobStatus,
+    TeachingInsight,
+    TeachingInsightJob,
+)
+from app.models.core import Teacher
+
+
+GENERATOR = "app.core.insight_jobs.teaching_insight_generator.generate_teaching_insight"
+
+INSIGHT = {
+    "title": "Pair talk before answers",
+    "generalized_context": {"grade": 6},
+    "problem": "Students guess answers",
+    "solution": ["Think", "Pair", "Share"],
+}
+
+
+def _mk_conversation(db_session):
+    t = Teacher(name="T", phone="+910000000001", email="jobs@school.com")
+    db_session.add(t)
+    db_session.flush()
+    c = Conversation(
+        teacher_id=t.id,
+        title="t",
+        raw_query="q",
+        ai_response="a",
+        resolved_context={},
+        worked=True,
+    )
+    db_session.add(c)
+    db_session.commit()
+    return c
+
+
+def _job(db_session, conversation_id):
+    return (
+        db_session.query(TeachingInsightJob)
+        .filter(TeachingInsightJob.conversation_id == conversation_id)
+        .one()
+    )
+
+
+def test_backoff_grows_and_is_capped():
+    with patch.object(insight_jobs, "INSIGHT_JOB_BACKOFF_BASE_SEC", 10), \
+         patch.object(insight_jobs, "INSIGHT_JOB_BACKOFF_MAX_SEC", 60):
+        assert 5 <= backoff_seconds(1) <= 10
+        assert 10 <= backoff_seconds(2) <= 20
+        assert 30 <= backoff_seconds(10) <= 60
+
+
+def test_enqueue_is_idempotent(db_session):
+    c = _mk_conversation(db_session)
+
+    enqueue_insight_job(db_session, c.id)
+    enqueue_insight_job(db_session, c.id)
+    db_session.commit()
+
+    assert db_session.query(TeachingInsightJob).count() == 1
+    assert _job(db_session, c.id).status == InsightJobStatus.pending
+
+
+def test_claim_skips_jobs_not_yet_due(db_session):
+    c = _mk_conversation(db_session)
+    enqueue_insight_job(db_session, c.id)
+    db_session.commit()
+
+    job = _job(db_session, c.id)
+    job.run_after = datetime.now(timezone.utc) + timedelta(hours=1)
+    db_session.commit()
+    assert claim_jobs(db_session, 10) == []
+
+    job.run_after = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db_session.commit()
+    [(job_id, claimed_at)] = claim_jobs(db_session, 10)
+    db_session.refresh(job)
+    assert (job_id, claimed_at) == (job.id, job.locked_at)
+    assert (job.status, job.attempts) == (InsightJobStatus.running, 1)
+
+
+def test_claim_fails_stale_jobs_out_of_attempts(db_session):
+    c = _mk_conversation(db_session)
+    enqueue_insight_job(db_session, c.id)
+    db_session.commit()
+
+    # the worker died on its last attempt
+    job = _job(db_session, c.id)
+    job.status = InsightJobStatus.running
+    job.attempts = job.max_attempts
+    job.locked_at = datetime.now(timezone.utc) - timedelta(days=1)
+    db_session.commit()
+
+    assert claim_jobs(db_session, 10) == []
+    db_session.refresh(job)
+    assert (job.status, job.locked_at) == (InsightJobStatus.failed, None)
+    assert job.last_error
+
+
+def test_reclaimed_job_result_is_dropped(db_session):
+    c = _mk_conversation(db_session)
+    enqueue_insight_job(db_session, c.id)
+    db_session.commit()
+    [(job_id, claimed_at)] = claim_jobs(db_session, 1)
+
+    def slow_generate(**kwargs):
+        # the job went stale during the LLM call and another worker took it
+        job = db_session.get(TeachingInsightJob, job_id)
+        job.locked_at = claimed_at + timedelta(minutes=10)
+        db_session.commit()
+        return INSIGHT
+
+    with patch(GENERATOR, side_effect=slow_generate):
+        assert process_job(db_session, job_id, claimed_at) is None
+
+    assert db_session.query(TeachingInsight).count() == 0
+    assert db_session.get(TeachingInsightJob, job_id).status == InsightJobStatus.running
+
+
+def test_process_job_writes_insight(db_session):
+    c = _mk_conversation(db_session)
+    enqueue_insight_job(db_session, c.id)
+    db_session.commit()
+    [(job_id, claimed_at)] = claim_jobs(db_session, 1)
+
+    with patch(GENERATOR, return_value=INSIGHT):
+        assert process_job(db_session, job_id, claimed_at) == InsightJobStatus.succeeded
+
+    job = db_session.get(TeachingInsightJob, job_id)
+    insight = db_session.get(TeachingInsight, job.teaching_insight_id)
+    assert insight.reframed_solution == "Think\nPair\nShare"
+
+
+def test_process_job_calls_llm_outside_transaction(db_session):
+    c = _mk_conversation(db_session)
+    enqueue_insight_job(db_session, c.id)
+    db_session.commit()
+    [(job_id, claimed_at)] = claim_jobs(db_session, 1)
+
+    def generate(**kwargs):
+        assert not db_session.in_transaction()
+        assert kwargs["raw_query"] == "q"
+        return INSIGHT
+
+    with patch(GENERATOR, side_effect=generate):
+        assert process_job(db_session, job_id, claimed_at) == InsightJobStatus.succeeded
+
+
+def test_process_job_retries_then_fails(db_session):
+    c = _mk_conversation(db_session)
+    enqueue_insight_job(db_session, c.id)
+    db_session.commit()
+    job = _job(db_session, c.id)
+    job.max_attempts = 2
+    db_session.commit()
+
+    with patch(GENERATOR, side_effect=ValueError("bad json")):
+        [(job_id, claimed_at)] = claim_jobs(db_session, 1)
+        assert process_job(db_session, job_id, claimed_at) == InsightJobStatus.pending
+        db_session.refresh(job)
+        assert job.run_after > datetime.now(timezone.utc)
+        assert "bad json" in job.last_error
+
+        job.run_after = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db_session.commit()
+        [(job_id, claimed_at)] = claim_jobs(db_session, 1)
+        assert process_job(db_session, job_id, claimed_at) == InsightJobStatus.failed
+
+    assert db_session.query(TeachingInsight).count() == 0
+
+    # a fresh "worked" vote re-queues a permanently failed job
+    enqueue_insight_job(db_session, c.id)
+    db_session.commit()
+    db_session.refresh(job)
+    assert (job.status, job.attempts) == (InsightJobStatus.pending, 0)
+
+
+def test_process_job_merges_duplicate_insight(db_session):
+    first = _mk_conversation(db_session)
+    second = Conversation(
+        teacher_id=first.teacher_id, title="t", raw_query="q", ai_response="a", resolved_context={},
+    )
+    db_session.add(second)
+    enqueue_insight_job(db_session, first.id)
+    enqueue_insight_job(db_session, second.id)
+    db_session.commit()
+    claims = claim_jobs(db_session, 2)
+    job_ids = [job_id for job_id, _ in claims]
+
+    with patch(GENERATOR, return_value=INSIGHT):
+        for job_id, claimed_at in claims:
+            assert process_job(db_session, job_id, claimed_at) == InsightJobStatus.succeeded
+
+    [insight] = db_session.query(TeachingInsight).all()
+    assert insight.support_count == 2
+    assert {db_session.get(TeachingInsightJob, j).teaching_insight_id for j in job_ids} == {insight.id}
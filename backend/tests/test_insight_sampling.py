@@ -0,0 +1,49 @@
+import random
+
+from app.core.insight_sampling import sample_insights
+from app.models.conversations import TeachingInsight
+
+
+def _mk_insights(db_session, keys):
+    for i, key in enumerate(keys):
+        db_session.add(TeachingInsight(
+            title=f"i{i}",
+            generalized_context={},
+            reframed_problem="p",
+            reframed_solution="s",
+            random_key=key,
+        ))
+    db_session.commit()
+
+
+class FixedRandom(random.Random):
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+def test_sample_is_a_range_scan_from_the_random_start(db_session):
+    _mk_insights(db_session, [0.1, 0.3, 0.5, 0.7, 0.9])
+
+    rows = sample_insights(db_session, 2, rng=FixedRandom(0.4))
+
+    assert [r.random_key for r in rows] == [0.5, 0.7]
+
+
+def test_sample_wraps_around_the_key_space(db_session):
+    _mk_insights(db_session, [0.1, 0.3, 0.5, 0.7, 0.9])
+
+    rows = sample_insights(db_session, 3, rng=FixedRandom(0.8))
+
+    assert [r.random_key for r in rows] == [0.9, 0.1, 0.3]
+
+
+def test_sample_never_exceeds_table(db_session):
+    _mk_insights(db_session, [0.2, 0.6])
+
+    rows = sample_insights(db_session, 10, rng=FixedRandom(0.5))
+
+    assert sorted(r.random_key for r in rows) == [0.2, 0.6]
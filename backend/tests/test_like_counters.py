@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
+
+from app.core.like_counters import current_likes, record_reaction, rollup_likes
+from app.models.conversations import (
+    TeachingInsight,
+    TeachingInsightLikeShard,
+    TeachingInsightReaction,
+)
+from app.models.core import Teacher
+
+
+def _mk_insight(db):
+    insight = TeachingInsight(
+        title="t", generalized_context={}, reframed_problem="p", reframed_solution="s",
+    )
+    db.add(insight)
+    db.flush()
+    return insight
+
+
+def _mk_teachers(db, n, prefix="likes"):
+    teachers = [
+        Teacher(name=f"T{i}", phone=f"+91{prefix[:2]}{i:08d}", email=f"{prefix}{i}@school.com")
+        for i in range(n)
+    ]
+    db.add_all(teachers)
+    db.flush()
+    return teachers
+
+
+def test_reactions_toggle_instead_of_failing(db_session):
+    insight = _mk_insight(db_session)
+    [teacher] = _mk_teachers(db_session, 1)
+
+    assert record_reaction(db_session, insight.id, teacher.id, True) == 1
+    assert record_reaction(db_session, insight.id, teacher.id, True) == 0
+    assert record_reaction(db_session, insight.id, teacher.id, False) == -2
+    db_session.commit()
+
+    assert current_likes(db_session, insight.id) == -1
+    [reaction] = db_session.query(TeachingInsightReaction).all()
+    assert reaction.liked is False
+
+
+def test_rollup_moves_shards_into_likes_count(db_session):
+    insight = _mk_insight(db_session)
+    for teacher in _mk_teachers(db_session, 5):
+        record_reaction(db_session, insight.id, teacher.id, True)
+    db_session.commit()
+
+    assert db_session.get(TeachingInsight, insight.id).likes_count == 0
+    assert current_likes(db_session, insight.id) == 5
+
+    assert rollup_likes(db_session) == [insight.id]
+    db_session.commit()
+    db_session.refresh(insight)
+
+    assert insight.likes_count == 5
+    assert db_session.query(TeachingInsightLikeShard).count() == 0
+    assert current_likes(db_session, insight.id) == 5
+
+
+def test_parallel_reactions_lose_no_updates(engine):
+    # Real commits from separate connections; cleaned up at the end
+    Session = sessionmaker(bind=engine, future=True)
+    with Session() as db:
+        insight_id = _mk_insight(db).id
+        teacher_ids = [t.id for t in _mk_teachers(db, 40, prefix="parallel")]
+        db.commit()
+
+    def react(teacher_id, liked):
+        with Session() as db:
+            record_reaction(db, insight_id, teacher_id, liked)
+            db.commit()
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(lambda t: react(t, True), teacher_ids))
+            # half the teachers switch to dislike while a rollup runs
+            futures = [pool.submit(react, t, False) for t in teacher_ids[:20]]
+            with Session() as db:
+                rollup_likes(db)
+                db.commit()
+            for f in futures:
+                f.result()
+
+        with Session() as db:
+            assert current_likes(db, insight_id) == 0  # 20 likes, 20 dislikes
+            rollup_likes(db)
+            db.commit()
+            assert db.get(TeachingInsight, insight_id).likes_count == 0
+    finally:
+        with Session() as db:
+            db.execute(delete(TeachingInsight).where(TeachingInsight.id == insight_id))
+            db.execute(delete(Teacher).where(Teacher.id.in_(teacher_ids)))
+            db.commit()
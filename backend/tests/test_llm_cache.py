@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.core.llm import LLMClient, LLMError
+from app.core.llm_cache import (
+    CachedLLMClient,
+    InMemoryCacheBackend,
+    SQLiteCacheBackend,
+)
+
+
+class CountingLLM(LLMClient):
+    def __init__(self, name="fake:a"):
+        self.name = name
+        self.calls = 0
+
+    def fingerprint(self) -> str:
+        return self.name
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        return f"answer to {prompt}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    def _make(**kwargs):
+        if request.param == "memory":
+            return InMemoryCacheBackend(**kwargs)
+        return SQLiteCacheBackend(path=str(tmp_path / "cache.sqlite3"), **kwargs)
+    return _make
+
+
+def test_repeated_prompt_is_served_from_cache(make_backend):
+    inner = CountingLLM()
+    llm = CachedLLMClient(inner, make_backend(max_entries=10, ttl_sec=60))
+
+    assert llm.generate("noisy class") == "answer to noisy class"
+    assert llm.generate("noisy class") == "answer to noisy class"
+    assert asyncio.run(llm.agenerate("noisy class")) == "answer to noisy class"
+
+    assert inner.calls == 1
+    stats = llm.stats()["response_cache"]
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_key_includes_provider_fingerprint(make_backend):
+    backend = make_backend(max_entries=10, ttl_sec=60)
+    a, b = CountingLLM("fake:a"), CountingLLM("fake:b")
+
+    CachedLLMClient(a, backend).generate("same prompt")
+    CachedLLMClient(b, backend).generate("same prompt")
+
+    assert (a.calls, b.calls) == (1, 1)
+
+
+def test_entries_expire_after_ttl(make_backend):
+    clock = FakeClock()
+    inner = CountingLLM()
+    llm = CachedLLMClient(inner, make_backend(max_entries=10, ttl_sec=60, clock=clock))
+
+    llm.generate("p")
+    clock.now += 61
+    llm.generate("p")
+
+    assert inner.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted(make_backend):
+    clock = FakeClock()
+    inner = CountingLLM()
+    llm = CachedLLMClient(inner, make_backend(max_entries=2, ttl_sec=60, clock=clock))
+
+    for p in ["a", "b"]:
+        llm.generate(p)
+        clock.now += 1
+    llm.generate("a")       # refresh "a"
+    clock.now += 1
+    llm.generate("c")       # evicts "b"
+    clock.now += 1
+
+    assert len(llm.backend) == 2
+    calls = inner.calls
+    llm.generate("a")
+    assert inner.calls == calls
+    llm.generate("b")
+    assert inner.calls == calls + 1
+
+
+def test_stream_populates_cache_and_failures_are_not_cached():
+    class Flaky(CountingLLM):
+        def generate(self, prompt: str) -> str:
+            self.calls += 1
+            if self.calls == 1:
+                raise LLMError("down")
+            return "ok"
+
+    inner = Flaky()
+    llm = CachedLLMClient(inner, InMemoryCacheBackend(max_entries=10, ttl_sec=60))
+
+    with pytest.raises(LLMError):
+        llm.generate("p")
+    assert list(llm.stream("p")) == ["ok"]
+    assert list(llm.stream("p")) == ["ok"]
+    assert inner.calls == 2
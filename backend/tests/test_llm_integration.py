@@ -7,7 +7,6 @@ from unittest.mock import patch
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.models import SolutionOutcome
 from app.utils.auth import create_access_token
 
 client = TestClient(app)
@@ -29,21 +28,23 @@ def test_pipeline_prompt_is_reflected_in_llm_output():
     fake_style = SimpleNamespace(interactive_vs_passive=7, light_vs_strict=4, conventional_vs_modern=5)
     fake_tcs = SimpleNamespace(grade_id=4, subject_id="Mathematics")
 
-    fake_outcomes = [
-        SimpleNamespace(solution_id="peer_explanation", outcome=SolutionOutcome.worked),
-    ]
+    fake_summary = SimpleNamespace(recent_worked=["peer_explanation"], recent_failed=[])
 
-    def first_by_field_side_effect(db_arg, model, field, value):
+    def first_by_field_side_effect(db_arg, model, field, value, order_by=()):
         name = getattr(model, "__name__", str(model))
         if "TeacherStyle" in name:
             return fake_style
         if "TeacherClassSubject" in name:
             return fake_tcs
+        if "TeacherOutcomeSummary" in name:
+            return fake_summary
         return None
 
     with patch("app.core.context_resolver.first_by_id", return_value=fake_teacher), \
          patch("app.core.context_resolver.first_by_field") as mock_first, \
-         patch("app.core.context_resolver.all_by_field", return_value=fake_outcomes):
+         patch("app.api.coach.CONTEXT_SINGLE_QUERY", False), \
+         patch("app.api.coach.CONTEXT_CACHE_ENABLED", False), \
+         patch("app.api.coach.INSIGHT_RETRIEVAL_ENABLED", False):
 
         mock_first.side_effect = first_by_field_side_effect
 
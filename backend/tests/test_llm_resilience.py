@@ -0,0 +1,137 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.llm import (
+    Bulkhead,
+    CircuitBreaker,
+    LLMClient,
+    LLMError,
+    LLMUnavailableError,
+    ResilientLLMClient,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ScriptedLLM(LLMClient):
+    def __init__(self):
+        self.fail = False
+        self.calls = 0
+        self.gate: threading.Event | None = None
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(1)
+        if self.fail:
+            raise LLMError("upstream 502")
+        return "ok"
+
+
+def _client(clock, **breaker_kwargs):
+    inner = ScriptedLLM()
+    breaker = CircuitBreaker(
+        failure_rate=0.5, window=10, min_calls=4, open_sec=30, clock=clock, **breaker_kwargs
+    )
+    return inner, ResilientLLMClient(inner, breaker=breaker, bulkhead=Bulkhead(4))
+
+
+def test_breaker_opens_after_error_rate_and_fails_fast():
+    clock = FakeClock()
+    inner, llm = _client(clock)
+    inner.fail = True
+
+    for _ in range(4):
+        with pytest.raises(LLMError):
+            llm.generate("p")
+    assert llm.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(LLMUnavailableError):
+        llm.generate("p")
+    assert inner.calls == 4
+    assert llm.stats()["circuit_breaker"]["rejected"] == 1
+
+
+def test_half_open_probe_closes_on_success_and_reopens_on_failure():
+    clock = FakeClock()
+    inner, llm = _client(clock)
+    inner.fail = True
+    for _ in range(4):
+        with pytest.raises(LLMError):
+            llm.generate("p")
+
+    clock.now += 31
+    assert llm.breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(LLMError):
+        llm.generate("p")                       # failed probe
+    assert llm.breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 31
+    inner.fail = False
+    assert llm.generate("p") == "ok"            # successful probe
+    assert llm.breaker.state == CircuitBreaker.CLOSED
+    assert llm.stats()["circuit_breaker"]["opened_total"] == 2
+
+
+def test_only_one_probe_in_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, failure_rate=0.5, open_sec=1, clock=clock)
+    breaker.before_call()
+    breaker.on_failure()
+    clock.now += 2
+
+    breaker.before_call()                       # the probe
+    with pytest.raises(LLMUnavailableError):
+        breaker.before_call()
+
+
+def test_bulkhead_rejects_calls_over_the_limit():
+    inner = ScriptedLLM()
+    inner.gate = threading.Event()
+    llm = ResilientLLMClient(inner, bulkhead=Bulkhead(2))
+
+    threads = [threading.Thread(target=llm.generate, args=("p",)) for _ in range(2)]
+    for t in threads:
+        t.start()
+    while llm.bulkhead.in_use < 2:
+        pass
+
+    with pytest.raises(LLMUnavailableError):
+        llm.generate("p")
+
+    inner.gate.set()
+    for t in threads:
+        t.join()
+    assert llm.bulkhead.snapshot() == {"in_use": 0, "max_concurrent": 2, "rejected": 1}
+    # rejections are local and must not trip the breaker
+    assert llm.breaker.snapshot()["failure_rate"] == 0.0
+
+
+def test_cancelled_async_call_releases_probe_and_slot():
+    clock = FakeClock()
+
+    class Hanging(LLMClient):
+        async def agenerate(self, prompt: str) -> str:
+            await asyncio.sleep(10)
+
+    breaker = CircuitBreaker(min_calls=1, open_sec=1, clock=clock)
+    llm = ResilientLLMClient(Hanging(), breaker=breaker, bulkhead=Bulkhead(1))
+    breaker.before_call()
+    breaker.on_failure()
+    clock.now += 2
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(llm.agenerate("p"), 0.01)
+
+    asyncio.run(run())
+    assert llm.bulkhead.in_use == 0
+    breaker.before_call()                       # a new probe is allowed
@@ -0,0 +1,120 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from app.core.llm import LLMClient, LLMError
+from app.core.llm_router import RouterLLMClient
+
+
+class FakeProvider(LLMClient):
+    """Local provider with an injected latency distribution and error rate."""
+
+    def __init__(self, name, latency, error_rate=0.0, seed=0):
+        self.name = name
+        self.latency = latency          # callable(rng) -> seconds
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def fingerprint(self) -> str:
+        return f"fake:{self.name}"
+
+    def _draw(self):
+        self.calls += 1
+        return self.latency(self.rng), self.rng.random() < self.error_rate
+
+    def generate(self, prompt: str) -> str:
+        delay, fail = self._draw()
+        time.sleep(delay)
+        if fail:
+            raise LLMError(f"{self.name} failed")
+        return self.name
+
+    async def agenerate(self, prompt: str) -> str:
+        delay, fail = self._draw()
+        await asyncio.sleep(delay)
+        if fail:
+            raise LLMError(f"{self.name} failed")
+        return self.name
+
+
+def gauss(mean, sd):
+    return lambda rng: max(0.0, rng.gauss(mean, sd))
+
+
+def test_routes_to_fastest_provider_after_warmup():
+    fast = FakeProvider("fast", gauss(0.005, 0.001))
+    slow = FakeProvider("slow", gauss(0.030, 0.005))
+    router = RouterLLMClient({"slow": slow, "fast": fast}, hedge_delay_sec=None)
+
+    results = [router.generate("p") for _ in range(30)]
+
+    # both get measured once, then traffic settles on the fast one
+    assert results[-20:] == ["fast"] * 20
+    assert slow.calls <= 2
+    assert router.ranked() == ["fast", "slow"]
+    stats = router.stats()["router"]["providers"]
+    assert stats["fast"]["p50_ms"] < stats["slow"]["p50_ms"]
+
+
+def test_hedge_fires_second_request_and_takes_first_answer():
+    stuck = FakeProvider("stuck", lambda rng: 0.5)
+    backup = FakeProvider("backup", lambda rng: 0.01)
+    router = RouterLLMClient({"stuck": stuck, "backup": backup}, hedge_delay_sec=0.05)
+    # make "stuck" look fastest so it is chosen first
+    router.health["stuck"].record(True, 0.001)
+    router.health["backup"].record(True, 0.002)
+
+    start = time.perf_counter()
+    assert router.generate("p") == "backup"
+    assert time.perf_counter() - start < 0.3
+    assert (router.hedged, router.hedge_wins) == (1, 1)
+
+
+def test_async_hedge_cancels_loser():
+    stuck = FakeProvider("stuck", lambda rng: 0.5)
+    backup = FakeProvider("backup", lambda rng: 0.01)
+    router = RouterLLMClient({"stuck": stuck, "backup": backup}, hedge_delay_sec=0.05)
+    router.health["stuck"].record(True, 0.001)
+    router.health["backup"].record(True, 0.002)
+
+    async def run():
+        start = time.perf_counter()
+        result = await router.agenerate("p")
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result == "backup"
+    assert elapsed < 0.3
+
+
+def test_errors_fail_over_and_mark_provider_unhealthy():
+    broken = FakeProvider("broken", lambda rng: 0.0, error_rate=1.0)
+    ok = FakeProvider("ok", gauss(0.01, 0.002))
+    router = RouterLLMClient(
+        {"broken": broken, "ok": ok}, hedge_delay_sec=None, min_samples=3
+    )
+    router.health["broken"].record(True, 0.0001)   # looks fastest at first
+    router.health["ok"].record(True, 0.01)
+
+    assert [router.generate("p") for _ in range(10)] == ["ok"] * 10
+    assert router.ranked()[0] == "ok"
+    assert router.stats()["router"]["providers"]["broken"]["healthy"] is False
+    assert broken.calls < 5
+
+
+def test_all_providers_failing_raises_llm_error():
+    router = RouterLLMClient(
+        {
+            "a": FakeProvider("a", lambda rng: 0.0, error_rate=1.0),
+            "b": FakeProvider("b", lambda rng: 0.0, error_rate=1.0),
+        },
+        hedge_delay_sec=0.01,
+    )
+
+    with pytest.raises(LLMError, match="All LLM providers failed"):
+        router.generate("p")
+    with pytest.raises(LLMError):
+        asyncio.run(router.agenerate("p"))
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.llm import CoalescingLLMClient, LLMClient, LLMError
+
+
+class SlowLLM(LLMClient):
+    def __init__(self, delay=0.1, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise LLMError("upstream down")
+        return f"answer to {prompt}"
+
+    async def agenerate(self, prompt: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise LLMError("upstream down")
+        return f"answer to {prompt}"
+
+
+def test_concurrent_sync_calls_share_one_upstream_call():
+    inner = SlowLLM()
+    llm = CoalescingLLMClient(inner)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: llm.generate("demo"), range(8)))
+
+    assert results == ["answer to demo"] * 8
+    assert inner.calls == 1
+    assert llm.stats()["singleflight"]["coalesced_total"] == 7
+    assert llm.stats()["singleflight"]["in_flight"] == 0
+
+
+def test_concurrent_async_calls_share_one_upstream_call():
+    inner = SlowLLM()
+    llm = CoalescingLLMClient(inner)
+
+    async def burst():
+        return await asyncio.gather(
+            *(llm.agenerate("demo") for _ in range(20)),
+            llm.agenerate("other"),
+        )
+
+    results = asyncio.run(burst())
+
+    assert results[:20] == ["answer to demo"] * 20
+    assert results[20] == "answer to other"
+    assert inner.calls == 2
+
+
+def test_waiter_counts_are_exposed_while_in_flight():
+    inner = SlowLLM(delay=0.3)
+    llm = CoalescingLLMClient(inner)
+
+    async def observe():
+        tasks = [asyncio.ensure_future(llm.agenerate("demo")) for _ in range(4)]
+        await asyncio.sleep(0.1)
+        snapshot = llm.stats()["singleflight"]
+        await asyncio.gather(*tasks)
+        return snapshot
+
+    snapshot = asyncio.run(observe())
+
+    assert snapshot["in_flight"] == 1
+    assert list(snapshot["waiters"].values()) == [3]
+
+
+def test_errors_fan_out_and_next_call_retries():
+    inner = SlowLLM(fail=True)
+    llm = CoalescingLLMClient(inner)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(llm.generate, "demo") for _ in range(4)]
+        for f in futures:
+            with pytest.raises(LLMError):
+                f.result()
+
+    assert inner.calls == 1
+
+    inner.fail = False
+    assert llm.generate("demo") == "answer to demo"
+    assert inner.calls == 2
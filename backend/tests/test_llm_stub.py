@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from app.core.llm import StubLLMClient
+from app.core.teaching_insight_prompt import build_teaching_insight_prompt
+from app.core.teaching_insight_generator import parse_teaching_insight
+
+
+def test_stub_is_deterministic_per_prompt():
+    stub = StubLLMClient(latency_ms=0, tokens_per_sec=0)
+
+    a = stub.generate("Class is noisy")
+    assert a == stub.generate("Class is noisy")
+    assert "Control move" in a and "Quick check question" in a
+    assert "".join(stub.stream("Class is noisy")) == a
+    assert asyncio.run(stub.agenerate("Class is noisy")) == a
+
+
+def test_stub_returns_valid_teaching_insight_json():
+    stub = StubLLMClient(latency_ms=0, tokens_per_sec=0)
+    prompt = build_teaching_insight_prompt(
+        raw_query="Kids get stuck when the tens digit is 0",
+        ai_response="- Use bundles of sticks\n- Ask one student to explain borrowing",
+        resolved_context={"classroom": {"grade": 4, "subject": "Mathematics", "language": "Hindi"}},
+    )
+
+    insight = parse_teaching_insight(stub.generate(prompt))
+
+    assert insight["problem"] == "Kids get stuck when the tens digit is 0"
+    assert insight["generalized_context"]["grade"] == "4"
+    assert insight["generalized_context"]["subject"] == "Mathematics"
+    assert "Use bundles of sticks" in insight["solution"][0]
+
+
+def test_stub_latency_model():
+    stub = StubLLMClient(latency_ms=50, tokens_per_sec=1000)
+    text = stub._respond("Class is noisy")
+    expected = 0.05 + len(stub._tokens(text)) / 1000
+
+    start = time.perf_counter()
+    stub.generate("Class is noisy")
+    elapsed = time.perf_counter() - start
+
+    assert expected * 0.9 <= elapsed < expected + 0.1
+
+    chunks = stub.stream("Class is noisy")
+    start = time.perf_counter()
+    next(chunks)
+    assert 0.045 <= time.perf_counter() - start < 0.1
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.core import outcome_summary
+from app.core.outcome_summary import rebuild_outcome_summaries, record_outcome_stmt
+from app.models import (
+    Solution, SolutionOutcome, Teacher, TeacherOutcomeSummary, TeacherSolutionOutcome
+)
+
+
+def _mk_teacher(db_session):
+    t = Teacher(name="T", phone="+910000000002", email="summary@school.com")
+    db_session.add(t)
+    db_session.flush()
+    return t
+
+
+def _mk_outcomes(db_session, teacher, kinds):
+    solutions = []
+    for i, kind in enumerate(kinds):
+        s = Solution(title=f"s{i}")
+        db_session.add(s)
+        db_session.flush()
+        db_session.add(TeacherSolutionOutcome(teacher_id=teacher.id, solution_id=s.id, outcome=kind))
+        db_session.flush()
+        solutions.append(s.id)
+    return solutions
+
+
+def test_record_statement_prepends_and_trims():
+    with patch.object(outcome_summary, "OUTCOME_SUMMARY_RECENT", 3):
+        stmt = record_outcome_stmt("t", "s", SolutionOutcome.worked)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (teacher_id) DO UPDATE" in sql
+    assert "array_cat(excluded.recent_worked, teacher_outcome_summaries.recent_worked)" in sql
+
+
+def test_inserts_maintain_summary(db_session):
+    t = _mk_teacher(db_session)
+    worked_1, failed_1, worked_2 = _mk_outcomes(
+        db_session, t,
+        [SolutionOutcome.worked, SolutionOutcome.failed, SolutionOutcome.worked],
+    )
+
+    summary = db_session.get(TeacherOutcomeSummary, t.id)
+    db_session.refresh(summary)
+    assert (summary.worked_count, summary.failed_count) == (2, 1)
+    assert summary.recent_worked == [worked_2, worked_1]
+    assert summary.recent_failed == [failed_1]
+
+
+def test_rebuild_matches_incremental_summary(db_session):
+    t = _mk_teacher(db_session)
+    _mk_outcomes(db_session, t, [SolutionOutcome.worked] * 3 + [SolutionOutcome.failed])
+    summary = db_session.get(TeacherOutcomeSummary, t.id)
+    db_session.refresh(summary)
+    # created_at is the transaction time here, so compare ids as sets
+    before = (summary.worked_count, summary.failed_count, set(summary.recent_worked), set(summary.recent_failed))
+
+    assert rebuild_outcome_summaries(db_session, teacher_id=t.id) == 1
+    db_session.expire_all()
+
+    summary = db_session.get(TeacherOutcomeSummary, t.id)
+    assert (summary.worked_count, summary.failed_count, set(summary.recent_worked), set(summary.recent_failed)) == before
+
+
+def test_updates_and_deletes_maintain_summary(db_session):
+    t = _mk_teacher(db_session)
+    worked_1, worked_2 = _mk_outcomes(db_session, t, [SolutionOutcome.worked] * 2)
+
+    changed = db_session.query(TeacherSolutionOutcome).filter_by(solution_id=worked_1).one()
+    changed.outcome = SolutionOutcome.failed
+    db_session.flush()
+    summary = db_session.get(TeacherOutcomeSummary, t.id)
+    db_session.refresh(summary)
+    assert (summary.worked_count, summary.failed_count) == (1, 1)
+    assert (summary.recent_worked, summary.recent_failed) == ([worked_2], [worked_1])
+
+    db_session.delete(changed)
+    db_session.flush()
+    db_session.refresh(summary)
+    assert (summary.worked_count, summary.failed_count) == (1, 0)
+    assert summary.recent_failed == []
@@ -1,5 +1,6 @@
 from app.core.context_schema import ResolvedContext, TeacherCtx, ClassroomCtx, ConstraintsCtx, HistoryCtx, TeacherStyleCtx
-from app.core.prompt_builder import build_prompt
+from app.core.prompt_builder import build_prompt, build_followup_prompt, PromptBudget
+from app.core.token_budget import estimate_tokens, clip_to_tokens, TRUNCATION_MARK
 
 
 def test_build_prompt_contains_known_unknown_and_raw_prompt():
@@ -21,3 +22,103 @@ def test_build_prompt_contains_known_unknown_and_raw_prompt():
     assert "Subject: Math" in p
     assert "Class is chaotic" in p
     assert "Do NOT assume" in p
+
+
+def _ctx(raw_prompt="Class is chaotic", worked=None):
+    return ResolvedContext(
+        teacher=TeacherCtx(years_experience=8, preferred_language="Hindi", style=None),
+        classroom=ClassroomCtx(grade=4, subject="Math", language="Hindi"),
+        constraints=ConstraintsCtx(time_left_minutes=10, materials_available=None, device=None),
+        history=HistoryCtx(worked_solutions=worked or [], failed_solutions=[]),
+        raw_prompt=raw_prompt,
+    )
+
+
+def test_build_prompt_keeps_only_most_recent_worked_solutions():
+    worked = [f"solution-{i:03d}" for i in range(300)]   # most recent first
+
+    p = build_prompt(_ctx(worked=worked), PromptBudget(max_worked_solutions=3))
+
+    assert "solution-000" in p and "solution-002" in p
+    assert "solution-003" not in p
+
+
+def test_build_prompt_clips_long_teacher_text_and_stays_in_budget():
+    long_text = "The class will not settle down after lunch. " * 500
+    budget = PromptBudget(max_total_tokens=400, max_raw_prompt_tokens=200)
+
+    p = build_prompt(_ctx(raw_prompt=long_text, worked=["a", "b"]), budget)
+
+    assert estimate_tokens(p) <= 400
+    assert TRUNCATION_MARK in p
+    assert "Do NOT assume" in p
+
+
+def test_total_budget_drops_history_before_clipping_teacher_text():
+    worked = [f"peer-explanation-variant-{i}" for i in range(5)]
+    full = build_prompt(_ctx(worked=worked), PromptBudget(max_total_tokens=10_000))
+    tight = estimate_tokens(full) - 10
+
+    p = build_prompt(_ctx(worked=worked), PromptBudget(max_total_tokens=tight))
+
+    assert "Class is chaotic" in p
+    assert TRUNCATION_MARK not in p
+    assert "peer-explanation-variant-4" not in p
+    assert estimate_tokens(p) <= tight
+
+
+def test_clip_to_tokens_is_noop_when_under_budget():
+    assert clip_to_tokens("short text", 50) == "short text"
+    assert estimate_tokens(clip_to_tokens("word " * 100, 20)) <= 20
+
+
+def test_clip_to_tokens_below_mark_cost_is_plain_cut():
+    mark_cost = estimate_tokens(TRUNCATION_MARK)
+    for max_tokens in range(mark_cost + 1):
+        clipped = clip_to_tokens("word " * 100, max_tokens)
+        assert estimate_tokens(clipped) <= max_tokens
+        assert TRUNCATION_MARK not in clipped
+
+
+def test_followup_prompt_has_summary_and_recent_turns_in_order():
+    turns = [("teacher", "first question"), ("assistant", "first answer")]
+
+    p = build_followup_prompt(_ctx(), "They tried clapping.", turns, "Still noisy")
+
+    assert "They tried clapping." in p
+    assert p.index("TEACHER: first question") < p.index("ASSISTANT: first answer")
+    assert "Still noisy" in p
+
+
+def test_followup_prompt_drops_oldest_turns_to_fit():
+    turns = [("teacher", f"turn-{i} " + "word " * 200) for i in range(20)]
+
+    p = build_followup_prompt(_ctx(), None, turns, "Now what?", max_total_tokens=800)
+
+    assert estimate_tokens(p) <= 800
+    assert "turn-19" in p
+    assert "turn-0 " not in p
+    assert "EARLIER IN THIS CONVERSATION" not in p
+
+
+def test_build_prompt_includes_community_insights():
+    insights = [("Talking stick", "Only the holder speaks"), ("Count down", "Silence by zero")]
+
+    p = build_prompt(_ctx(), insights=insights)
+
+    assert "WHAT WORKED FOR OTHER TEACHERS" in p
+    assert p.index("Talking stick: Only the holder speaks") < p.index("Count down: Silence by zero")
+    assert "WHAT WORKED FOR OTHER TEACHERS" not in build_prompt(_ctx())
+
+
+def test_total_budget_drops_insights_before_history():
+    worked = ["peer explanation"]
+    insights = [(f"insight-{i}", "word " * 60) for i in range(3)]
+    full = build_prompt(_ctx(worked=worked), PromptBudget(max_total_tokens=10_000), insights)
+    tight = estimate_tokens(full) - 10
+
+    p = build_prompt(_ctx(worked=worked), PromptBudget(max_total_tokens=tight), insights)
+
+    assert "insight-0" in p and "insight-2" not in p
+    assert "peer explanation" in p
+    assert estimate_tokens(p) <= tight
@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.core.context_schema import (
+    ResolvedContext, TeacherCtx, ClassroomCtx, ConstraintsCtx, HistoryCtx
+)
+from app.core.semantic_cache import SemanticCache
+from app.core.text_vectors import HashingVectorizer
+
+
+def _ctx(prompt, grade=6, subject="Mathematics", language="Hindi"):
+    return ResolvedContext(
+        teacher=TeacherCtx(years_experience=None, preferred_language=None, style=None),
+        classroom=ClassroomCtx(grade=grade, subject=subject, language=language),
+        constraints=ConstraintsCtx(time_left_minutes=None, materials_available=None, device=None),
+        history=HistoryCtx(),
+        raw_prompt=prompt,
+    )
+
+
+def test_vectorizer_is_deterministic_and_normalized():
+    v = HashingVectorizer(dim=512)
+    a = v.transform("Students are not listening")
+    b = v.transform("students are NOT listening!")
+
+    assert np.allclose(a, b)
+    assert abs(float(np.linalg.norm(a)) - 1.0) < 1e-5
+
+
+def test_rephrased_prompt_is_closer_than_unrelated_prompt():
+    v = HashingVectorizer()
+    base = v.transform("students not listening during fractions lesson")
+    rephrased = v.transform("the students are not listening in the fractions lesson")
+    unrelated = v.transform("projector broke before the science experiment")
+
+    assert float(base @ rephrased) > 0.7
+    assert float(base @ unrelated) < 0.3
+
+
+def test_hit_requires_same_scope_and_threshold():
+    cache = SemanticCache(threshold=0.8)
+    cache.store(_ctx("students not listening in fractions lesson"), "- Clap twice")
+
+    assert cache.lookup(_ctx("students not listening in the fractions lesson")) == "- Clap twice"
+    assert cache.lookup(_ctx("students not listening in fractions lesson", grade=7)) is None
+    assert cache.lookup(_ctx("projector broke before the experiment")) is None
+
+    stats = cache.stats()
+    assert stats["lookups"] == 3
+    assert stats["hits"] == 1
+
+
+def test_index_is_bounded_per_scope_and_across_scopes():
+    cache = SemanticCache(threshold=0.99, max_per_scope=2, max_scopes=2)
+    cache.store(_ctx("alpha beta gamma"), "a")
+    cache.store(_ctx("delta epsilon zeta"), "d")
+    cache.lookup(_ctx("alpha beta gamma"))          # keep "a" warm
+    cache.store(_ctx("eta theta iota"), "e")        # evicts "d"
+
+    assert cache.lookup(_ctx("alpha beta gamma")) == "a"
+    assert cache.lookup(_ctx("delta epsilon zeta")) is None
+    assert cache.lookup(_ctx("eta theta iota")) == "e"
+
+    cache.store(_ctx("x", grade=7), "7")
+    cache.store(_ctx("y", grade=8), "8")            # evicts the grade 6 scope
+    assert cache.stats()["scopes"] == 2
+    assert cache.stats()["entries"] == 2
+    assert cache.lookup(_ctx("alpha beta gamma")) is None